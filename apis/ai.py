@@ -7,16 +7,61 @@ from dotenv import load_dotenv
 load_dotenv()
 router = APIRouter()
 
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+# "gemini" calls the real model, "fake" answers locally (offline development and tests)
+AI_MODEL_CLIENT = os.getenv("AI_MODEL_CLIENT", "gemini")
 
 
 class PromptRequest(BaseModel):
     prompt: str
 
 
-def send_task_to_gemini(request: PromptRequest):
-    response = client.models.generate_content(
-        model="gemini-2.5-flash", 
-        contents=request.prompt
-    )
-    return {"result": response.text}
+class GeminiModelClient:
+
+    def __init__(self):
+        self._client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+    async def generate(self, prompt: str) -> str:
+        response = await self._client.aio.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=prompt
+        )
+        return response.text
+
+
+# Deterministic stand-in for the model; no network access
+class FakeModelClient:
+
+    def __init__(self, reply: str = "Generated description: {prompt}"):
+        self.reply = reply
+        self.calls = 0
+
+    async def generate(self, prompt: str) -> str:
+        self.calls += 1
+        return self.reply.format(prompt=prompt)
+
+
+MODEL_CLIENTS = {
+    "gemini": GeminiModelClient,
+    "fake": FakeModelClient,
+}
+
+_model_client = None
+
+
+def get_model_client():
+    global _model_client
+    if _model_client is None:
+        _model_client = MODEL_CLIENTS[AI_MODEL_CLIENT]()
+    return _model_client
+
+
+# Swap the model client (e.g. set_model_client(FakeModelClient()) in tests)
+def set_model_client(client):
+    global _model_client
+    _model_client = client
+
+
+async def send_task_to_gemini(request: PromptRequest):
+    text = await get_model_client().generate(request.prompt)
+    return {"result": text}
@@ -0,0 +1,156 @@
+import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_db
+from models.comment import Comment
+from models.task import Task
+from models.user import User
+from apis.schemas.comment import CommentCreate, CommentUpdate
+from services.auth import Principal, require_user, unauthorized
+from services.pagination import apply_keyset, encode_cursor
+
+
+router = APIRouter()
+
+COMMENT_NOT_FOUND = "Comment not found"
+DEFAULT_THREAD_PAGE_SIZE = 20
+MAX_THREAD_PAGE_SIZE = 100
+
+COMMENT_FIELDS = ("id", "task_id", "user_id", "parent_id", "thread_id", "content", "created_at", "updated_at")
+
+
+# A deleted (or purged) author still has their comments shown, without a name
+def _node(row) -> dict:
+    return {
+        **{field: getattr(row, field) for field in COMMENT_FIELDS},
+        "author": {"id": row.user_id, "full_name": row.author_name},
+        "replies": [],
+    }
+
+
+# Only the author (or an admin) edits or deletes a comment
+def _require_author(principal: Principal, comment: Comment):
+    if comment.user_id != principal.user_id and not principal.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to change another user's comment")
+
+
+# CREATE COMMENT (or reply)
+@router.post("/")
+async def create_comment(
+    comment: CommentCreate, principal: Principal = Depends(require_user), db: AsyncSession = Depends(get_db)
+):
+    if not await db.get(Task, comment.task_id):
+        raise HTTPException(status_code=400, detail="Invalid task_id")
+    if not await db.get(User, principal.user_id):
+        raise unauthorized("User no longer exists")
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    parent = None
+    if comment.parent_id is not None:
+        parent = await db.get(Comment, comment.parent_id)
+        if not parent or parent.task_id != comment.task_id:
+            raise HTTPException(status_code=400, detail="Invalid parent_id")
+
+    new_comment = Comment(**comment.model_dump(), user_id=principal.user_id, created_at=now, updated_at=now)
+    new_comment.thread_id = parent.thread_id if parent else None
+    db.add(new_comment)
+    await db.flush()
+
+    if parent is None:
+        new_comment.thread_id = new_comment.id
+    else:
+        # Threads are listed by latest activity; a reply moves its thread to the top
+        await db.execute(update(Comment).where(Comment.id == parent.thread_id).values(updated_at=now))
+
+    await db.commit()
+    return new_comment
+
+
+# LIST A TASK'S THREADS
+# One page of top-level comments (keyset on latest activity), then every reply under them fetched
+# together with their authors in a single query and assembled into trees in memory.
+@router.get("/task/{task_id}")
+async def get_task_comments(
+    task_id: int,
+    limit: int = Query(DEFAULT_THREAD_PAGE_SIZE, ge=1, le=MAX_THREAD_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    # One extra thread tells whether another page exists; the cursor comes from the roots alone
+    roots = (await db.execute(
+        apply_keyset(
+            select(Comment.id, Comment.updated_at).where(Comment.task_id == task_id, Comment.parent_id.is_(None)),
+            Comment,
+            Comment.updated_at,
+            cursor,
+        ).limit(limit + 1)
+    )).all()
+    next_cursor = None
+    if len(roots) > limit:
+        roots = roots[:limit]
+        next_cursor = encode_cursor(roots[-1].updated_at, roots[-1].id)
+    if not roots:
+        return {"items": [], "next_cursor": next_cursor}
+
+    rows = (await db.execute(
+        select(*(getattr(Comment, field) for field in COMMENT_FIELDS), User.full_name.label("author_name"))
+        # Outer join: the soft-delete criteria hide deleted authors, not their comments or the replies under them
+        .outerjoin(User, User.id == Comment.user_id)
+        .where(Comment.thread_id.in_([root.id for root in roots]))
+        .order_by(Comment.created_at, Comment.id)
+    )).all()
+
+    nodes = {row.id: _node(row) for row in rows}
+    for node in nodes.values():
+        if node["parent_id"] in nodes:
+            nodes[node["parent_id"]]["replies"].append(node)
+
+    # In page order; a root deleted since the first query is skipped
+    threads = [nodes[root.id] for root in roots if root.id in nodes]
+    return {"items": threads, "next_cursor": next_cursor}
+
+
+# EDIT COMMENT
+@router.patch("/{comment_id}")
+async def update_comment(
+    comment_id: int, comment: CommentUpdate,
+    principal: Principal = Depends(require_user),
+    db: AsyncSession = Depends(get_db)
+):
+    db_comment = await db.get(Comment, comment_id)
+
+    if not db_comment:
+        raise HTTPException(status_code=404, detail=COMMENT_NOT_FOUND)
+    _require_author(principal, db_comment)
+
+    db_comment.content = comment.content
+    db_comment.updated_at = datetime.datetime.now(datetime.timezone.utc)
+    await db.commit()
+    await db.refresh(db_comment)
+    return db_comment
+
+
+# DELETE COMMENT (and every reply under it)
+@router.delete("/{comment_id}")
+async def delete_comment(comment_id: int, principal: Principal = Depends(require_user), db: AsyncSession = Depends(get_db)):
+    db_comment = await db.get(Comment, comment_id)
+
+    if not db_comment:
+        raise HTTPException(status_code=404, detail=COMMENT_NOT_FOUND)
+    _require_author(principal, db_comment)
+
+    if db_comment.parent_id is None:
+        stmt = delete(Comment).where(Comment.thread_id == comment_id)
+    else:
+        # Descendants of a reply, found with a recursive CTE rather than relying on FK cascades
+        subtree = select(Comment.id).where(Comment.id == comment_id).cte("subtree", recursive=True)
+        subtree = subtree.union_all(select(Comment.id).join(subtree, Comment.parent_id == subtree.c.id))
+        stmt = delete(Comment).where(Comment.id.in_(select(subtree.c.id)))
+
+    await db.execute(stmt.execution_options(synchronize_session=False))
+    await db.commit()
+    return {"detail": "Comment deleted successfully"}
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+
+from apis.metrics import require_metrics_access
+from database import pool_stats
+from services.cache import cache
+from services.rate_limit import rate_limiter
+
+router = APIRouter()
+
+# The stats routes expose the same numbers as /metrics, behind the same check; "/" stays public for probes
+stats_access = [Depends(require_metrics_access)]
+
+
+@router.get("/")
+async def health():
+    return {"status": "ok"}
+
+
+# Connection pool occupancy and checkout wait histogram for this worker
+@router.get("/db", dependencies=stats_access)
+async def database_health():
+    return pool_stats()
+
+
+# Read-through cache hit/miss counters for this worker
+@router.get("/cache", dependencies=stats_access)
+async def cache_health():
+    return cache.stats()
+
+
+# Requests turned away by rate limits (429) and admission control (503), and admission queue occupancy
+@router.get("/rate-limit", dependencies=stats_access)
+async def rate_limit_health():
+    return rate_limiter.stats()
@@ -0,0 +1,52 @@
+import hmac
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from database import pool_stats, pool_timeouts, pool_wait_seconds
+from services.auth import bearer_scheme, require_user
+from services.cache import cache
+from services.metrics import prometheus_counter, prometheus_gauge, prometheus_histogram
+from services.rate_limit import rate_limiter
+from services.request_metrics import request_db_seconds, request_queries, request_seconds
+from services.sql_metrics import query_seconds, slow_queries
+
+# Scrapers send "Authorization: Bearer <METRICS_TOKEN>"; otherwise an admin's access token is required
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+router = APIRouter()
+
+
+async def require_metrics_access(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+):
+    if METRICS_TOKEN and credentials is not None and hmac.compare_digest(credentials.credentials, METRICS_TOKEN):
+        return
+
+    principal = await require_user(request, credentials)
+    if not principal.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Metrics are limited to admins")
+
+
+# Prometheus scrape endpoint for this worker (scrape every worker, or run a single worker per container)
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    pool = pool_stats()
+    lines = [
+        *request_seconds.prometheus(),
+        *request_queries.prometheus(),
+        *request_db_seconds.prometheus(),
+        *prometheus_histogram("db_query_duration_seconds", "SQL statement latency", [({}, query_seconds)]),
+        *prometheus_counter("db_slow_queries", "Statements slower than SLOW_QUERY_SECONDS", [({}, slow_queries)]),
+        *prometheus_histogram("db_pool_wait_seconds", "Connection checkout wait", [({}, pool_wait_seconds)]),
+        *prometheus_counter("db_pool_timeouts", "Connection checkouts that timed out", [({}, pool_timeouts)]),
+        *prometheus_gauge("db_pool_checked_out", "Connections in use", [({}, pool.get("checked_out", 0))]),
+        *prometheus_counter("cache_hits", "Read-through cache hits", [({}, cache.hits)]),
+        *prometheus_counter("cache_misses", "Read-through cache misses", [({}, cache.misses)]),
+        *prometheus_counter("rate_limited_requests", "Requests rejected with 429", [({}, rate_limiter.limited)]),
+        *prometheus_counter("shed_requests", "Requests rejected with 503 by admission control", [({}, rate_limiter.shed)]),
+    ]
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
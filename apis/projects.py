@@ -1,59 +1,207 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from models.project import Project
-from apis.schemas.project import AssignUsers, ProjectCreate, ProjectUpdate
+from models.association import user_projects
+from apis.schemas.project import AssignUsers, ProjectBoard, ProjectCreate, ProjectOut, ProjectUpdate
 from models.user import User
+from services.cache import (
+    cache, project_key, user_projects_key, project_users_key, project_sprints_key, task_tree_prefix,
+    USER_PROJECTS_PREFIX
+)
+from services.board import UnknownFieldsError, board_task_columns, load_board
+from services.project_stats import project_stats, verified_project_stats
+from services.http_cache import conditional_response, content_etag, entity_etag, rows_etag
+from services.upsert import dialect_insert
+from services.serialization import PROJECT_COLUMNS, json_response, row_dicts
+from services.soft_delete import mark_deleted
+from services.sprint_reports import DEFAULT_VELOCITY_SPRINTS, MAX_VELOCITY_SPRINTS, project_velocity
+from services.task_events import cycle_time_report, report_window, time_in_status_report
+from typing import List, Optional
 import datetime 
 
 router = APIRouter()
 
 
+async def _existing_user_ids(db: AsyncSession, user_ids: list[int]) -> list[int]:
+    if not user_ids:
+        return []
+    return list(await db.scalars(select(User.id).where(User.id.in_(set(user_ids)))))
+
+
+# Set-based membership writes on the association table; already-present rows are skipped by the database
+async def _add_members(db: AsyncSession, project_id: int, user_ids: list[int]):
+    if user_ids:
+        await db.execute(
+            dialect_insert(db, user_projects)
+            .values([{"user_id": user_id, "project_id": project_id} for user_id in user_ids])
+            .on_conflict_do_nothing()
+        )
+
+
+async def _touch_project(db: AsyncSession, project_id: int):
+    # Membership is part of the project's state; keeps ETags/Last-Modified honest
+    await db.execute(
+        update(Project).where(Project.id == project_id).values(updated_at=datetime.datetime.now(datetime.timezone.utc))
+    )
+
+
 # CREATE PROJECT
-@router.post("/")
-def create_project(project_data: ProjectCreate, db: Session = Depends(get_db)):
-    # 1. Fetch existing User objects from the DB using the IDs provided
+@router.post("/", response_model=ProjectOut)
+async def create_project(project_data: ProjectCreate, db: AsyncSession = Depends(get_db)):
+    # 1. Keep only the IDs of users that exist
     # project_data.users is a list of ints like [1, 2, 3]
-    users_to_add = db.query(User).filter(User.id.in_(project_data.users)).all()
+    user_ids = await _existing_user_ids(db, project_data.users)
 
     # 2. Create the Project instance
     new_project = Project(title=project_data.title, manager_id = project_data.manager_id)
-
-    # 3. Establish the relationship
-    # This automatically creates entries in the 'user_projects' table
-    new_project.users = users_to_add
-
     new_project.created_at = datetime.datetime.now(datetime.timezone.utc)
 
     db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
+    await db.flush()
+
+    # 3. Membership rows in one INSERT, without loading User objects
+    await _add_members(db, new_project.id, user_ids)
+    await db.commit()
+    await db.refresh(new_project)
+
+    await cache.invalidate(*(user_projects_key(user_id) for user_id in user_ids))
     
     return new_project
 
 
 
 # Get all projects
-@router.get("/user/{user_id}")
-def get_projects_by_user(user_id: int, db: Session = Depends(get_db), ):
-    return db.query(Project).join(Project.users).filter(User.id == user_id).all()
+@router.get("/user/{user_id}", response_model=list[ProjectOut])
+async def get_projects_by_user(user_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db), ):
+    async def load():
+        projects = row_dicts(await db.execute(
+            select(*PROJECT_COLUMNS).join(user_projects, user_projects.c.project_id == Project.id)
+            .where(user_projects.c.user_id == user_id)
+        ))
+        return jsonable_encoder(projects)
+
+    projects = await cache.get_or_load(user_projects_key(user_id), load)
+
+    not_modified = conditional_response(request, response, *rows_etag("projects", user_projects_key(user_id), projects))
+    if not_modified:
+        return not_modified
+
+    return json_response(projects, response)
 
 
 # GET PROJECT
-@router.get("/{project_id}")
-def get_project(project_id: int, db: Session = Depends(get_db)):
-    project = db.query(Project).filter(Project.id == project_id).first()
+@router.get("/{project_id}", response_model=ProjectOut)
+async def get_project(project_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    async def load():
+        project = await db.get(Project, project_id)
+        return jsonable_encoder(project) if project else None
+
+    project = await cache.get_or_load(project_key(project_id), load)
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    not_modified = conditional_response(request, response, *entity_etag("project", project))
+    if not_modified:
+        return not_modified
+
     return project
 
 
+# PROJECT BOARD
+# Project, members, sprints and tasks grouped by sprint and workflow column in one response:
+# one statement on Postgres, four elsewhere. fields= picks task fields (id always comes back),
+# e.g. fields=code,title,priority,user_id to leave descriptions out.
+@router.get("/{project_id}/board", response_model=ProjectBoard)
+async def get_project_board(
+    project_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated task fields"),
+    sprint_ids: Optional[List[int]] = Query(None),
+    backlog: bool = True,
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        task_columns = board_task_columns(fields)
+    except UnknownFieldsError as error:
+        raise HTTPException(status_code=400, detail=f"Unknown task fields: {error}")
+
+    board = await load_board(db, project_id, task_columns, sprint_ids, backlog)
+    if board is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    response = Response(board, media_type="application/json")
+    not_modified = conditional_response(request, response, *content_etag("board", board))
+    if not_modified:
+        return not_modified
+
+    return response
+
+
+# TASK COUNTS BY WORKFLOW, PRIORITY AND ASSIGNEE
+# Answered from the maintained counters; verify=true recounts with GROUP BY and lists any drift
+@router.get("/{project_id}/stats")
+async def get_project_stats(project_id: int, verify: bool = False, db: AsyncSession = Depends(get_db)):
+    if not await db.get(Project, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    if verify:
+        return await verified_project_stats(db, project_id)
+    return await project_stats(db, project_id)
+
+
+# PROJECT VELOCITY
+@router.get("/{project_id}/velocity")
+async def get_project_velocity(
+    project_id: int,
+    sprints: int = Query(DEFAULT_VELOCITY_SPRINTS, ge=1, le=MAX_VELOCITY_SPRINTS),
+    db: AsyncSession = Depends(get_db)
+):
+    if not await db.get(Project, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    return await project_velocity(db, project_id, sprints)
+
+
+# CYCLE / LEAD TIME PERCENTILES (from the task_event log)
+@router.get("/{project_id}/cycle-time")
+async def get_project_cycle_time(
+    project_id: int,
+    sprint_id: Optional[int] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    if not await db.get(Project, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    since, until = report_window(since, until)
+    return await cycle_time_report(db, project_id, sprint_id, since, until)
+
+
+# TIME IN EACH WORKFLOW STATE
+@router.get("/{project_id}/time-in-status")
+async def get_project_time_in_status(
+    project_id: int,
+    sprint_id: Optional[int] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    if not await db.get(Project, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    since, until = report_window(since, until)
+    return await time_in_status_report(db, project_id, sprint_id, since, until)
+
+
 # UPDATE PROJECT
-@router.put("/{project_id}")
-def update_project(project_id: int, project: ProjectUpdate, db: Session = Depends(get_db)):
-    db_project = db.query(Project).filter(Project.id == project_id).first()
+@router.put("/{project_id}", response_model=ProjectOut)
+async def update_project(project_id: int, project: ProjectUpdate, db: AsyncSession = Depends(get_db)):
+    db_project = await db.get(Project, project_id)
 
     if not db_project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -61,55 +209,71 @@ def update_project(project_id: int, project: ProjectUpdate, db: Session = Depend
     for key, value in project.model_dump(exclude_unset=True).items():
         setattr(db_project, key, value)
 
-    db_project.created_at =  datetime.datetime.now(datetime.timezone.utc)
-    db.commit()
-    db.refresh(db_project)
+    db_project.updated_at =  datetime.datetime.now(datetime.timezone.utc)
+    await db.commit()
+    await db.refresh(db_project)
+
+    # Member project lists embed the project too
+    await cache.invalidate(project_key(project_id))
+    await cache.invalidate_prefix(USER_PROJECTS_PREFIX)
     return db_project
 
 
 # DELETE PROJECT
 @router.delete("/{project_id}")
-def delete_project(project_id: int, db: Session = Depends(get_db)):
-    project = db.query(Project).filter(Project.id == project_id).first()
+async def delete_project(project_id: int, db: AsyncSession = Depends(get_db)):
+    project = await db.get(Project, project_id)
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    db.delete(project)
-    db.commit()
+    # Hidden from every query from now on; its tasks, sprints and memberships go in the background
+    # (services/purge.py)
+    mark_deleted(project)
+    await db.commit()
+
+    await cache.invalidate(project_key(project_id), project_users_key(project_id), project_sprints_key(project_id))
+    await cache.invalidate_prefix(USER_PROJECTS_PREFIX, task_tree_prefix(project_id))
 
     return {"message": "Project deleted successfully"}
 
 
 @router.post("/add-users/{project_id}")
-def add_users_to_project(project_id: int, data: AssignUsers, db: Session = Depends(get_db)):
+async def add_users_to_project(project_id: int, data: AssignUsers, db: AsyncSession = Depends(get_db)):
 
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    # Same number of statements however many users are added
+    if not await db.get(Project, project_id):
         raise HTTPException(status_code=404, detail="Project not found")
-    users = db.query(User).filter(User.id.in_(data.user_ids)).all()
-    if not users:
+    user_ids = await _existing_user_ids(db, data.user_ids)
+    if not user_ids:
         raise HTTPException(status_code=404, detail="No valid users found") 
-    for user in users:
-        if user not in project.users:
-            project.users.append(user)
 
-    db.commit()
+    await _add_members(db, project_id, user_ids)
+    await _touch_project(db, project_id)
+    await db.commit()
+
+    # Every member's project list embeds the project's updated_at
+    await cache.invalidate(project_key(project_id), project_users_key(project_id))
+    await cache.invalidate_prefix(USER_PROJECTS_PREFIX)
     return {"message": "Project added to user"}
 
 
 @router.post("/remove-users/{project_id}")
-def remove_users_from_project(project_id: int, data: AssignUsers, db: Session = Depends(get_db)):
+async def remove_users_from_project(project_id: int, data: AssignUsers, db: AsyncSession = Depends(get_db)):
 
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    if not await db.get(Project, project_id):
         raise HTTPException(status_code=404, detail="Project not found")
-    users = db.query(User).filter(User.id.in_(data.user_ids)).all()
-    if not users:
+    user_ids = await _existing_user_ids(db, data.user_ids)
+    if not user_ids:
         raise HTTPException(status_code=404, detail="No valid users found") 
-    for user in users:
-        if user in project.users:
-            project.users.remove(user)
 
-    db.commit()
+    await db.execute(
+        delete(user_projects).where(user_projects.c.project_id == project_id, user_projects.c.user_id.in_(user_ids))
+    )
+    await _touch_project(db, project_id)
+    await db.commit()
+
+    # Every member's project list embeds the project's updated_at
+    await cache.invalidate(project_key(project_id), project_users_key(project_id))
+    await cache.invalidate_prefix(USER_PROJECTS_PREFIX)
     return {"message": "Project removed from user"}
\ No newline at end of file
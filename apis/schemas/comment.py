@@ -0,0 +1,33 @@
+from pydantic import BaseModel, field_validator
+
+
+MAX_COMMENT_LENGTH = 10000
+
+
+def _validate_content(value: str) -> str:
+    value = value.strip()
+    if not value:
+        raise ValueError("Comment cannot be empty")
+    if len(value) > MAX_COMMENT_LENGTH:
+        raise ValueError(f"Comment is limited to {MAX_COMMENT_LENGTH} characters")
+    return value
+
+
+# The author is the caller (access token), never a field of the body
+class CommentCreate(BaseModel):
+    task_id: int
+    content: str
+    # Reply to this comment; None starts a new thread
+    parent_id: int | None = None
+
+    @field_validator("content")
+    def validate_content(cls, value):
+        return _validate_content(value)
+
+
+class CommentUpdate(BaseModel):
+    content: str
+
+    @field_validator("content")
+    def validate_content(cls, value):
+        return _validate_content(value)
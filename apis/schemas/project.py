@@ -1,7 +1,11 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
 
 from models.user import User
 from apis.schemas.user import UserCreate
+from apis.schemas.sprint import SprintOut
 
 class ProjectCreate(BaseModel):
     title: str
@@ -13,4 +17,33 @@ class ProjectUpdate(BaseModel):
     title: str | None = None
     
 class AssignUsers(BaseModel):
-    user_ids: list[int]
\ No newline at end of file
+    user_ids: list[int]
+
+
+class ProjectOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str | None = None
+    manager_id: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class BoardMember(BaseModel):
+    id: int
+    full_name: str | None = None
+    email: str
+    role: str | None = None
+
+
+# Tasks carry the requested fields only, so they stay plain objects here
+class BoardSprint(SprintOut):
+    columns: dict[str, list[dict[str, Any]]]
+
+
+class ProjectBoard(BaseModel):
+    project: ProjectOut
+    members: list[BoardMember]
+    sprints: list[BoardSprint]
+    backlog: dict[str, list[dict[str, Any]]]
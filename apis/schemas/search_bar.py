@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field
 
+from services.search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
+
 class SearchTaskRequest(BaseModel):
     search_bar: str = Field(
         ...,
@@ -7,3 +9,9 @@ class SearchTaskRequest(BaseModel):
         max_length=100,
         description="Search by task title or task code"
     )
+    limit: int = Field(
+        DEFAULT_SEARCH_LIMIT,
+        ge=1,
+        le=MAX_SEARCH_LIMIT,
+        description="Maximum number of results"
+    )
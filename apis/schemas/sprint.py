@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime, timezone
 
 
@@ -15,3 +15,15 @@ class SprintUpdate(BaseModel):
     end_date: datetime | None = Field(default_factory=lambda: datetime.now(timezone.utc))
     project_id: int
     status: bool = False
+
+
+class SprintOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    start_date: datetime
+    end_date: datetime
+    project_id: int | None = None
+    status: bool | None = None
+    created_at: datetime
+    updated_at: datetime
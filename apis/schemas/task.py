@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
 
 from enum import Enum
 
@@ -57,6 +59,56 @@ class TaskUpdate(BaseModel):
     project_id: int | None = None
     priority: Priority | None = None
 
+
+class TaskBulkUpdate(TaskUpdate):
+    id: int
+
+
+class TaskBulkMove(BaseModel):
+    task_ids: list[int]
+    # None moves the tasks back to the backlog
+    sprint_id: int | None
+    work_flow: Workflow | None = None
+
+class TaskOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    code: int
+    title: str
+    work_type: WorkType
+    work_flow: Workflow | None = None
+    story_points: int | None = None
+    priority: Priority | None = None
+    user_id: int | None = None
+    parent_task: int | None = None
+    sprint_id: int | None = None
+    project_id: int
+    description: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class TaskPage(BaseModel):
+    items: list[TaskOut]
+    next_cursor: str | None = None
+
+
+class TaskCreated(BaseModel):
+    task: TaskOut
+
+
+class TaskBulkResult(BaseModel):
+    index: int
+    id: int | None = None
+    status: str
+    task: TaskOut | None = None
+
+
+class TaskBulkResults(BaseModel):
+    results: list[TaskBulkResult]
+
+
     # validators/task.py
 from fastapi import HTTPException, status
 
@@ -1,4 +1,6 @@
-from pydantic import BaseModel, field_validator
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, field_validator
 
 class UserCreate(BaseModel):
     full_name: str | None = None
@@ -8,8 +10,7 @@ class UserCreate(BaseModel):
     role: str | None = None
     location: str | None = None
     organisation: str | None = None
-    is_admin: bool = False
-  
+
 
     @field_validator("mobile")
     def validate_mobile(cls, value):
@@ -45,6 +46,34 @@ class UserGet(BaseModel):
     password: str
 
 
-    
+# What the API returns for a user; never includes the password
+class UserOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    full_name: str | None = None
+    email: str
+    mobile: str | None = None
+    role: str | None = None
+    location: str | None = None
+    organisation: str | None = None
+    is_admin: bool | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class TokenPair(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    # Seconds until the access token expires
+    expires_in: int
+
+
+# Login answers with the user as before, plus the tokens to send as "Authorization: Bearer ..."
+class LoginOut(UserOut, TokenPair):
+    pass
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
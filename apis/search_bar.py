@@ -1,34 +1,33 @@
 from fastapi import APIRouter, Depends,HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
 from models.task import Task
 from apis.schemas.search_bar import SearchTaskRequest
+from apis.schemas.task import TaskOut
+from services.search import search_tasks_index
+from services.serialization import TASK_COLUMNS, entity_dict, json_response, row_dicts
 
 router = APIRouter()
 
-@router.post("/")
-def search_tasks(payload: SearchTaskRequest, db: Session = Depends(get_db)):
+@router.post("/", response_model=list[TaskOut])
+async def search_tasks(payload: SearchTaskRequest, db: AsyncSession = Depends(get_db)):
     value = payload.search_bar.strip()
 
     # If numeric → search by code
     if value.isdigit():
-        tasks = (
-            db.query(Task)
+        tasks = row_dicts(await db.execute(
+            select(*TASK_COLUMNS)
             .filter(Task.code == int(value))
-            .all()
-        )
+        ))
     else:
-        # Search by title
-        tasks = (
-            db.query(Task)
-            .filter(Task.title.ilike(f"%{value}%"))
-            .all()
-        )
+        # Ranked search over title and description
+        tasks = [entity_dict(task, TASK_COLUMNS) for task in await search_tasks_index(db, value, payload.limit)]
     if not tasks:
         raise HTTPException(
             status_code=400,
             detail="We couldn't find any results with that title"
         )
 
-    return tasks
\ No newline at end of file
+    return json_response(tasks)
\ No newline at end of file
@@ -1,12 +1,20 @@
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from models.sprint import Sprint
 from models.project import Project
 import datetime
 
-from apis.schemas.sprint import SprintCreate, SprintUpdate
+from apis.schemas.sprint import SprintCreate, SprintOut, SprintUpdate
+from services.cache import cache, sprint_key, project_sprints_key, task_tree_prefix
+from services.http_cache import conditional_response, entity_etag, rows_etag
+from services.events import publish_event
+from services.sprint_reports import sprint_burndown
+from services.serialization import SPRINT_COLUMNS, json_response, row_dicts
+from services.soft_delete import mark_deleted
 
 router = APIRouter()
 
@@ -14,11 +22,11 @@ SPRINT_NOT_FOUND = "Sprint not found"
 
 
 # CREATE SPRINT
-@router.post("/")
-def create_sprint(sprint: SprintCreate, db: Session = Depends(get_db)):
+@router.post("/", response_model=SprintOut)
+async def create_sprint(sprint: SprintCreate, db: AsyncSession = Depends(get_db)):
 
     # Validate project
-    project = db.query(Project).filter(Project.id == sprint.project_id).first()
+    project = await db.get(Project, sprint.project_id)
     if not project:
         raise HTTPException(
             status_code=400,
@@ -33,11 +41,11 @@ def create_sprint(sprint: SprintCreate, db: Session = Depends(get_db)):
         )
 
     # Prevent overlapping sprints
-    existing_sprint = db.query(Sprint).filter(
+    existing_sprint = await db.scalar(select(Sprint).filter(
         Sprint.project_id == sprint.project_id,
         Sprint.start_date <= sprint.end_date,
         Sprint.end_date >= sprint.start_date
-    ).first()
+    ).limit(1))
 
     if existing_sprint:
         raise HTTPException(
@@ -49,67 +57,115 @@ def create_sprint(sprint: SprintCreate, db: Session = Depends(get_db)):
     new_sprint = Sprint(**sprint.model_dump())
     new_sprint.created_at = datetime.datetime.now(datetime.timezone.utc)
     db.add(new_sprint)
-    db.commit()
-    db.refresh(new_sprint)
+    await db.commit()
+    await db.refresh(new_sprint)
+
+    await cache.invalidate(project_sprints_key(new_sprint.project_id))
+    await publish_event("sprint.created", new_sprint.project_id, new_sprint)
 
     return new_sprint
 
 
 # GET SPRINT BY ID
-@router.get("/{sprint_id}/fetch")
-def get_sprint(sprint_id: int, db: Session = Depends(get_db)):
-    sprint = db.query(Sprint).filter(Sprint.id == sprint_id).first()
+@router.get("/{sprint_id}/fetch", response_model=SprintOut)
+async def get_sprint(sprint_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    async def load():
+        sprint = await db.get(Sprint, sprint_id)
+        return jsonable_encoder(sprint) if sprint else None
+
+    sprint = await cache.get_or_load(sprint_key(sprint_id), load)
 
     if not sprint:
         raise HTTPException(status_code=404, detail=SPRINT_NOT_FOUND)
 
+    not_modified = conditional_response(request, response, *entity_etag("sprint", sprint))
+    if not_modified:
+        return not_modified
+
     return sprint
 
 
+# SPRINT BURNDOWN
+@router.get("/{sprint_id}/burndown")
+async def get_sprint_burndown(sprint_id: int, db: AsyncSession = Depends(get_db)):
+    sprint = await db.get(Sprint, sprint_id)
+
+    if not sprint:
+        raise HTTPException(status_code=404, detail=SPRINT_NOT_FOUND)
+
+    return await sprint_burndown(db, sprint)
+
+
 # Get all sprints
-@router.get("/{project_id}")
-def get_all_sprint(project_id: int, db: Session = Depends(get_db)):
-    return db.query(Sprint).filter(Sprint.project_id == project_id).all()
+@router.get("/{project_id}", response_model=list[SprintOut])
+async def get_all_sprint(project_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    async def load():
+        sprints = row_dicts(await db.execute(select(*SPRINT_COLUMNS).filter(Sprint.project_id == project_id)))
+        return jsonable_encoder(sprints)
+
+    sprints = await cache.get_or_load(project_sprints_key(project_id), load)
+
+    not_modified = conditional_response(request, response, *rows_etag("sprints", project_sprints_key(project_id), sprints))
+    if not_modified:
+        return not_modified
+
+    return json_response(sprints, response)
 
 
 # UPDATE SPRINT
-@router.put("/{sprint_id}")
-def update_sprint(sprint_id: int, sprint: SprintUpdate, db: Session = Depends(get_db)):
-    db_sprint = db.query(Sprint).filter(Sprint.id == sprint_id).first()
+@router.put("/{sprint_id}", response_model=SprintOut)
+async def update_sprint(sprint_id: int, sprint: SprintUpdate, db: AsyncSession = Depends(get_db)):
+    db_sprint = await db.get(Sprint, sprint_id)
 
     if not db_sprint:
         raise HTTPException(status_code=404, detail="Sprint not found")
 
+    old_project_id = db_sprint.project_id
     for key, value in sprint.model_dump(exclude_unset=True).items():
         setattr(db_sprint, key, value)
 
     db_sprint.updated_at =  datetime.datetime.now(datetime.timezone.utc)
-    db.commit()
-    db.refresh(db_sprint)
+    await db.commit()
+    await db.refresh(db_sprint)
+
+    await cache.invalidate(
+        sprint_key(sprint_id), project_sprints_key(old_project_id), project_sprints_key(db_sprint.project_id)
+    )
+    await publish_event("sprint.updated", db_sprint.project_id, db_sprint)
     return db_sprint
 
 
 @router.patch("/{sprint_id}")
-def end_sprint(sprint_id: int, db: Session = Depends(get_db)):
-    sprint = db.query(Sprint).filter(Sprint.id == sprint_id).first()
+async def end_sprint(sprint_id: int, db: AsyncSession = Depends(get_db)):
+    sprint = await db.get(Sprint, sprint_id)
 
     if not sprint:
         raise HTTPException(status_code=404, detail=SPRINT_NOT_FOUND)
     
     sprint.status = False
     sprint.end_date = date.today()
-    db.commit()
+    sprint.updated_at = datetime.datetime.now(datetime.timezone.utc)
+    await db.commit()
+
+    await cache.invalidate(sprint_key(sprint_id), project_sprints_key(sprint.project_id))
+    await publish_event("sprint.ended", sprint.project_id, sprint)
     return {"message": "Sprint ended successfully"}
 
 
 # DELETE SPRINT
 @router.delete("/{sprint_id}")
-def delete_sprint(sprint_id: int, db: Session = Depends(get_db)):
-    sprint = db.query(Sprint).filter(Sprint.id == sprint_id).first()
+async def delete_sprint(sprint_id: int, db: AsyncSession = Depends(get_db)):
+    sprint = await db.get(Sprint, sprint_id)
 
     if not sprint:
         raise HTTPException(status_code=404, detail=SPRINT_NOT_FOUND)
 
-    db.delete(sprint)
-    db.commit()
+    # Only the marker: its tasks are hidden until the purge moves them to the backlog in batches
+    # (services/purge.py), so the request never locks the sprint's task rows
+    mark_deleted(sprint)
+    await db.commit()
+
+    await cache.invalidate(sprint_key(sprint_id), project_sprints_key(sprint.project_id))
+    await cache.invalidate_prefix(task_tree_prefix(sprint.project_id))
+    await publish_event("sprint.deleted", sprint.project_id, {"id": sprint_id})
     return {"message": "Sprint deleted successfully"}
\ No newline at end of file
@@ -1,28 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+from collections import defaultdict
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from models.task import Task
 from apis.schemas.ai import PromptRequest 
 from typing import List, Optional
 from fastapi import Query
 import datetime
-from apis.ai import send_task_to_gemini
-from apis.schemas.task import TaskCreate, TaskUpdate, Workflow, WorkType, Priority
+from apis.schemas.task import TaskCreate, TaskUpdate, TaskBulkUpdate, TaskBulkMove, Workflow, WorkType, Priority
+from apis.schemas.task import TaskBulkResults, TaskCreated, TaskOut, TaskPage
 from apis.schemas.task import validate_search_query
+from services.task_codes import allocate_task_code, allocate_task_codes
+from services.search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, search_tasks_index
+from services.descriptions import QueueFullError, description_pipeline
+from services.events import board_broker, publish_event
+from services.http_cache import conditional_response, entity_etag, page_etag
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, STREAM_BATCH_SIZE, apply_keyset, keyset_page
+from services.task_changes import SNAPSHOT_COLUMNS, TaskSnapshot, apply_task_changes, invalidate_task_caches
+from services.task_tree import DEFAULT_TREE_DEPTH, MAX_TREE_DEPTH, task_tree
+from services.cache import cache, task_tree_key
+from services.serialization import TASK_COLUMNS, entity_dict, json_response, ndjson_line, row_dicts
 
 
 router = APIRouter()
 
 
-NO_DESCRIPTION_GENERATED = "No description generated"
 TASK_NOT_FOUND = "Task not found"
+MAX_BULK_SIZE = 500
+EVENT_HEARTBEAT_SECONDS = 15
 
-@router.post("/")
-def create_task(task: TaskCreate, db: Session = Depends(get_db)):\
 
-    # Find last code
-    last_task = db.query(Task).order_by(Task.code.desc()).first()
-    new_code = int(last_task.code) + 1 if last_task else 1001
+# Stream tasks as newline-delimited JSON straight from a server-side cursor
+async def _stream_tasks(db: AsyncSession, query):
+    query = apply_keyset(query, Task, Task.code, None).execution_options(yield_per=STREAM_BATCH_SIZE)
+    async for row in (await db.stream(query)).mappings():
+        yield ndjson_line(dict(row))
+
+
+# Plain list when no paging is requested, keyset page or NDJSON stream otherwise. Pages and streams run
+# newest task first on the immutable code, so a task edited while a client pages is neither skipped nor
+# repeated (edits arrive on the board event stream).
+# query selects TASK_COLUMNS; rows are encoded straight to JSON without building Task objects.
+async def _list_response(
+    db: AsyncSession, request: Request, response: Response,
+    query, limit: Optional[int], cursor: Optional[str], stream: bool
+):
+    if stream:
+        return StreamingResponse(_stream_tasks(db, query), media_type="application/x-ndjson")
+
+    if limit is None and cursor is None:
+        content = rows = row_dicts(await db.execute(query))
+    else:
+        content = await keyset_page(db, query, Task, Task.code, cursor, limit or DEFAULT_PAGE_SIZE)
+        rows = content["items"]
+
+    # Validator from the rows just loaded (the page's own cost, not a count over every matching task);
+    # a 304 still saves encoding and sending them
+    etag, last_modified = page_etag("tasks", f"{request.url.path}?{request.url.query}", rows)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    return json_response(content, response)
+
+@router.post("/", response_model=TaskCreated)
+async def create_task(task: TaskCreate, db: AsyncSession = Depends(get_db)):
+
+    # Next code from the task code sequence
+    new_code = await allocate_task_code(db)
 
     # Create Task instance with code
     new_task = Task(
@@ -42,16 +91,163 @@ def create_task(task: TaskCreate, db: Session = Depends(get_db)):\
     
     new_task.created_at = datetime.datetime.now(datetime.timezone.utc)
     db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
+    await db.flush()
+    changes = [(None, TaskSnapshot.of(new_task))]
+    await apply_task_changes(db, changes)
+    await db.commit()
+    await db.refresh(new_task)
+
+    await invalidate_task_caches(changes)
+
+    await publish_event("task.created", new_task.project_id, new_task)
     
     return {
         "task": new_task
        
     }
 
-@router.get("/all") # Removed {project_id} because you are passing a List in the query
-def get_all_tasks(
+# One board event per project for a batch of tasks
+async def _publish_tasks(event_type: str, tasks):
+    by_project = defaultdict(list)
+    for task in tasks:
+        by_project[task.project_id].append(task)
+    for project_id, project_tasks in by_project.items():
+        await publish_event(event_type, project_id, {"tasks": project_tasks})
+
+
+def _check_bulk_size(items: list):
+    if not items:
+        raise HTTPException(status_code=400, detail="At least one task is required")
+    if len(items) > MAX_BULK_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_SIZE} tasks per request")
+
+
+# BULK CREATE TASKS
+@router.post("/bulk", response_model=TaskBulkResults)
+async def create_tasks_bulk(tasks: List[TaskCreate], db: AsyncSession = Depends(get_db)):
+    _check_bulk_size(tasks)
+
+    # One sequence round trip for every code, one INSERT ... RETURNING for every row
+    codes = await allocate_task_codes(db, len(tasks))
+    now = datetime.datetime.now(datetime.timezone.utc)
+    rows = [
+        {**task.model_dump(), "code": code, "created_at": now, "updated_at": now}
+        for task, code in zip(tasks, codes)
+    ]
+
+    new_tasks = (await db.scalars(insert(Task).returning(Task), rows)).all()
+    changes = [(None, TaskSnapshot.of(task)) for task in new_tasks]
+    await apply_task_changes(db, changes)
+    await db.commit()
+
+    await invalidate_task_caches(changes)
+
+    await _publish_tasks("tasks.created", new_tasks)
+
+    return {
+        "results": [
+            {"index": index, "id": task.id, "status": "created", "task": task}
+            for index, task in enumerate(new_tasks)
+        ]
+    }
+
+
+# BULK UPDATE TASKS
+@router.patch("/bulk", response_model=TaskBulkResults)
+async def update_tasks_bulk(tasks: List[TaskBulkUpdate], db: AsyncSession = Depends(get_db)):
+    _check_bulk_size(tasks)
+
+    ids = {task.id for task in tasks}
+    # Lock the rows so the before/after snapshots bracket exactly this update
+    before = {
+        row.id: TaskSnapshot.of(row)
+        for row in await db.execute(select(*SNAPSHOT_COLUMNS).where(Task.id.in_(ids)).with_for_update())
+    }
+    found = set(before)
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    rows = [
+        {**task.model_dump(exclude_unset=True), "updated_at": now}
+        for task in tasks
+        if task.id in found
+    ]
+
+    # UPDATE by primary key, batched into executemany
+    if rows:
+        await db.execute(update(Task), rows)
+
+    updated = {
+        task.id: task
+        for task in await db.scalars(
+            select(Task).where(Task.id.in_(found)).execution_options(populate_existing=True)
+        )
+    }
+    changes = [(before[task_id], TaskSnapshot.of(task)) for task_id, task in updated.items()]
+    await apply_task_changes(db, changes)
+    await db.commit()
+
+    await invalidate_task_caches(changes)
+
+    await _publish_tasks("tasks.updated", updated.values())
+
+    return {
+        "results": [
+            {"index": index, "id": task.id, "status": "updated", "task": updated[task.id]}
+            if task.id in found else
+            {"index": index, "id": task.id, "status": "not_found"}
+            for index, task in enumerate(tasks)
+        ]
+    }
+
+
+# MOVE TASKS TO A SPRINT (OR BACK TO BACKLOG)
+@router.post("/bulk/move")
+async def move_tasks_bulk(move: TaskBulkMove, db: AsyncSession = Depends(get_db)):
+    _check_bulk_size(move.task_ids)
+
+    values = {
+        "sprint_id": move.sprint_id,
+        "updated_at": datetime.datetime.now(datetime.timezone.utc),
+    }
+    if move.work_flow:
+        values["work_flow"] = move.work_flow
+
+    before = {
+        row.id: TaskSnapshot.of(row)
+        for row in await db.execute(
+            select(*SNAPSHOT_COLUMNS).where(Task.id.in_(move.task_ids)).with_for_update()
+        )
+    }
+    moved_rows = (await db.execute(
+        update(Task)
+        .where(Task.id.in_(move.task_ids))
+        .values(**values)
+        .returning(*SNAPSHOT_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )).all()
+    changes = [(before[row.id], TaskSnapshot.of(row)) for row in moved_rows]
+    await apply_task_changes(db, changes)
+    await db.commit()
+
+    await invalidate_task_caches(changes)
+
+    moved = [row.id for row in moved_rows]
+    by_project = defaultdict(list)
+    for row in moved_rows:
+        by_project[row.project_id].append(row.id)
+    for project_id, task_ids in by_project.items():
+        await publish_event("tasks.moved", project_id, {"task_ids": task_ids, **values})
+
+    return {
+        "moved": sorted(moved),
+        "not_found": sorted(set(move.task_ids) - set(moved)),
+    }
+
+
+@router.get("/all", response_model=list[TaskOut] | TaskPage) # Removed {project_id} because you are passing a List in the query
+async def get_all_tasks(
+    request: Request,
+    response: Response,
     # Use Query() to handle list parameters in the URL correctly
     project_ids: List[int] = Query(...), 
     sprint_ids: Optional[List[int]] = Query(None), 
@@ -62,10 +258,13 @@ def get_all_tasks(
     story_points: Optional[int] = None, 
     description: Optional[str] = None,
     parent_task: Optional[int] = None, 
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
     # 1. Use .in_() for lists instead of the Python 'in' keyword
-    query = db.query(Task).filter(Task.project_id.in_(project_ids))
+    query = select(*TASK_COLUMNS).filter(Task.project_id.in_(project_ids))
 
     if sprint_ids:
         query = query.filter(Task.sprint_id.in_(sprint_ids))
@@ -93,11 +292,13 @@ def get_all_tasks(
     if parent_task is not None:
         query = query.filter(Task.parent_task == parent_task)
 
-    return query.all()
+    return await _list_response(db, request, response, query, limit, cursor, stream)
 
 
-@router.get("/unassigned")
-def get_unassigned_tasks(
+@router.get("/unassigned", response_model=list[TaskOut] | TaskPage)
+async def get_unassigned_tasks(
+    request: Request,
+    response: Response,
     project_ids: List[int] = Query(...), 
     user_ids: Optional[List[int]] = Query(None), 
     sprint_ids: Optional[List[int]] = Query(None), 
@@ -108,10 +309,13 @@ def get_unassigned_tasks(
     story_points: Optional[int] = None, 
     description: Optional[str] = None,
     parent_task: Optional[int] = None, 
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
     # Base query restricted to the projects provided
-    query = db.query(Task).filter(Task.project_id.in_(project_ids))
+    query = select(*TASK_COLUMNS).filter(Task.project_id.in_(project_ids))
 
     if backlog:
         # Pure Backlog:  no sprint
@@ -140,92 +344,168 @@ def get_unassigned_tasks(
     if parent_task is not None:
         query = query.filter(Task.parent_task == parent_task)
 
-    return query.all()
+    return await _list_response(db, request, response, query, limit, cursor, stream)
+
+
+# BOARD EVENTS (Server-Sent Events)
+# Streams task and sprint changes for one project. Reconnecting clients send Last-Event-ID
+# (EventSource does this automatically, or pass ?last_event_id=) and get the events they missed;
+# a "reset" event means the gap is unknown and the board should be reloaded.
+# EventSource cannot send an Authorization header, so the access token may go in ?access_token=.
+@router.get("/events")
+async def board_events_stream(
+    request: Request,
+    project_id: int,
+    last_event_id: Optional[str] = None,
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    async def stream():
+        async with board_broker.subscribe(project_id, last_event_id_header or last_event_id) as subscription:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.get(), EVENT_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield event.to_sse()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # GET TASK BY ID
-@router.get("/{task_id}")
-def get_task(task_id: int, db: Session = Depends(get_db)):
-    task = db.query(Task).filter(Task.id == task_id).first()
+@router.get("/{task_id}", response_model=TaskOut)
+async def get_task(task_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    task = await db.get(Task, task_id)
 
     if not task:
         raise HTTPException(status_code=404, detail=TASK_NOT_FOUND)
 
+    not_modified = conditional_response(request, response, *entity_etag("task", task))
+    if not_modified:
+        return not_modified
+
     return task
 
 
+# TASK TREE
+# The whole subtree under a task (sub-tasks of sub-tasks, ...) from one recursive query,
+# with story points and workflow counts rolled up at every node
+@router.get("/{task_id}/tree")
+async def get_task_tree(
+    task_id: int,
+    max_depth: int = Query(DEFAULT_TREE_DEPTH, ge=0, le=MAX_TREE_DEPTH),
+    db: AsyncSession = Depends(get_db)
+):
+    project_id = await db.scalar(select(Task.project_id).where(Task.id == task_id))
+    if project_id is None:
+        raise HTTPException(status_code=404, detail=TASK_NOT_FOUND)
+
+    async def load():
+        return jsonable_encoder(await task_tree(db, task_id, max_depth))
+
+    tree = await cache.get_or_load(task_tree_key(project_id, task_id, max_depth), load)
+    if not tree:
+        raise HTTPException(status_code=404, detail=TASK_NOT_FOUND)
+    return tree
+
+
 # UPDATE TASK
-@router.patch("/{task_id}")
-def update_task(task_id: int, task: TaskUpdate, db: Session = Depends(get_db)):
-    db_task = db.query(Task).filter(Task.id == task_id).first()
+@router.patch("/{task_id}", response_model=TaskOut)
+async def update_task(task_id: int, task: TaskUpdate, db: AsyncSession = Depends(get_db)):
+    db_task = await db.get(Task, task_id, with_for_update=True)
 
     if not db_task:
         raise HTTPException(status_code=404, detail=TASK_NOT_FOUND)
-    
+
+    before = TaskSnapshot.of(db_task)
     for key, value in task.model_dump(exclude_unset=True).items():
         setattr(db_task, key, value)
 
     db_task.updated_at=  datetime.datetime.now(datetime.timezone.utc)
-    db.commit()
-    db.refresh(db_task)
+    changes = [(before, TaskSnapshot.of(db_task))]
+    await apply_task_changes(db, changes)
+    await db.commit()
+    await db.refresh(db_task)
+
+    await invalidate_task_caches(changes)
+
+    await publish_event("task.updated", db_task.project_id, db_task)
     return db_task
 
 
 
 # UPDATE DESCRIPTION
-@router.patch("/{task_id}/description")
-def update_description(task_id: int, req: PromptRequest, db: Session = Depends(get_db)):
-    db_task = db.query(Task).filter(Task.id == task_id).first()
-    if not db_task:
+# Generation runs in the background description pipeline; the task row is updated when it finishes.
+# wait=true keeps the old behaviour of answering with the updated task.
+@router.patch("/{task_id}/description", status_code=202)
+async def update_description(
+    task_id: int,
+    req: PromptRequest,
+    response: Response,
+    wait: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    exists = await db.scalar(select(Task.id).where(Task.id == task_id))
+    if not exists:
         raise HTTPException(status_code=404, detail=TASK_NOT_FOUND)
 
+    # Give the pool connection back before waiting on the model
+    await db.close()
+
     try:
-        prompt=req.prompt
-        request = PromptRequest(prompt=prompt)
-        result = send_task_to_gemini(request)
-        description = result.get("result", NO_DESCRIPTION_GENERATED)
-       
-    except Exception as e:
-        description = f"Error generating description: {str(e)}"
+        job = description_pipeline.enqueue(task_id, req.prompt)
+    except QueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many descriptions are being generated, try again shortly",
+            headers={"Retry-After": "5"}
+        )
 
-    # Update the task
-    db_task.description = description
-    db_task.updated_at =  datetime.datetime.now(datetime.timezone.utc)
-    db.commit()
-    db.refresh(db_task)
+    if not wait:
+        return {"task_id": task_id, "status": "queued"}
 
-    return db_task
+    await job.done
+    response.status_code = 200
+    return await db.get(Task, task_id, populate_existing=True)
 
 
 
 # DELETE TASK
 @router.delete("/{task_id}")
-def delete_task(task_id: int, db: Session = Depends(get_db)):
-    task = db.query(Task).filter(Task.id == task_id).first()
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_db)):
+    task = await db.get(Task, task_id)
 
     if not task:
         raise HTTPException(status_code=404, detail=TASK_NOT_FOUND)
 
-    db.delete(task)
-    db.commit()
+    changes = [(TaskSnapshot.of(task), None)]
+    await apply_task_changes(db, changes)
+    await db.delete(task)
+    await db.commit()
+
+    await invalidate_task_caches(changes)
+
+    await publish_event("task.deleted", task.project_id, {"id": task_id})
     return {"detail": "Task deleted successfully"}
 
 
 
 # 🔍 SEARCH TASKS
-@router.get("/search/ByTitle")
-def search_tasks(
+@router.get("/search/ByTitle", response_model=list[TaskOut] | str)
+async def search_tasks(
     q: str = Query(..., description="Task title"),
-    db: Session = Depends(get_db)
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    db: AsyncSession = Depends(get_db)
 ):
     search_text = validate_search_query(q)  # ✅ validation used here
 
-    tasks = (
-        db.query(Task)
-        .filter(Task.title.ilike(f"%{search_text}%"))
-        .all()
-    )
+    tasks = await search_tasks_index(db, search_text, limit)
     if len(tasks):
-        return tasks
+        return json_response([entity_dict(task, TASK_COLUMNS) for task in tasks])
     else:
         return "No task is found with your search!"
\ No newline at end of file
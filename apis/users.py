@@ -1,20 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from models.user import User   # correct model
 from models.project import Project
-from apis.schemas.user import UserCreate, UserUpdate, UserGet
+from apis.schemas.user import LoginOut, RefreshRequest, TokenPair, UserCreate, UserUpdate, UserGet, UserOut
+from services.cache import cache, user_key, project_users_key, user_projects_key, PROJECT_USERS_PREFIX
+from services.http_cache import conditional_response, entity_etag, rows_etag
+from services.serialization import USER_COLUMNS, json_response, row_dicts
+from services.soft_delete import INCLUDE_DELETED, mark_deleted
+from services.passwords import PASSWORD_HASH_RETRY_AFTER, HasherBusyError, password_hasher
+from services.auth import (
+    REFRESH, InvalidTokenError, Principal, bearer_scheme, issue_token_pair, request_token, require_self_or_admin,
+    require_user, revocations, token_verifier, unauthorized
+)
+from fastapi.security import HTTPAuthorizationCredentials
+from models.association import user_projects
 import datetime
 from typing import Optional
 
+# Signup, login and token endpoints; everything on `router` needs an access token (see main.py)
+public_router = APIRouter()
 router = APIRouter()
 
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many logins in progress, try again shortly",
+        headers={"Retry-After": PASSWORD_HASH_RETRY_AFTER}
+    )
+
+
 # CREATE USER
-@router.post("/")
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+@public_router.post("/", response_model=dict[str, UserOut])
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
 
-    existing_email = db.query(User).filter(User.email == user.email).first()
+    # Deleted users keep their email and mobile until the purge removes them
+    existing_email = await db.scalar(
+        select(User.id).filter(User.email == user.email).execution_options(**{INCLUDE_DELETED: True})
+    )
     if existing_email:
         # Use HTTPException so the frontend 'catch' block triggers
         raise HTTPException(
@@ -23,103 +49,220 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         )
 
     if user.mobile:
-        existing_mobile = db.query(User).filter(User.mobile == user.mobile).first()
+        existing_mobile = await db.scalar(
+            select(User.id).filter(User.mobile == user.mobile).execution_options(**{INCLUDE_DELETED: True})
+        )
         if existing_mobile:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Mobile number already registered"
             )
         
+    try:
+        password = await password_hasher.hash(user.password)
+    except HasherBusyError:
+        raise _hasher_busy()
+
     new_user = User(**user.model_dump())
+    new_user.password = password
+    # Admin rights are never self-assigned; they are granted in the database
+    new_user.is_admin = False
     new_user.organisation = user.email.split('@')[-1]
     new_user.created_at = datetime.datetime.now(datetime.timezone.utc)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return {"User created successfully": new_user}
 
 
-@router.post("/valid")
-def validate_user(getuser: UserGet, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == getuser.email).first()
+# LOGIN
+@public_router.post("/valid", response_model=LoginOut)
+async def validate_user(getuser: UserGet, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).filter(User.email == getuser.email))
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    if getuser.password != user.password:
-        raise HTTPException(status_code=404, detail="Please check your password")
+    # Give the pool connection back while the hash runs
+    stored_password = user.password
+    await db.close()
+
+    try:
+        if not await password_hasher.verify(stored_password, getuser.password):
+            raise HTTPException(status_code=404, detail="Please check your password")
+
+        # Plaintext rows and hashes made with an older PASSWORD_HASH_METHOD are upgraded in place
+        if await password_hasher.needs_rehash(stored_password):
+            await db.execute(
+                update(User).where(User.id == user.id).values(password=await password_hasher.hash(getuser.password))
+            )
+            await db.commit()
+    except HasherBusyError:
+        raise _hasher_busy()
+
+    return {**UserOut.model_validate(user).model_dump(), **issue_token_pair(user)}
+
+
+# NEW TOKEN PAIR FROM A REFRESH TOKEN
+# Refresh tokens are single use: the presented one is revoked and a new one issued
+@public_router.post("/refresh", response_model=TokenPair)
+async def refresh_tokens(body: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    try:
+        principal = token_verifier.verify(body.refresh_token, REFRESH)
+    except InvalidTokenError as e:
+        raise unauthorized(str(e))
+
+    # Role and organisation are re-read so the new access token reflects them
+    user = await db.get(User, principal.user_id)
+    if not user:
+        raise unauthorized("User no longer exists")
+
+    await revocations.revoke(db, principal)
+    await db.commit()
+    return issue_token_pair(user)
 
-    return user
 
+# LOGOUT
+# Revokes the refresh token, and the access token too when one is sent
+@public_router.post("/logout")
+async def logout(
+    body: RefreshRequest,
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        principals = [token_verifier.verify(body.refresh_token, REFRESH)]
+        access_token = request_token(request, credentials)
+        if access_token:
+            principals.append(token_verifier.verify(access_token))
+    except InvalidTokenError as e:
+        raise unauthorized(str(e))
 
-@router.get("/project/{project_id}")
-def get_users_by_project(project_id: int, db: Session = Depends(get_db), ):
-    return db.query(User).join(User.projects).filter(Project.id == project_id).all()
+    for principal in principals:
+        await revocations.revoke(db, principal)
+    await db.commit()
+    return {"message": "Logged out"}
 
 
-@router.get("/assignproject/{organisation}")  
-def get_users_not_in_project(organisation: str, project_id: int, db: Session = Depends(get_db), ):
+@router.get("/project/{project_id}", response_model=list[UserOut])
+async def get_users_by_project(project_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db), ):
+    async def load():
+        users = row_dicts(await db.execute(
+            select(*USER_COLUMNS).join(user_projects, user_projects.c.user_id == User.id)
+            .where(user_projects.c.project_id == project_id)
+        ))
+        return jsonable_encoder(users)
+
+    users = await cache.get_or_load(project_users_key(project_id), load)
+
+    not_modified = conditional_response(request, response, *rows_etag("users", project_users_key(project_id), users))
+    if not_modified:
+        return not_modified
+
+    return json_response(users, response)
+
+
+@router.get("/assignproject/{organisation}", response_model=list[UserOut])
+async def get_users_not_in_project(organisation: str, project_id: int, db: AsyncSession = Depends(get_db), ):
     
-        return (
-        db.query(User)
+        return json_response(row_dicts(await db.execute(
+        select(*USER_COLUMNS)
         .filter(
             User.organisation == organisation,
             # This selects users who DO NOT have a project with this ID
             ~User.projects.any(Project.id == project_id)
         )
-        .all()
-    )
+    )))
    
-@router.get("/unassignproject/{organisation}")  
-def get_users_in_project(organisation: str, project_id: int, db: Session = Depends(get_db), ):
+@router.get("/unassignproject/{organisation}", response_model=list[UserOut])
+async def get_users_in_project(organisation: str, project_id: int, db: AsyncSession = Depends(get_db), ):
     
-       return (
-        db.query(User)
-        .join(User.projects) # Connects the User table to the Projects table
+       return json_response(row_dicts(await db.execute(
+        select(*USER_COLUMNS)
+        .join(user_projects, user_projects.c.user_id == User.id) # Membership rows of the user
         .filter(
             User.organisation == organisation,
-            Project.id == project_id # Filters for specifically this project
+            user_projects.c.project_id == project_id # Filters for specifically this project
         )
-        .all()
-    )
+    )))
 
 # GET USER BY ID
-@router.get("/{user_id}")
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+@router.get("/{user_id}", response_model=UserOut)
+async def get_user(user_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    async def load():
+        user = (await db.execute(select(*USER_COLUMNS).where(User.id == user_id))).mappings().first()
+        return jsonable_encoder(dict(user)) if user else None
+
+    user = await cache.get_or_load(user_key(user_id), load)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    not_modified = conditional_response(request, response, *entity_etag("user", user))
+    if not_modified:
+        return not_modified
+
     return user
 
 
 # UPDATE USER
-@router.patch("/{user_id}")
-def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.id == user_id).first()
+@router.patch("/{user_id}", response_model=UserOut)
+async def update_user(
+    user_id: int, user: UserUpdate,
+    principal: Principal = Depends(require_user),
+    db: AsyncSession = Depends(get_db)
+):
+    require_self_or_admin(principal, user_id)
+    db_user = await db.get(User, user_id)
 
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    for key, value in user.model_dump(exclude_unset=True).items():
+    changes = user.model_dump(exclude_unset=True)
+    if changes.get("password") is not None:
+        try:
+            changes["password"] = await password_hasher.hash(changes["password"])
+        except HasherBusyError:
+            raise _hasher_busy()
+        # Sessions opened with the old password end with it, this one included
+        await revocations.revoke_user(db, user_id)
+
+    for key, value in changes.items():
         setattr(db_user, key, value)
     
     db_user.updated_at =  datetime.datetime.now(datetime.timezone.utc)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+
+    # Project member lists embed the user too
+    await cache.invalidate(user_key(user_id))
+    await cache.invalidate_prefix(PROJECT_USERS_PREFIX)
     return db_user
 
 
 # DELETE USER
 @router.delete("/{user_id}")
-def delete_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def delete_user(user_id: int, principal: Principal = Depends(require_user), db: AsyncSession = Depends(get_db)):
+    require_self_or_admin(principal, user_id)
+    user = await db.get(User, user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    db.delete(user)
-    db.commit()
+    # A project cannot be left without a manager
+    if await db.scalar(select(Project.id).where(Project.manager_id == user_id).limit(1)):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="User manages projects; reassign or delete them first"
+        )
+
+    # Login and refresh stop at once; assignments, comments and memberships go in the background
+    # (services/purge.py)
+    mark_deleted(user)
+    await db.commit()
+
+    await cache.invalidate(user_key(user_id), user_projects_key(user_id))
+    await cache.invalidate_prefix(PROJECT_USERS_PREFIX)
     return {"message": "User deleted successfully"}
\ No newline at end of file
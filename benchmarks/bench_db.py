@@ -0,0 +1,23 @@
+# Database selection shared by the benchmark scripts. database.py reads POSTGRES_URL when it is
+# imported, so scripts call use_database() before importing anything that touches it.
+import os
+
+from sqlalchemy.dialects.postgresql import CITEXT
+from sqlalchemy.ext.compiler import compiles
+
+
+# A file next to the current directory; enough for query counts and relative comparisons
+DEFAULT_BENCH_DATABASE_URL = "sqlite:///bench.sqlite"
+
+
+# SQLite stand-in for Postgres: CITEXT columns become case-insensitive TEXT
+@compiles(CITEXT, "sqlite")
+def _citext_on_sqlite(type_, compiler, **kw):
+    return "TEXT COLLATE NOCASE"
+
+
+def use_database(url: str | None):
+    if url:
+        os.environ["POSTGRES_URL"] = url
+    os.environ.setdefault("POSTGRES_URL", DEFAULT_BENCH_DATABASE_URL)
+    return os.environ["POSTGRES_URL"]
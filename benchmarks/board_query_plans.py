@@ -0,0 +1,157 @@
+# Query plans and latency of the board filters with and without the composite/partial indexes.
+#
+#   POSTGRES_URL=postgresql://.../sprint_bench python -m benchmarks.board_query_plans
+#
+# Needs a throwaway Postgres database: it migrates it, seeds BENCH_TASKS tasks (default 1M)
+# once, then EXPLAIN ANALYZEs each query with the indexes in place and again after dropping
+# them inside a transaction that is rolled back.
+import argparse
+import statistics
+
+from sqlalchemy import select, text
+
+from database import engine
+from models.task import Task
+from services.migrations import upgrade_database
+
+
+BOARD_INDEXES = [
+    "ix_task_project_sprint",
+    "ix_task_project_user",
+    "ix_task_project_workflow",
+    "ix_task_project_code",
+    "ix_task_backlog_user",
+    "ix_task_sprint_unassigned",
+    "ix_task_parent_task",
+]
+
+PROJECTS = 20
+SPRINTS_PER_PROJECT = 10
+USERS = 50
+PAGE_SIZE = 100
+
+
+def seed(conn, tasks: int):
+    existing = conn.scalar(text("SELECT count(*) FROM task"))
+    if existing >= tasks:
+        return
+
+    if not conn.scalar(text("SELECT count(*) FROM project WHERE title LIKE 'Bench project %'")):
+        _seed_board(conn)
+
+    # Spread tasks over projects; a third sit in the backlog, a fifth are unassigned
+    conn.execute(text(
+        "WITH projects AS (SELECT array_agg(id ORDER BY id) AS ids FROM project), "
+        "users AS (SELECT array_agg(id ORDER BY id) AS ids FROM \"user\"), "
+        "sprints AS (SELECT project_id, array_agg(id ORDER BY id) AS ids FROM sprint GROUP BY project_id) "
+        "INSERT INTO task (work_type, code, title, work_flow, story_points, priority, user_id, sprint_id, "
+        "project_id, description, created_at, updated_at) "
+        "SELECT 'Task', nextval('task_code_seq'), 'Bench task ' || t.g, "
+        "(enum_range(NULL::workflow_enum))[1 + t.g % 8], 1 + t.g % 13, "
+        "(enum_range(NULL::status_enum))[1 + t.g % 6], "
+        "CASE WHEN t.g % 5 = 0 THEN NULL ELSE u.ids[1 + t.g % array_length(u.ids, 1)] END, "
+        "CASE WHEN t.g % 3 = 0 THEN NULL ELSE s.ids[1 + t.g % array_length(s.ids, 1)] END, "
+        "t.project_id, 'Seeded for the board query benchmark', "
+        "now() - t.g * interval '1 second', now() - t.g * interval '1 second' "
+        "FROM (SELECT g, p.ids[1 + g % array_length(p.ids, 1)] AS project_id "
+        "      FROM generate_series(1, :count) g CROSS JOIN projects p) t "
+        "JOIN sprints s ON s.project_id = t.project_id CROSS JOIN users u"
+    ), {"count": tasks - existing})
+    conn.commit()
+
+
+def _seed_board(conn):
+    conn.execute(text(
+        'INSERT INTO "user" (full_name, email, password, is_admin, created_at, updated_at) '
+        "SELECT 'Bench ' || g, 'bench' || g || '@bench.test', 'x', false, now(), now() "
+        "FROM generate_series(1, :users) g ON CONFLICT DO NOTHING"
+    ), {"users": USERS})
+    conn.execute(text(
+        "INSERT INTO project (title, manager_id, created_at, updated_at) "
+        "SELECT 'Bench project ' || g, (SELECT min(id) FROM \"user\"), now(), now() "
+        "FROM generate_series(1, :projects) g"
+    ), {"projects": PROJECTS})
+    conn.execute(text(
+        "INSERT INTO sprint (start_date, end_date, project_id, status, created_at, updated_at) "
+        "SELECT now() + s * interval '14 days', now() + (s + 1) * interval '14 days', p.id, false, now(), now() "
+        "FROM project p CROSS JOIN generate_series(0, :sprints - 1) s"
+    ), {"sprints": SPRINTS_PER_PROJECT})
+
+
+# The query shapes apis/tasks.py builds for /tasks/all and /tasks/unassigned
+def board_queries(conn) -> dict:
+    project_id = conn.scalar(text("SELECT min(project_id) FROM task"))
+    sprint_id = conn.scalar(text("SELECT min(sprint_id) FROM task WHERE project_id = :p"), {"p": project_id})
+    user_id = conn.scalar(text("SELECT min(user_id) FROM task WHERE project_id = :p"), {"p": project_id})
+    parent_id = conn.scalar(text("SELECT min(id) FROM task WHERE project_id = :p"), {"p": project_id})
+
+    base = select(Task).filter(Task.project_id.in_([project_id]))
+    return {
+        "project": base,
+        "project + sprint": base.filter(Task.sprint_id.in_([sprint_id])),
+        "project + assignee": base.filter(Task.user_id.in_([user_id])),
+        "project + workflow": base.filter(Task.work_flow == "In Progress"),
+        "backlog by assignee": base.filter(Task.user_id.in_([user_id]), Task.sprint_id.is_(None)),
+        "sprint unassigned": base.filter(Task.sprint_id.in_([sprint_id]), Task.user_id.is_(None)),
+        "sub-tasks": base.filter(Task.parent_task == parent_id),
+    }
+
+
+def _index_names(plan: dict) -> set[str]:
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", ()):
+        names |= _index_names(child)
+    return names
+
+
+def explain(conn, stmt, runs: int) -> tuple[float, str, set[str]]:
+    stmt = stmt.order_by(Task.code.desc(), Task.id.desc()).limit(PAGE_SIZE)
+    sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+
+    timings, plan = [], None
+    for _ in range(runs):
+        result = conn.scalar(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"))[0]
+        timings.append(result["Execution Time"])
+        plan = result["Plan"]
+    return statistics.median(timings), plan["Node Type"], _index_names(plan)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Board query plans with and without the board indexes")
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("board_query_plans needs a Postgres POSTGRES_URL")
+
+    upgrade_database()
+    with engine.connect() as conn:
+        seed(conn, args.tasks)
+        conn.execute(text("ANALYZE task"))
+        conn.commit()
+
+        queries = board_queries(conn)
+        conn.commit()
+
+        with_indexes = {name: explain(conn, stmt, args.runs) for name, stmt in queries.items()}
+        conn.commit()
+
+        # DROP INDEX is transactional; the rollback puts every index back untouched
+        for index in BOARD_INDEXES:
+            conn.execute(text(f"DROP INDEX {index}"))
+        without_indexes = {name: explain(conn, stmt, args.runs) for name, stmt in queries.items()}
+        conn.rollback()
+
+    print(f"{'query':<22} {'without (ms)':>12} {'with (ms)':>10} {'speedup':>8}  plan with indexes")
+    for name in queries:
+        before, _, _ = without_indexes[name]
+        after, node, indexes = with_indexes[name]
+        print(
+            f"{name:<22} {before:>12.2f} {after:>10.2f} {before / after if after else 0:>7.1f}x  "
+            f"{node} {', '.join(sorted(indexes)) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+# Load test: drives the app in-process through a weighted mix of board loads (page by page and
+# from the board snapshot endpoint), backlog grooming,
+# search, task creation/updates and sprint planning against a database filled by benchmarks/seed.py.
+# Reports throughput, p50/p95/p99 latency and SQL statements per request for every scenario.
+#
+#   python -m benchmarks.seed --tasks 100000
+#   python -m benchmarks.load_test --concurrency 20 --seconds 30 --output results.json
+#
+# CI check against the committed baseline (SQLite serialises writers, so keep it to one virtual user;
+# the load test writes, so seed a fresh database for every comparison):
+#   python -m benchmarks.seed --tasks 20000
+#   python -m benchmarks.load_test --concurrency 1 --iterations 500 --baseline benchmarks/baseline.json
+#
+# With --baseline it exits non-zero when a scenario's p95 grows by more than --tolerance or it issues
+# more SQL statements per run than the baseline; --write-baseline records the current run instead.
+# Statement counts hold on any machine; latencies only compare against a baseline from the same setup.
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import httpx
+
+from benchmarks.bench_db import use_database
+
+
+# Every virtual user shares one client address; measure the app, not the rate limiter
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+SEARCH_TERMS = ("login", "payment", "dashboard", "export", "billing", "sync", "invoice", "audit")
+DEFAULT_SECONDS = 30.0
+PAGE_SIZE = 100
+BOARD_FIELDS = "code,title,work_type,priority,story_points,user_id,parent_task"
+PLANNING_BATCH = 20
+# Statement counts are deterministic, so allow only a little slack for cache hits and misses
+QUERY_TOLERANCE = 0.1
+# SQLite serialises writers, so concurrent writes there fail now and then ("database is locked",
+# task codes allocated as max + 1); compare failure rates, not counts
+ERROR_RATE_TOLERANCE = 0.02
+
+
+@dataclass
+class Project:
+    id: int
+    members: list[int]
+    sprints: list[int]
+    active_sprint: int | None
+
+
+@dataclass
+class Member:
+    id: int
+    token: str
+    projects: list[Project]
+
+
+@dataclass
+class ScenarioStats:
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    errors: int = 0
+    error_statuses: dict[int, int] = field(default_factory=dict)
+
+
+# One scenario run is one or more requests; its latency is the sum and its queries the total
+class Session:
+
+    def __init__(self, client: httpx.AsyncClient, member: Member):
+        self.client = client
+        self.headers = {"Authorization": f"Bearer {member.token}"}
+        self.queries = 0
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        match = SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+        if match:
+            self.queries += int(match.group(1))
+        response.raise_for_status()
+        return response
+
+
+def _page_rows(response: httpx.Response) -> list[dict]:
+    body = response.json()
+    return body["items"] if isinstance(body, dict) else body
+
+
+async def board_load(session: Session, member: Member, project: Project, rng: random.Random):
+    await session.request("GET", f"/projects/{project.id}")
+    await session.request("GET", f"/sprints/{project.id}")
+    await session.request("GET", f"/users/project/{project.id}")
+    if project.active_sprint is not None:
+        await session.request("GET", "/tasks/all", params={
+            "project_ids": project.id, "sprint_ids": project.active_sprint, "limit": PAGE_SIZE,
+        })
+
+
+# The same board from the one-request snapshot endpoint, without descriptions
+async def board_snapshot(session: Session, member: Member, project: Project, rng: random.Random):
+    params = {"fields": BOARD_FIELDS}
+    if project.active_sprint is not None:
+        params["sprint_ids"] = project.active_sprint
+    await session.request("GET", f"/projects/{project.id}/board", params=params)
+
+
+async def backlog(session: Session, member: Member, project: Project, rng: random.Random):
+    page = (await session.request("GET", "/tasks/unassigned", params={
+        "project_ids": project.id, "backlog": True, "limit": PAGE_SIZE,
+    })).json()
+    # Groomers look past the first page now and then
+    if page.get("next_cursor") and rng.random() < 0.3:
+        await session.request("GET", "/tasks/unassigned", params={
+            "project_ids": project.id, "backlog": True, "limit": PAGE_SIZE, "cursor": page["next_cursor"],
+        })
+
+
+async def search(session: Session, member: Member, project: Project, rng: random.Random):
+    term = rng.choice(SEARCH_TERMS)
+    if rng.random() < 0.5:
+        await session.request("POST", "/search_bar/", json={"search_bar": term})
+    else:
+        await session.request("GET", "/tasks/search/ByTitle", params={"q": term})
+
+
+async def create_task(session: Session, member: Member, project: Project, rng: random.Random):
+    await session.request("POST", "/tasks/", json={
+        "title": f"{rng.choice(SEARCH_TERMS).capitalize()} load test task",
+        "work_type": rng.choice(("Bug", "Task", "Story")),
+        "work_flow": "Backlog",
+        "priority": rng.choice(("Major", "Medium", "Minor")),
+        "story_points": rng.choice((1, 2, 3, 5, 8)),
+        "user_id": rng.choice(project.members),
+        "project_id": project.id,
+        "description": "Created by benchmarks/load_test.py",
+    })
+
+
+async def update_task(session: Session, member: Member, project: Project, rng: random.Random):
+    params = {"project_ids": project.id, "limit": 20}
+    if project.active_sprint is not None:
+        params["sprint_ids"] = project.active_sprint
+    tasks = _page_rows(await session.request("GET", "/tasks/all", params=params))
+    if tasks:
+        task = rng.choice(tasks)
+        await session.request("PATCH", f"/tasks/{task['id']}", json={
+            "work_flow": rng.choice(("To Do", "In Progress", "QA", "Review", "Done")),
+        })
+
+
+async def sprint_planning(session: Session, member: Member, project: Project, rng: random.Random):
+    if project.active_sprint is None:
+        return
+    tasks = _page_rows(await session.request("GET", "/tasks/unassigned", params={
+        "project_ids": project.id, "backlog": True, "limit": PLANNING_BATCH,
+    }))
+    if tasks:
+        await session.request("POST", "/tasks/bulk/move", json={
+            "task_ids": [task["id"] for task in tasks], "sprint_id": project.active_sprint, "work_flow": "To Do",
+        })
+    await session.request("GET", f"/sprints/{project.active_sprint}/burndown")
+
+
+# Weights roughly follow what board users do in a working day
+SCENARIOS = {
+    "board_load": (board_load, 20),
+    "board_snapshot": (board_snapshot, 20),
+    "backlog": (backlog, 15),
+    "search": (search, 15),
+    "create_task": (create_task, 15),
+    "update_task": (update_task, 10),
+    "sprint_planning": (sprint_planning, 5),
+}
+
+
+async def load_members() -> list[Member]:
+    from sqlalchemy import select
+
+    from benchmarks.seed import BENCH_DOMAIN
+    from database import AsyncSessionLocal
+    from models.association import user_projects
+    from models.sprint import Sprint
+    from models.user import User
+    from services.auth import issue_token_pair
+
+    async with AsyncSessionLocal() as db:
+        users = (await db.execute(
+            select(User.id, User.organisation, User.is_admin).where(User.email.like(f"%.{BENCH_DOMAIN}"))
+        )).all()
+        memberships = (await db.execute(
+            select(user_projects.c.user_id, user_projects.c.project_id)
+            .where(user_projects.c.user_id.in_([user.id for user in users]))
+        )).all()
+        project_ids = {row.project_id for row in memberships}
+        sprints = (await db.execute(
+            select(Sprint.id, Sprint.project_id, Sprint.status)
+            .where(Sprint.project_id.in_(project_ids))
+            .order_by(Sprint.start_date)
+        )).all()
+
+    if not memberships:
+        raise SystemExit("No benchmark data found; run python -m benchmarks.seed first")
+
+    members_by_project, projects_by_user = defaultdict(list), defaultdict(list)
+    for row in memberships:
+        members_by_project[row.project_id].append(row.user_id)
+        projects_by_user[row.user_id].append(row.project_id)
+    sprints_by_project, active = defaultdict(list), {}
+    for sprint in sprints:
+        sprints_by_project[sprint.project_id].append(sprint.id)
+        if sprint.status:
+            active[sprint.project_id] = sprint.id
+
+    projects = {
+        project_id: Project(project_id, members_by_project[project_id], sprints_by_project[project_id], active.get(project_id))
+        for project_id in project_ids
+    }
+    return [
+        Member(user.id, issue_token_pair(user)["access_token"], [projects[pid] for pid in sorted(projects_by_user[user.id])])
+        for user in users
+        if projects_by_user[user.id]
+    ]
+
+
+async def count_tasks() -> int:
+    from sqlalchemy import func, select
+
+    from database import AsyncSessionLocal
+    from models.task import Task
+
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.count(Task.id)))
+
+
+async def virtual_user(client, members, rng, deadline, remaining, results):
+    names = list(SCENARIOS)
+    weights = [SCENARIOS[name][1] for name in names]
+    while time.perf_counter() < deadline and (remaining is None or remaining[0] > 0):
+        if remaining is not None:
+            remaining[0] -= 1
+        name = rng.choices(names, weights)[0]
+        member = rng.choice(members)
+        session = Session(client, member)
+
+        started = time.perf_counter()
+        try:
+            await SCENARIOS[name][0](session, member, rng.choice(member.projects), rng)
+        except httpx.HTTPStatusError as error:
+            status = error.response.status_code
+            results[name].errors += 1
+            results[name].error_statuses[status] = results[name].error_statuses.get(status, 0) + 1
+            continue
+        results[name].latencies.append(time.perf_counter() - started)
+        results[name].queries.append(session.queries)
+
+
+def percentile(samples: list[float], pct: int) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100)[pct - 1]
+
+
+def summarize(results: dict, elapsed: float) -> dict:
+    summary = {}
+    for name in SCENARIOS:
+        stats = results[name]
+        samples = stats.latencies
+        summary[name] = {
+            "count": len(samples),
+            "errors": stats.errors,
+            "error_statuses": {str(status): count for status, count in sorted(stats.error_statuses.items())},
+            "throughput": round(len(samples) / elapsed, 2),
+            "p50_ms": round(percentile(samples, 50) * 1000, 2),
+            "p95_ms": round(percentile(samples, 95) * 1000, 2),
+            "p99_ms": round(percentile(samples, 99) * 1000, 2),
+            "queries_mean": round(statistics.fmean(stats.queries), 2) if stats.queries else 0.0,
+            "queries_max": max(stats.queries, default=0),
+        }
+    return summary
+
+
+def print_summary(summary: dict, elapsed: float):
+    print(f"{'scenario':<16} {'count':>7} {'errors':>6} {'per s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+    for name, row in summary.items():
+        print(
+            f"{name:<16} {row['count']:>7} {row['errors']:>6} {row['throughput']:>8.1f} {row['p50_ms']:>8.1f}"
+            f" {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['queries_mean']:>8.1f}"
+        )
+    total = sum(row["count"] for row in summary.values())
+    print(f"{total} scenario runs in {elapsed:.1f}s ({total / elapsed:.1f}/s)")
+
+
+def _error_rate(row: dict) -> float:
+    runs = row["count"] + row["errors"]
+    return row["errors"] / runs if runs else 0.0
+
+
+# A list of human-readable regressions; empty when the run is within tolerance of the baseline
+def compare(summary: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, expected in baseline["scenarios"].items():
+        actual = summary.get(name)
+        if not actual or not actual["count"]:
+            continue
+        if _error_rate(actual) > _error_rate(expected) + ERROR_RATE_TOLERANCE:
+            regressions.append(
+                f"{name}: {_error_rate(actual):.1%} of runs failed (baseline {_error_rate(expected):.1%})"
+            )
+        if actual["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {actual['p95_ms']:.1f} ms (baseline {expected['p95_ms']:.1f} ms)")
+        if actual["queries_mean"] > expected["queries_mean"] * (1 + QUERY_TOLERANCE) + 0.5:
+            regressions.append(
+                f"{name}: {actual['queries_mean']:.1f} queries per run (baseline {expected['queries_mean']:.1f})"
+            )
+    return regressions
+
+
+async def run(args) -> dict:
+    from database import async_engine
+    from main import app
+
+    try:
+        members = await load_members()
+        tasks = await count_tasks()
+
+        results = defaultdict(ScenarioStats)
+        remaining = [args.iterations] if args.iterations else None
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            started = time.perf_counter()
+            seconds = args.seconds or (math.inf if args.iterations else DEFAULT_SECONDS)
+            deadline = started + seconds
+            await asyncio.gather(*(
+                virtual_user(client, members, random.Random(f"{args.seed}-{index}"), deadline, remaining, results)
+                for index in range(args.concurrency)
+            ))
+            elapsed = time.perf_counter() - started
+    finally:
+        await async_engine.dispose()
+
+    return {
+        "settings": {
+            "database": async_engine.dialect.name,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "members": len(members),
+            "tasks": tasks,
+            "weights": {name: weight for name, (_, weight) in SCENARIOS.items()},
+        },
+        "elapsed_seconds": round(elapsed, 2),
+        "scenarios": summarize(results, elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test against a seeded database")
+    parser.add_argument("--database-url", help="defaults to POSTGRES_URL, then sqlite:///bench.sqlite")
+    parser.add_argument("--concurrency", type=int, default=20, help="virtual users")
+    parser.add_argument("--seconds", type=float, help="run for this long (default 30, or until --iterations)")
+    parser.add_argument("--iterations", type=int, help="stop after this many scenario runs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed p95 growth over the baseline")
+    parser.add_argument("--write-baseline", action="store_true", help="save this run as --baseline")
+    args = parser.parse_args()
+
+    print(f"Load testing {use_database(args.database_url)}")
+    report = asyncio.run(run(args))
+    print_summary(report["scenarios"], report["elapsed_seconds"])
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+    if args.baseline and args.write_baseline:
+        with open(args.baseline, "w") as output:
+            json.dump(report, output, indent=2)
+            output.write("\n")
+        print(f"Baseline written to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as source:
+            baseline = json.load(source)
+        if baseline.get("settings", {}).get("database") != report["settings"]["database"]:
+            print("warning: baseline was recorded on a different database; latencies are not comparable")
+        regressions = compare(report["scenarios"], baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"Within tolerance of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
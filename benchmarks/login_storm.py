@@ -0,0 +1,110 @@
+# Login storm: many concurrent POST /users/valid while a probe keeps reading GET /users/{id}.
+# Shows login p99 and non-login p99 with hashing on the bounded pool, and with --inline the same
+# storm with hashes computed on the event loop (what a naive KDF call in the handler would do).
+#
+#   POSTGRES_URL=postgresql://.../sprint_bench python -m benchmarks.login_storm --concurrency 50 --seconds 10
+#
+# Runs the app in-process against POSTGRES_URL (migrated first); PASSWORD_HASH_* settings apply.
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from uuid import uuid4
+
+import httpx
+
+# The storm comes from one client address; measure hashing, not the auth route's rate limit
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import apis.users
+from database import async_engine
+from services.migrations import upgrade_database
+from services.passwords import PasswordHasher
+
+
+class InlineHasher(PasswordHasher):
+
+    async def _run(self, fn, *args):
+        return fn(*args)
+
+
+def percentile(samples: list[float], pct: int) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100)[pct - 1]
+
+
+async def login_worker(client: httpx.AsyncClient, body: dict, deadline: float, latencies: list[float], statuses: dict):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.post("/users/valid", json=body)
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code == 503:
+            await asyncio.sleep(float(response.headers.get("Retry-After", "1")))
+
+
+async def probe_worker(client: httpx.AsyncClient, user_id: int, deadline: float, latencies: list[float]):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(f"/users/{user_id}")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+
+
+async def run(concurrency: int, seconds: float, inline: bool):
+    from main import app
+
+    if inline:
+        apis.users.password_hasher = InlineHasher()
+
+    password = uuid4().hex
+    body = {"email": f"storm-{uuid4().hex[:8]}@bench.test", "password": password}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        created = await client.post("/users/", json=body)
+        created.raise_for_status()
+        user_id = created.json()["User created successfully"]["id"]
+        login = await client.post("/users/valid", json=body)
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+
+        login_latencies, probe_latencies, statuses = [], [], {}
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            probe_worker(client, user_id, deadline, probe_latencies),
+            *(login_worker(client, body, deadline, login_latencies, statuses) for _ in range(concurrency)),
+        )
+
+    hasher = apis.users.password_hasher
+    mode = "inline on the event loop" if inline else f"pool of {hasher.workers}, backlog {hasher.queue_size}"
+    print(f"{concurrency} concurrent logins for {seconds:.0f}s, {hasher.method} ({mode})")
+    print(f"{'requests':<10} {'count':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, samples in (("login", login_latencies), ("non-login", probe_latencies)):
+        print(f"{name:<10} {len(samples):>7} {percentile(samples, 50) * 1000:>8.1f} {percentile(samples, 99) * 1000:>8.1f}")
+    print("login statuses:", ", ".join(f"{status}={count}" for status, count in sorted(statuses.items())))
+
+
+async def _run_and_dispose(concurrency: int, seconds: float, inline: bool):
+    try:
+        await run(concurrency, seconds, inline)
+    finally:
+        apis.users.password_hasher.shutdown()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login and non-login latency under a login storm")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--inline", action="store_true", help="hash on the event loop instead of the pool")
+    args = parser.parse_args()
+
+    upgrade_database()
+    asyncio.run(_run_and_dispose(args.concurrency, args.seconds, args.inline))
+
+
+if __name__ == "__main__":
+    main()
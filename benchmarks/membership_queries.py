@@ -0,0 +1,116 @@
+# Regression check: project membership endpoints issue the same number of SQL statements
+# whether they add/remove 1 member or thousands.
+#
+#   POSTGRES_URL=postgresql://.../sprint_bench python -m benchmarks.membership_queries
+#
+# Runs the app in-process against POSTGRES_URL (migrated first), creates throwaway users,
+# and exits non-zero if the statement count grows with the member count.
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import event, insert
+
+from database import AsyncSessionLocal, async_engine
+from models.user import User
+from services.auth import issue_token_pair
+from services.migrations import upgrade_database
+
+
+class StatementCounter:
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+async def create_users(count: int) -> list[int]:
+    tag = uuid4().hex[:8]
+    async with AsyncSessionLocal() as db:
+        ids = list(await db.scalars(
+            insert(User).returning(User.id),
+            [
+                {"email": f"member-{tag}-{i}@bench.test", "password": "x", "is_admin": False}
+                for i in range(count)
+            ],
+        ))
+        await db.commit()
+    return ids
+
+
+async def measure(client: httpx.AsyncClient, counter: StatementCounter, method: str, url: str, body: dict):
+    counter.count = 0
+    started = time.perf_counter()
+    response = await client.request(method, url, json=body)
+    elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    return counter.count, elapsed, response
+
+
+async def run(sizes: list[int]) -> bool:
+    from main import app
+
+    counter = StatementCounter()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+
+    manager_id = (await create_users(1))[0]
+    async with AsyncSessionLocal() as db:
+        token = issue_token_pair(await db.get(User, manager_id))["access_token"]
+
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        for size in sizes:
+            user_ids = await create_users(size)
+
+            create_count, create_time, response = await measure(
+                client, counter, "POST", "/projects/",
+                {"title": f"Membership bench {size}", "users": user_ids, "manager_id": manager_id},
+            )
+            project_id = response.json()["id"]
+
+            extra_ids = await create_users(size)
+            add_count, add_time, _ = await measure(
+                client, counter, "POST", f"/projects/add-users/{project_id}", {"user_ids": user_ids + extra_ids}
+            )
+            remove_count, remove_time, _ = await measure(
+                client, counter, "POST", f"/projects/remove-users/{project_id}", {"user_ids": extra_ids}
+            )
+            results.append((size, create_count, add_count, remove_count, create_time, add_time, remove_time))
+
+    print(f"{'members':>8} {'create q':>9} {'add q':>6} {'remove q':>9} {'create ms':>10} {'add ms':>8} {'remove ms':>10}")
+    for size, create_count, add_count, remove_count, create_time, add_time, remove_time in results:
+        print(
+            f"{size:>8} {create_count:>9} {add_count:>6} {remove_count:>9} "
+            f"{create_time * 1000:>10.1f} {add_time * 1000:>8.1f} {remove_time * 1000:>10.1f}"
+        )
+
+    constant = len({result[1:4] for result in results}) == 1
+    print("statement counts constant" if constant else "statement counts grow with member count: N+1 regression")
+    return constant
+
+
+async def _run_and_dispose(sizes: list[int]) -> bool:
+    try:
+        return await run(sizes)
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statement counts of the project membership endpoints")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    args = parser.parse_args()
+
+    upgrade_database()
+    if not asyncio.run(_run_and_dispose(args.sizes)):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
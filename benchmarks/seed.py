@@ -0,0 +1,179 @@
+# Seeds synthetic organisations, users, projects, sprints and tasks for benchmarks/load_test.py.
+#
+#   python -m benchmarks.seed --tasks 100000                                   # SQLite stand-in (bench.sqlite)
+#   python -m benchmarks.seed --database-url postgresql://.../sprint_bench --tasks 2000000
+#
+# Migrates an empty database first. Tasks go through apply_task_changes, like the API's writes, so the
+# sprint summaries and the task_event log agree with them. The same --seed gives the same data.
+import argparse
+import asyncio
+import datetime
+import random
+import time
+
+from benchmarks.bench_db import use_database
+
+
+BENCH_DOMAIN = "bench.test"
+BENCH_PASSWORD = "bench-password"
+CHUNK_SIZE = 5000
+SPRINT_DAYS = 14
+
+# Small vocabulary so searches in the load test have realistic hit counts
+TITLE_WORDS = (
+    "login", "payment", "dashboard", "export", "search", "report", "sync", "billing", "profile",
+    "upload", "notification", "api", "cache", "import", "onboarding", "settings", "invoice", "audit",
+)
+STORY_POINTS = (None, 1, 2, 3, 5, 8, 13)
+
+
+def bench_email(org: int, user: int) -> str:
+    return f"user{user}@org{org}.{BENCH_DOMAIN}"
+
+
+async def _seed_people_and_projects(db, args, rng, now) -> list[dict]:
+    from sqlalchemy import insert
+
+    from models.association import user_projects
+    from models.project import Project
+    from models.sprint import Sprint
+    from models.user import User
+    from services.passwords import password_hasher
+
+    # One hash shared by every seeded user, so seeding does not spend minutes in scrypt
+    password = await password_hasher.hash(BENCH_PASSWORD)
+    projects = []
+    for org in range(args.orgs):
+        user_ids = list(await db.scalars(insert(User).returning(User.id), [
+            {
+                "full_name": f"Bench User {org}-{user}",
+                "email": bench_email(org, user),
+                "password": password,
+                # user.organisation is unique, so only the organisation's first user (its manager) carries it
+                "organisation": f"org{org}.{BENCH_DOMAIN}" if user == 0 else None,
+                "is_admin": user == 0,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for user in range(args.users_per_org)
+        ]))
+
+        for index in range(args.projects_per_org):
+            project_id = await db.scalar(insert(Project).returning(Project.id).values(
+                title=f"Org {org} project {index}", manager_id=user_ids[0], created_at=now, updated_at=now
+            ))
+            members = rng.sample(user_ids, max(1, len(user_ids) * 2 // 3))
+            if user_ids[0] not in members:
+                members.append(user_ids[0])
+            await db.execute(insert(user_projects), [
+                {"user_id": user_id, "project_id": project_id} for user_id in members
+            ])
+
+            # Consecutive sprints ending with the current one, which is the only active sprint
+            first_start = now - datetime.timedelta(days=SPRINT_DAYS * (args.sprints_per_project - 1) + SPRINT_DAYS // 2)
+            sprint_ids = list(await db.scalars(insert(Sprint).returning(Sprint.id), [
+                {
+                    "start_date": first_start + datetime.timedelta(days=SPRINT_DAYS * number),
+                    "end_date": first_start + datetime.timedelta(days=SPRINT_DAYS * (number + 1)),
+                    "project_id": project_id,
+                    "status": number == args.sprints_per_project - 1,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for number in range(args.sprints_per_project)
+            ]))
+            projects.append({"id": project_id, "members": members, "sprints": sprint_ids})
+
+    await db.commit()
+    return projects
+
+
+def _task_row(rng, project: dict, code: int, number: int, parents: list[int], now) -> dict:
+    from models.task import Priority, WorkType, Workflow
+
+    created_at = now - datetime.timedelta(seconds=rng.randint(0, 180 * 24 * 3600))
+    return {
+        "code": code,
+        "title": f"{rng.choice(TITLE_WORDS).capitalize()} {rng.choice(TITLE_WORDS)} {number}",
+        "work_type": rng.choice(WorkType),
+        "work_flow": rng.choice(Workflow),
+        "priority": rng.choice(Priority),
+        "story_points": rng.choice(STORY_POINTS),
+        "user_id": rng.choice(project["members"]) if rng.random() < 0.8 else None,
+        # Roughly two thirds planned into a sprint, the rest in the backlog
+        "sprint_id": rng.choice(project["sprints"]) if rng.random() < 0.65 else None,
+        "parent_task": rng.choice(parents) if parents and rng.random() < 0.1 else None,
+        "project_id": project["id"],
+        "description": f"Synthetic task {number}: {' '.join(rng.choices(TITLE_WORDS, k=8))}",
+        "created_at": created_at,
+        "updated_at": created_at + datetime.timedelta(seconds=rng.randint(0, 7 * 24 * 3600)),
+    }
+
+
+async def _seed_tasks(db, args, rng, projects: list[dict], now):
+    from sqlalchemy import insert
+
+    from models.task import Task
+    from services.task_changes import SNAPSHOT_COLUMNS, TaskSnapshot, apply_task_changes
+    from services.task_codes import allocate_task_codes
+
+    per_project, remainder = divmod(args.tasks, len(projects))
+    started = time.perf_counter()
+    seeded = 0
+    for index, project in enumerate(projects):
+        count = per_project + (1 if index < remainder else 0)
+        parents: list[int] = []
+        for offset in range(0, count, CHUNK_SIZE):
+            size = min(CHUNK_SIZE, count - offset)
+            codes = await allocate_task_codes(db, size)
+            rows = [_task_row(rng, project, code, offset + i, parents, now) for i, code in enumerate(codes)]
+            created = (await db.execute(insert(Task).returning(*SNAPSHOT_COLUMNS), rows)).all()
+            await apply_task_changes(db, [(None, TaskSnapshot.of(row)) for row in created])
+            await db.commit()
+
+            # Sub-tasks point at recent tasks of the same project
+            parents = (parents + [row.id for row in created])[-1000:]
+            seeded += size
+        print(f"  {seeded}/{args.tasks} tasks ({seeded / (time.perf_counter() - started):.0f}/s)", flush=True)
+
+
+async def seed(args):
+    from sqlalchemy import func, select
+
+    from database import AsyncSessionLocal, async_engine
+    from models.user import User
+
+    rng = random.Random(args.seed)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    try:
+        async with AsyncSessionLocal() as db:
+            if await db.scalar(select(func.count(User.id)).where(User.email.like(f"%.{BENCH_DOMAIN}"))):
+                raise SystemExit("This database already holds benchmark data; seed an empty database")
+
+            projects = await _seed_people_and_projects(db, args, rng, now)
+            print(f"{args.orgs} organisations, {args.orgs * args.users_per_org} users, {len(projects)} projects")
+            await _seed_tasks(db, args, rng, projects, now)
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a database for the load test")
+    parser.add_argument("--database-url", help="defaults to POSTGRES_URL, then sqlite:///bench.sqlite")
+    parser.add_argument("--orgs", type=int, default=10)
+    parser.add_argument("--users-per-org", type=int, default=20)
+    parser.add_argument("--projects-per-org", type=int, default=5)
+    parser.add_argument("--sprints-per-project", type=int, default=6)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"Seeding {use_database(args.database_url)}")
+    from services.migrations import upgrade_database
+
+    upgrade_database()
+    asyncio.run(seed(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# Per-request CPU of a large task list response: ORM objects through jsonable_encoder (the old path)
+# against column-only rows encoded with orjson (what /tasks/all does now).
+#
+#   POSTGRES_URL=postgresql://.../sprint_bench python -m benchmarks.serialization --tasks 10000
+#
+# Seeds one throwaway project with --tasks tasks, then times both paths --repeat times.
+import argparse
+import asyncio
+import datetime
+import statistics
+import time
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import insert, select
+
+from database import AsyncSessionLocal, async_engine
+from models.project import Project
+from models.task import Task
+from models.user import User
+from services.migrations import upgrade_database
+from services.serialization import TASK_COLUMNS, json_response, row_dicts
+from services.task_codes import allocate_task_codes
+
+
+async def seed(task_count: int) -> int:
+    tag = uuid4().hex[:8]
+    now = datetime.datetime.now(datetime.timezone.utc)
+    async with AsyncSessionLocal() as db:
+        manager_id = await db.scalar(
+            insert(User).returning(User.id).values(email=f"serialization-{tag}@bench.test", password="x", is_admin=False)
+        )
+        project_id = await db.scalar(
+            insert(Project).returning(Project.id).values(title=f"Serialization bench {tag}", manager_id=manager_id)
+        )
+        codes = await allocate_task_codes(db, task_count)
+        await db.execute(insert(Task), [
+            {
+                "code": code, "title": f"Task {i} {tag}", "work_type": "Task", "work_flow": "To Do",
+                "priority": "Medium", "story_points": i % 8, "project_id": project_id,
+                "description": f"Benchmark task {i} with a description of ordinary length",
+                "created_at": now, "updated_at": now,
+            }
+            for i, code in enumerate(codes)
+        ])
+        await db.commit()
+    return project_id
+
+
+async def orm_response(project_id: int) -> bytes:
+    async with AsyncSessionLocal() as db:
+        tasks = (await db.scalars(select(Task).where(Task.project_id == project_id))).all()
+        return JSONResponse(jsonable_encoder(tasks)).body
+
+
+async def rows_response(project_id: int) -> bytes:
+    async with AsyncSessionLocal() as db:
+        rows = row_dicts(await db.execute(select(*TASK_COLUMNS).where(Task.project_id == project_id)))
+        return json_response(rows).body
+
+
+async def measure(build, project_id: int, repeat: int) -> tuple[list[float], list[float], int]:
+    # One warm-up so connection setup and statement compilation are not counted
+    size = len(await build(project_id))
+    cpu, wall = [], []
+    for _ in range(repeat):
+        cpu_started, wall_started = time.process_time(), time.perf_counter()
+        await build(project_id)
+        cpu.append(time.process_time() - cpu_started)
+        wall.append(time.perf_counter() - wall_started)
+    return cpu, wall, size
+
+
+async def run(task_count: int, repeat: int):
+    project_id = await seed(task_count)
+    results = [
+        ("orm + jsonable_encoder", *await measure(orm_response, project_id, repeat)),
+        ("rows + orjson", *await measure(rows_response, project_id, repeat)),
+    ]
+
+    print(f"{task_count} tasks per response, {repeat} requests per path")
+    print(f"{'path':<24} {'cpu ms':>8} {'wall ms':>8} {'bytes':>10}")
+    for name, cpu, wall, size in results:
+        print(f"{name:<24} {statistics.median(cpu) * 1000:>8.1f} {statistics.median(wall) * 1000:>8.1f} {size:>10}")
+
+    before, after = statistics.median(results[0][1]), statistics.median(results[1][1])
+    print(f"cpu per request: {before / after:.1f}x less with rows + orjson")
+
+
+async def _run_and_dispose(task_count: int, repeat: int):
+    try:
+        await run(task_count, repeat)
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU per request of large task list responses")
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    upgrade_database()
+    asyncio.run(_run_and_dispose(args.tasks, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,126 @@
 import os
-from sqlalchemy import create_engine
+import time
+from uuid import uuid4
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from sqlalchemy.orm import sessionmaker, declarative_base
 from fastapi import Depends
 from typing import Annotated
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 
+from services.metrics import Counter, Histogram
+from services.sql_metrics import instrument_engine
+
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("POSTGRES_URL")
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Connection pool settings, per worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _env_flag("DB_POOL_PRE_PING", True)
+# 0 disables the server-side statement timeout
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+# Transaction-pooling PgBouncer: no client-side pool and no named prepared statements
+DB_PGBOUNCER = _env_flag("DB_PGBOUNCER", False)
+
+# Async driver used by the API for each database backend
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str):
+    url = make_url(url)
+    connect_args = {}
+
+    # asyncpg takes ssl= instead of libpq's sslmode= (hosted Postgres URLs carry sslmode=require)
+    sslmode = url.query.get("sslmode")
+    if url.get_backend_name() in ("postgres", "postgresql") and sslmode:
+        url = url.difference_update_query(["sslmode"])
+        connect_args["ssl"] = sslmode
+
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+    return url.set(drivername=drivername), connect_args
+
+
+# Checkout wait times and timeouts for the async pool, exposed through pool_stats()
+pool_wait_seconds = Histogram()
+pool_timeouts = Counter()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - started)
+
+
+def _is_postgres(url) -> bool:
+    return url.get_backend_name() in ("postgres", "postgresql")
+
+
+def _pool_options(url, pool_class=None) -> dict:
+    if DB_PGBOUNCER:
+        # PgBouncer owns pooling; a second pool in front of it only holds server slots hostage
+        return {"poolclass": NullPool}
+
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if _is_postgres(url):
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+        if pool_class:
+            options["poolclass"] = pool_class
+    return options
+
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+def _async_engine_options(url, connect_args: dict) -> dict:
+    connect_args = dict(connect_args)
+    if _is_postgres(url):
+        if DB_PGBOUNCER:
+            # PgBouncer rejects startup parameters and cannot share prepared statements between clients
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+        elif DB_STATEMENT_TIMEOUT_MS:
+            connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
+    return {"connect_args": connect_args, **_pool_options(url, InstrumentedAsyncPool)}
+
+
+def _sync_engine_options(url) -> dict:
+    connect_args = {}
+    if _is_postgres(url) and DB_STATEMENT_TIMEOUT_MS and not DB_PGBOUNCER:
+        connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+    return {"connect_args": connect_args, **_pool_options(url)}
+
+
+# Sync engine: startup DDL, scripts and tests
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_sync_engine_options(make_url(SQLALCHEMY_DATABASE_URL)))
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -21,14 +129,58 @@ SessionLocal = sessionmaker(
 )
 
 
+# Async engine: every API route
+ASYNC_DATABASE_URL, ASYNC_CONNECT_ARGS = to_async_url(SQLALCHEMY_DATABASE_URL)
+if DB_PGBOUNCER and _is_postgres(ASYNC_DATABASE_URL):
+    ASYNC_DATABASE_URL = ASYNC_DATABASE_URL.update_query_dict({"prepared_statement_cache_size": "0"})
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_async_engine_options(ASYNC_DATABASE_URL, ASYNC_CONNECT_ARGS))
+
+# Query count/time per request and slow-query log (services/sql_metrics.py)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    # Rows are serialized after commit; keep their loaded state instead of reloading lazily
+    expire_on_commit=False,
+)
+
+
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Pool occupancy plus checkout wait distribution for sizing pools per worker
+def pool_stats() -> dict:
+    pool = async_engine.pool
+    stats = {
+        "pool_class": type(pool).__name__,
+        "pgbouncer_mode": DB_PGBOUNCER,
+        "timeouts": pool_timeouts.value,
+        "wait_seconds": pool_wait_seconds.snapshot(),
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=DB_MAX_OVERFLOW,
+        )
+    return stats
+
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
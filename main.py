@@ -1,22 +1,70 @@
-from fastapi import FastAPI
-from database import Base, engine
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
+from fastapi.concurrency import run_in_threadpool
 from apis.tasks import router as task_router
 from apis.projects import router as project_router
-from apis.users import router as user_router
+from apis.users import public_router as user_public_router, router as user_router
 from apis.sprints import router as sprint_router
 from apis.search_bar import router as search_router
+from apis.comments import router as comment_router
 from fastapi.middleware.cors import CORSMiddleware
 from apis.ai import router as ai_router
+from apis.health import router as health_router
+from apis.metrics import require_metrics_access, router as metrics_router
+from database import async_engine, engine
+from services.migrations import DB_MIGRATE_ON_STARTUP, upgrade_database
+from services.descriptions import description_pipeline
+from services.events import board_events
+from services.task_events import task_event_partitions
+from services.project_stats import PROJECT_COUNTER_RECONCILE_SECONDS, project_counter_reconciliation
+from services.purge import PURGE_INTERVAL_SECONDS, soft_delete_purge
+from services.passwords import password_hasher
+from services.auth import require_user, token_revocations
+from services.rate_limit import RateLimitMiddleware
+from services.request_metrics import RequestMetricsMiddleware
 
 
 
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema changes live in migrations/ (Alembic); create_all never altered existing tables
+    if DB_MIGRATE_ON_STARTUP:
+        await run_in_threadpool(upgrade_database)
+    await board_events.start()
+    description_pipeline.start()
+    task_event_partitions.start()
+    token_revocations.start()
+    if PROJECT_COUNTER_RECONCILE_SECONDS:
+        project_counter_reconciliation.start()
+    if PURGE_INTERVAL_SECONDS:
+        soft_delete_purge.start()
+    yield
+    await soft_delete_purge.stop()
+    await project_counter_reconciliation.stop()
+    await token_revocations.stop()
+    await task_event_partitions.stop()
+    await description_pipeline.stop()
+    await board_events.stop()
+    # Close pooled connections (and aiosqlite's connection threads, which otherwise keep the process alive)
+    await async_engine.dispose()
+    engine.dispose()
+    password_hasher.shutdown()
+
+
 app = FastAPI(
     title="Sprint Manager API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+# Innermost: times the routed request and counts its SQL; rate-limited requests never reach it
+app.add_middleware(RequestMetricsMiddleware)
+
+# Added before CORS so that CORS wraps it and 429/503 answers still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "https://sprint-manager-six.vercel.app"], # React / Next.js
@@ -24,14 +72,20 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-# Create PostgreSQL tables
-Base.metadata.create_all(bind=engine)
 
 
+# Every router except signup/login and health needs a bearer access token (services/auth.py)
+authenticated = [Depends(require_user)]
+
 # Include API Routes
-app.include_router(task_router, prefix="/tasks", tags=["Tasks"])
-app.include_router(project_router, prefix="/projects", tags=["Projects"])
-app.include_router(user_router, prefix="/users", tags=["Users"])
-app.include_router(sprint_router, prefix="/sprints", tags=["Sprints"])
-app.include_router(ai_router,prefix="/ai",tags=["Ai"])
-app.include_router(search_router,prefix="/search_bar",tags=["Search"])
+app.include_router(task_router, prefix="/tasks", tags=["Tasks"], dependencies=authenticated)
+app.include_router(project_router, prefix="/projects", tags=["Projects"], dependencies=authenticated)
+app.include_router(user_public_router, prefix="/users", tags=["Users"])
+app.include_router(user_router, prefix="/users", tags=["Users"], dependencies=authenticated)
+app.include_router(sprint_router, prefix="/sprints", tags=["Sprints"], dependencies=authenticated)
+app.include_router(comment_router, prefix="/comments", tags=["Comments"], dependencies=authenticated)
+app.include_router(ai_router,prefix="/ai",tags=["Ai"], dependencies=authenticated)
+app.include_router(search_router,prefix="/search_bar",tags=["Search"], dependencies=authenticated)
+app.include_router(health_router,prefix="/health",tags=["Health"])
+# Scraped with METRICS_TOKEN (or an admin's access token) rather than a user session
+app.include_router(metrics_router, dependencies=[Depends(require_metrics_access)])
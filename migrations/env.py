@@ -0,0 +1,56 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from database import Base, engine
+
+# Every model module, so autogenerate sees the full schema
+import models.association  # noqa: F401
+import models.comment  # noqa: F401
+import models.project  # noqa: F401
+import models.project_task_counter  # noqa: F401
+import models.revoked_token  # noqa: F401
+import models.sprint  # noqa: F401
+import models.sprint_summary  # noqa: F401
+import models.task  # noqa: F401
+import models.task_event  # noqa: F401
+import models.user  # noqa: F401
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    # services/migrations.py passes in a connection that already holds the migration lock
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,120 @@
+"""Baseline: the schema create_all produced before migrations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import CITEXT
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+WORK_TYPE = ("Bug", "Task", "Story", "Review", "Closed - Won't Do")
+WORKFLOW = ("Backlog", "To Do", "In Progress", "On Hold", "QA", "Review", "Closed - Won't Do", "Done")
+PRIORITY = ("Blocker", "Critical", "Major", "Medium", "Minor", "Trivial")
+
+
+def _timestamps():
+    return (
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+    # Databases created by create_all already have these tables; leave them as they are
+    existing = set() if op.get_context().as_sql else set(sa.inspect(bind).get_table_names())
+
+    if bind.dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS citext")
+
+    if "user" not in existing:
+        op.create_table(
+            "user",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("full_name", sa.String(), nullable=True),
+            sa.Column("email", CITEXT(), nullable=False),
+            sa.Column("password", sa.String(), nullable=False),
+            sa.Column("mobile", sa.String(), nullable=True),
+            sa.Column("role", sa.String(), nullable=True),
+            sa.Column("location", sa.String(), nullable=True),
+            sa.Column("organisation", CITEXT(), nullable=True),
+            sa.Column("is_admin", sa.Boolean(), nullable=True),
+            *_timestamps(),
+            sa.UniqueConstraint("mobile"),
+        )
+        op.create_index("ix_user_id", "user", ["id"])
+        op.create_index("ix_user_email", "user", ["email"], unique=True)
+        op.create_index("ix_user_full_name", "user", ["full_name"])
+        op.create_index("ix_user_role", "user", ["role"])
+        op.create_index("ix_user_location", "user", ["location"])
+        op.create_index("ix_user_organisation", "user", ["organisation"], unique=True)
+
+    if "project" not in existing:
+        op.create_table(
+            "project",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("title", sa.String(), nullable=True),
+            sa.Column("manager_id", sa.Integer(), sa.ForeignKey("user.id"), nullable=False),
+            *_timestamps(),
+        )
+        op.create_index("ix_project_id", "project", ["id"])
+        op.create_index("ix_project_title", "project", ["title"])
+
+    if "sprint" not in existing:
+        op.create_table(
+            "sprint",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("start_date", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("end_date", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("project_id", sa.Integer(), sa.ForeignKey("project.id"), nullable=True),
+            sa.Column("status", sa.Boolean(), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index("ix_sprint_id", "sprint", ["id"])
+
+    if "user_projects" not in existing:
+        op.create_table(
+            "user_projects",
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), primary_key=True),
+            sa.Column("project_id", sa.Integer(), sa.ForeignKey("project.id"), primary_key=True),
+        )
+
+    if "task" not in existing:
+        op.create_table(
+            "task",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("work_type", sa.Enum(*WORK_TYPE, name="work_type_enum"), nullable=False),
+            sa.Column("code", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("work_flow", sa.Enum(*WORKFLOW, name="workflow_enum"), nullable=True),
+            sa.Column("story_points", sa.Integer(), nullable=True),
+            sa.Column("priority", sa.Enum(*PRIORITY, name="status_enum"), nullable=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), nullable=True),
+            sa.Column("parent_task", sa.Integer(), sa.ForeignKey("task.id"), nullable=True),
+            sa.Column("sprint_id", sa.Integer(), sa.ForeignKey("sprint.id"), nullable=True),
+            sa.Column("project_id", sa.Integer(), sa.ForeignKey("project.id"), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            *_timestamps(),
+        )
+        op.create_index("ix_task_id", "task", ["id"])
+        op.create_index("ix_task_code", "task", ["code"], unique=True)
+        op.create_index("ix_task_title", "task", ["title"])
+
+
+def downgrade():
+    op.drop_table("task")
+    op.drop_table("user_projects")
+    op.drop_table("sprint")
+    op.drop_table("project")
+    op.drop_table("user")
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TYPE IF EXISTS work_type_enum")
+        op.execute("DROP TYPE IF EXISTS workflow_enum")
+        op.execute("DROP TYPE IF EXISTS status_enum")
@@ -0,0 +1,43 @@
+"""Task code sequence and search indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# Same expression as models.task.TASK_SEARCH_VECTOR, frozen at this revision
+TASK_SEARCH_VECTOR = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+
+# Postgres only: SQLite has no sequences, and search falls back to an in-process index there
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE SEQUENCE IF NOT EXISTS task_code_seq START WITH 1001")
+    # Tables created before the sequence already hold codes; move it past them
+    op.execute(
+        "SELECT setval('task_code_seq', m) "
+        "FROM (SELECT MAX(code) AS m FROM task) s "
+        "WHERE m IS NOT NULL AND m >= (SELECT last_value FROM task_code_seq)"
+    )
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(f"CREATE INDEX IF NOT EXISTS ix_task_search_tsv ON task USING gin (({TASK_SEARCH_VECTOR}))")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_task_title_trgm ON task USING gin (title gin_trgm_ops)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_task_title_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_task_search_tsv")
+    op.execute("DROP SEQUENCE IF EXISTS task_code_seq")
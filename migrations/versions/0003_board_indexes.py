@@ -0,0 +1,47 @@
+"""Composite and partial indexes for the board filters
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, partial index predicate)
+INDEXES = [
+    ("ix_task_project_sprint", "task", ["project_id", "sprint_id"], None),
+    ("ix_task_project_user", "task", ["project_id", "user_id"], None),
+    ("ix_task_project_workflow", "task", ["project_id", "work_flow"], None),
+    ("ix_task_project_updated", "task", ["project_id", "updated_at", "id"], None),
+    ("ix_task_backlog_user", "task", ["project_id", "user_id"], "sprint_id IS NULL"),
+    ("ix_task_sprint_unassigned", "task", ["sprint_id"], "user_id IS NULL"),
+    ("ix_task_parent_task", "task", ["parent_task"], None),
+    ("ix_sprint_project_dates", "sprint", ["project_id", "start_date", "end_date"], None),
+    ("ix_user_projects_project_id", "user_projects", ["project_id"], None),
+]
+
+
+# CONCURRENTLY keeps the task table writable while the indexes build; it cannot run inside a transaction
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            predicate = sa.text(where) if where else None
+            op.create_index(
+                name, table, columns,
+                postgresql_where=predicate,
+                sqlite_where=predicate,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,46 @@
+"""Per-sprint, per-day summary for burndown and velocity
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "sprint_daily_summary",
+        sa.Column("sprint_id", sa.Integer(), sa.ForeignKey("sprint.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("scope_points", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("scope_tasks", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("completed_points", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("completed_tasks", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    # Backfill from the current tasks: scope lands on the sprint's first day, completed work on the
+    # day the task was last updated (the closest record there is of when it was finished)
+    op.execute(
+        "INSERT INTO sprint_daily_summary (sprint_id, day, scope_points, scope_tasks, completed_points, completed_tasks) "
+        "SELECT sprint_id, day, SUM(scope_points), SUM(scope_tasks), SUM(completed_points), SUM(completed_tasks) "
+        "FROM ("
+        "  SELECT t.sprint_id, DATE(s.start_date) AS day, COALESCE(t.story_points, 0) AS scope_points, "
+        "         1 AS scope_tasks, 0 AS completed_points, 0 AS completed_tasks "
+        "  FROM task t JOIN sprint s ON s.id = t.sprint_id "
+        "  UNION ALL "
+        "  SELECT t.sprint_id, DATE(t.updated_at), 0, 0, COALESCE(t.story_points, 0), 1 "
+        "  FROM task t WHERE t.sprint_id IS NOT NULL AND t.work_flow = 'Done'"
+        ") changes "
+        "GROUP BY sprint_id, day"
+    )
+
+
+def downgrade():
+    op.drop_table("sprint_daily_summary")
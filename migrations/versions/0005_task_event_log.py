@@ -0,0 +1,74 @@
+"""Append-only task_event log, partitioned by month on Postgres
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# Later months are created by services/task_events.py (task_event_partitions job)
+MONTHS_AHEAD = 3
+
+WORKFLOW = ("Backlog", "To Do", "In Progress", "On Hold", "QA", "Review", "Closed - Won't Do", "Done")
+
+
+def _month_start(day: datetime.date, offset: int) -> datetime.date:
+    month = day.month - 1 + offset
+    return datetime.date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_table(
+            "task_event",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("task_id", sa.Integer(), nullable=False),
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("sprint_id", sa.Integer(), nullable=True),
+            sa.Column("from_work_flow", sa.Enum(*WORKFLOW, name="workflow_enum"), nullable=True),
+            sa.Column("to_work_flow", sa.Enum(*WORKFLOW, name="workflow_enum"), nullable=True),
+            sa.Column("story_points", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        )
+    else:
+        # The partition key has to be part of the primary key
+        op.execute(
+            "CREATE TABLE task_event ("
+            " id BIGINT GENERATED BY DEFAULT AS IDENTITY,"
+            " task_id INTEGER NOT NULL,"
+            " project_id INTEGER NOT NULL,"
+            " sprint_id INTEGER,"
+            " from_work_flow workflow_enum,"
+            " to_work_flow workflow_enum,"
+            " story_points INTEGER,"
+            " created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),"
+            " PRIMARY KEY (id, created_at)"
+            ") PARTITION BY RANGE (created_at)"
+        )
+        op.execute("CREATE TABLE task_event_default PARTITION OF task_event DEFAULT")
+
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        for offset in range(MONTHS_AHEAD + 1):
+            start, end = _month_start(today, offset), _month_start(today, offset + 1)
+            op.execute(
+                f"CREATE TABLE task_event_{start:%Y_%m} PARTITION OF task_event "
+                f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+            )
+
+    # Created on the parent, so every partition gets its own copy
+    op.create_index("ix_task_event_project_created", "task_event", ["project_id", "created_at"])
+    op.create_index("ix_task_event_task_created", "task_event", ["task_id", "created_at"])
+
+
+def downgrade():
+    # Dropping the partitioned parent drops every partition
+    op.drop_table("task_event")
@@ -0,0 +1,27 @@
+"""Revoked token ids for logout and refresh token rotation
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "revoked_token",
+        sa.Column("jti", sa.String(), primary_key=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_revoked_token_expires_at", "revoked_token", ["expires_at"])
+
+
+def downgrade():
+    op.drop_table("revoked_token")
@@ -0,0 +1,41 @@
+"""Per-project task counters by workflow, priority and assignee
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "project_task_counter",
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("project.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("dimension", sa.String(), primary_key=True),
+        sa.Column("value", sa.String(), primary_key=True),
+        sa.Column("tasks", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("story_points", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    # Backfill from the current tasks
+    for dimension, value in (
+        ("work_flow", "CAST(work_flow AS VARCHAR)"),
+        ("priority", "CAST(priority AS VARCHAR)"),
+        ("assignee", "CAST(user_id AS VARCHAR)"),
+    ):
+        op.execute(
+            "INSERT INTO project_task_counter (project_id, dimension, value, tasks, story_points) "
+            f"SELECT project_id, '{dimension}', COALESCE({value}, ''), COUNT(*), COALESCE(SUM(story_points), 0) "
+            f"FROM task GROUP BY project_id, COALESCE({value}, '')"
+        )
+
+
+def downgrade():
+    op.drop_table("project_task_counter")
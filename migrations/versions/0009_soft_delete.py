@@ -0,0 +1,33 @@
+"""Soft delete markers on project, sprint and user
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+TABLES = ("project", "sprint", "user")
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True))
+        # Partial: only rows waiting to be purged, so the index stays tiny
+        op.create_index(
+            f"ix_{table}_deleted_at", table, ["deleted_at"],
+            postgresql_where=sa.text("deleted_at IS NOT NULL"),
+            sqlite_where=sa.text("deleted_at IS NOT NULL"),
+        )
+
+
+def downgrade():
+    for table in TABLES:
+        op.drop_index(f"ix_{table}_deleted_at", table_name=table)
+        op.drop_column(table, "deleted_at")
@@ -0,0 +1,26 @@
+"""Comments outlive their author: comment.user_id is cleared when the user is purged
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Batch mode: SQLite cannot ALTER a column's nullability in place
+    with op.batch_alter_table("comment") as batch:
+        batch.alter_column("user_id", existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade():
+    op.execute("DELETE FROM comment WHERE user_id IS NULL")
+    with op.batch_alter_table("comment") as batch:
+        batch.alter_column("user_id", existing_type=sa.Integer(), nullable=False)
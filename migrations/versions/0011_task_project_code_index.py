@@ -0,0 +1,32 @@
+"""Task list pages are keyed on (code, id) instead of the mutable updated_at
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+# CONCURRENTLY keeps the task table writable while the index builds; it cannot run inside a transaction
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_task_project_code", "task", ["project_id", "code", "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index("ix_task_project_updated", table_name="task", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_task_project_updated", "task", ["project_id", "updated_at", "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index("ix_task_project_code", table_name="task", postgresql_concurrently=True, if_exists=True)
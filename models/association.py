@@ -1,9 +1,11 @@
-from sqlalchemy import Table, Column, Integer, ForeignKey
+from sqlalchemy import Table, Column, Integer, ForeignKey, Index
 from database import Base
 
 user_projects = Table(
     "user_projects",
     Base.metadata,
     Column("user_id", Integer, ForeignKey("user.id"), primary_key=True),
-    Column("project_id", Integer, ForeignKey("project.id"), primary_key=True)
+    Column("project_id", Integer, ForeignKey("project.id"), primary_key=True),
+    # The primary key serves user -> projects; this serves project -> users
+    Index("ix_user_projects_project_id", "project_id"),
 )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, String
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, String, text
 from sqlalchemy.orm import relationship
 from datetime import datetime,timezone
 from database import Base
@@ -7,25 +7,46 @@ from database import Base
 class Comment(Base):
     
     __tablename__ = "comment"
+    __table_args__ = (
+        # Keyset pages of a task's top-level comments (apis/comments.py)
+        Index(
+            "ix_comment_task_roots", "task_id", "updated_at", "id",
+            postgresql_where=text("parent_id IS NULL"),
+            sqlite_where=text("parent_id IS NULL"),
+        ),
+        Index("ix_comment_thread_id", "thread_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
-    task_id = Column(Integer, ForeignKey("task.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    task_id = Column(Integer, ForeignKey("task.id", ondelete="CASCADE"), nullable=False)
+    # NULL once the author has been purged (services/purge.py); the comment stays in its thread
+    user_id = Column(Integer, ForeignKey("user.id"), nullable=True)
 
     content = Column(String, nullable=False)
 
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
 
-    parent_id = Column(Integer, ForeignKey("comment.id"), nullable=True)
+    parent_id = Column(Integer, ForeignKey("comment.id", ondelete="CASCADE"), nullable=True)
+    # Top-level comment of the thread (its own id for top-level comments); a whole thread loads with one IN
+    thread_id = Column(Integer, ForeignKey("comment.id", ondelete="CASCADE"), nullable=True)
 
-    # Relationships
-    task = relationship("Task", back_populates="comments")
-    user = relationship("User", back_populates="comments")
+    # Relationships; lazy="raise" because a lazy load per comment is an N+1 (and fails on AsyncSession).
+    # Threads are loaded in bulk by thread_id and assembled in memory instead.
+    task = relationship("Task", lazy="raise")
+    user = relationship("User", lazy="raise")
 
+    parent = relationship(
+        "Comment",
+        remote_side=[id],
+        foreign_keys=[parent_id],
+        back_populates="replies",
+        lazy="raise",
+    )
     replies = relationship(
         "Comment",
-        backref="parent",
-        remote_side=[id]
-    )
\ No newline at end of file
+        foreign_keys=[parent_id],
+        back_populates="parent",
+        lazy="raise",
+    )
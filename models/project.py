@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, text
 from database import Base
 from sqlalchemy.orm import relationship
 from datetime import datetime,timezone
@@ -6,10 +6,20 @@ from models.association import user_projects
 
 class Project(Base):
     __tablename__="project"
-    
+    # Soft-deleted projects waiting for the purge worker (services/purge.py)
+    __table_args__ = (
+        Index(
+            "ix_project_deleted_at", "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
+
     id=Column(Integer,primary_key=True,index=True)
     title=Column(String,index=True)
     manager_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     users = relationship("User", secondary=user_projects, back_populates="projects")
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    # Set by DELETE; every query skips the row from then on (services/soft_delete.py)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
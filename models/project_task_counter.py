@@ -0,0 +1,16 @@
+from sqlalchemy import Column, ForeignKey, Integer, String
+from database import Base
+
+
+# Live task counts per project by workflow state, priority and assignee, maintained by
+# services/task_changes.py on every task write; services/project_stats.py reads and reconciles them.
+# `value` is the workflow/priority name or the assignee's user id, "" when the task has none.
+class ProjectTaskCounter(Base):
+    __tablename__ = "project_task_counter"
+
+    project_id = Column(Integer, ForeignKey("project.id", ondelete="CASCADE"), primary_key=True)
+    dimension = Column(String, primary_key=True)
+    value = Column(String, primary_key=True)
+
+    tasks = Column(Integer, nullable=False, default=0, server_default="0")
+    story_points = Column(Integer, nullable=False, default=0, server_default="0")
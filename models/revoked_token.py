@@ -0,0 +1,11 @@
+from sqlalchemy import Column, DateTime, String
+from database import Base
+
+
+# Token ids (jti) revoked by logout or refresh rotation; each worker mirrors the unexpired rows in memory
+# (services/auth.py), and rows are dropped once the token would have expired anyway
+class RevokedToken(Base):
+    __tablename__ = "revoked_token"
+
+    jti = Column(String, primary_key=True)
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Boolean, Index, text
 from database import Base
 from datetime import datetime,timezone
 
@@ -7,11 +7,23 @@ from datetime import datetime,timezone
 class Sprint(Base):
 
     __tablename__="sprint"
-    
+    # Overlap check in create_sprint and the per-project sprint list
+    __table_args__ = (
+        Index("ix_sprint_project_dates", "project_id", "start_date", "end_date"),
+        # Soft-deleted sprints waiting for the purge worker (services/purge.py)
+        Index(
+            "ix_sprint_deleted_at", "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
+
     id=Column(Integer,primary_key=True,index=True)
     start_date= Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     end_date= Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     project_id = Column(Integer, ForeignKey("project.id"), nullable=True)
     status = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    # Set by DELETE; every query skips the row from then on (services/soft_delete.py)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
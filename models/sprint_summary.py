@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey
+from database import Base
+
+
+# Net change per sprint per day, maintained by services/task_changes.py on every task write.
+# Burndown and velocity sum these rows instead of scanning the task table.
+class SprintDailySummary(Base):
+    __tablename__ = "sprint_daily_summary"
+
+    sprint_id = Column(Integer, ForeignKey("sprint.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    # Story points / tasks that entered (+) or left (-) the sprint
+    scope_points = Column(Integer, nullable=False, default=0, server_default="0")
+    scope_tasks = Column(Integer, nullable=False, default=0, server_default="0")
+    # Story points / tasks that reached (+) or left (-) a completed workflow state
+    completed_points = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_tasks = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Enum, Text, ForeignKey, DateTime, Sequence, Index, text
 from database import Base
 from datetime import datetime, timezone
 
@@ -7,11 +7,43 @@ WorkType = ('Bug', 'Task', 'Story', 'Review', 'Closed - Won\'t Do')
 Workflow = ('Backlog', 'To Do', 'In Progress', 'On Hold', 'QA', 'Review' , 'Closed - Won\'t Do', 'Done')
 Priority = ('Blocker', 'Critical', 'Major','Medium', 'Minor', 'Trivial')
 
+# Task codes come from this sequence (see services/task_codes.py) instead of max(code) + 1
+TASK_CODE_SEQUENCE = Sequence("task_code_seq", start=1001, metadata=Base.metadata)
+
+# Full-text document for task search; queries must use the exact same expression to hit the GIN index
+TASK_SEARCH_VECTOR = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
 
 
 class Task(Base):
     __tablename__ = "task"
     # __table_args__ = {'schema': 'public'}
+    __table_args__ = (
+        # Search indexes (services/search.py); Postgres only, needs the pg_trgm extension
+        Index("ix_task_search_tsv", text(TASK_SEARCH_VECTOR), postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index(
+            "ix_task_title_trgm", "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # Board filters (apis/tasks.py): every list is scoped to project_id and paged by (code, id)
+        Index("ix_task_project_sprint", "project_id", "sprint_id"),
+        Index("ix_task_project_user", "project_id", "user_id"),
+        Index("ix_task_project_workflow", "project_id", "work_flow"),
+        Index("ix_task_project_code", "project_id", "code", "id"),
+        # Backlog (no sprint) by assignee, and unassigned tasks of a sprint
+        Index(
+            "ix_task_backlog_user", "project_id", "user_id",
+            postgresql_where=text("sprint_id IS NULL"),
+            sqlite_where=text("sprint_id IS NULL"),
+        ),
+        Index(
+            "ix_task_sprint_unassigned", "sprint_id",
+            postgresql_where=text("user_id IS NULL"),
+            sqlite_where=text("user_id IS NULL"),
+        ),
+        Index("ix_task_parent_task", "parent_task"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
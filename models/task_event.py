@@ -0,0 +1,25 @@
+from sqlalchemy import BigInteger, Column, DateTime, Enum, Index, Integer
+from database import Base
+from datetime import datetime, timezone
+
+from models.task import Workflow
+
+
+# Append-only workflow history, one row per status change (create and delete included).
+# On Postgres the table is range-partitioned by month on created_at (see migration 0005), so its
+# real primary key is (id, created_at); task_id has no foreign key so history survives deletes.
+class TaskEvent(Base):
+    __tablename__ = "task_event"
+    __table_args__ = (
+        Index("ix_task_event_project_created", "project_id", "created_at"),
+        Index("ix_task_event_task_created", "task_id", "created_at"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    task_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, nullable=False)
+    sprint_id = Column(Integer, nullable=True)
+    from_work_flow = Column(Enum(*Workflow, name="workflow_enum"), nullable=True)
+    to_work_flow = Column(Enum(*Workflow, name="workflow_enum"), nullable=True)
+    story_points = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
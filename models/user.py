@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, text
 from database import Base
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
@@ -8,6 +8,14 @@ from models.association import user_projects
 
 class User(Base):
     __tablename__="user"
+    # Soft-deleted users waiting for the purge worker (services/purge.py)
+    __table_args__ = (
+        Index(
+            "ix_user_deleted_at", "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
 
     id=Column(Integer,primary_key=True,index=True)
     full_name=Column(String,index=True,nullable=True)
@@ -20,4 +28,6 @@ class User(Base):
     projects = relationship("Project", secondary=user_projects, back_populates="users")
     is_admin=Column(Boolean, default=False)  # 0 for False, 1 for True
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    # Set by DELETE; every query skips the row from then on (services/soft_delete.py)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
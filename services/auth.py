@@ -0,0 +1,269 @@
+import base64
+import datetime
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from uuid import uuid4
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models.revoked_token import RevokedToken
+from services.cache import TTLCache
+from services.periodic import PeriodicJob
+from services.upsert import dialect_insert
+
+
+logger = logging.getLogger(__name__)
+
+# Every worker must share the key, or tokens issued by one are rejected by the others
+AUTH_SECRET = os.getenv("AUTH_SECRET", "")
+ACCESS_TOKEN_TTL_SECONDS = int(os.getenv("ACCESS_TOKEN_TTL_SECONDS", "900"))
+REFRESH_TOKEN_TTL_SECONDS = int(os.getenv("REFRESH_TOKEN_TTL_SECONDS", str(14 * 24 * 3600)))
+AUTH_CLAIMS_CACHE_SIZE = int(os.getenv("AUTH_CLAIMS_CACHE_SIZE", "10000"))
+# How often each worker reloads the revocation list written by the others
+AUTH_REVOCATION_REFRESH_SECONDS = float(os.getenv("AUTH_REVOCATION_REFRESH_SECONDS", "10"))
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+if not AUTH_SECRET:
+    logger.warning("AUTH_SECRET is not set; tokens are signed with a random key and die with this process")
+    AUTH_SECRET = secrets.token_urlsafe(32)
+
+
+class InvalidTokenError(Exception):
+    pass
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+_KEY = AUTH_SECRET.encode()
+# JWT layout (HS256) so standard tooling can read the tokens
+_HEADER = _b64encode(b'{"alg":"HS256","typ":"JWT"}')
+
+
+def _signature(signing_input: str) -> str:
+    return _b64encode(hmac.new(_KEY, signing_input.encode(), hashlib.sha256).digest())
+
+
+@dataclass(frozen=True)
+class Principal:
+    user_id: int
+    organisation: str | None
+    is_admin: bool
+    token_type: str
+    jti: str
+    issued_at: float
+    expires_at: int
+
+
+def issue_token(user, token_type: str, ttl: int) -> str:
+    # iat keeps sub-second precision, so a password change revokes tokens issued earlier in the same second
+    now = time.time()
+    claims = {
+        "sub": str(user.id),
+        "org": user.organisation,
+        "adm": bool(user.is_admin),
+        "typ": token_type,
+        "jti": uuid4().hex,
+        "iat": now,
+        "exp": int(now) + ttl,
+    }
+    signing_input = f"{_HEADER}.{_b64encode(json.dumps(claims, separators=(',', ':')).encode())}"
+    return f"{signing_input}.{_signature(signing_input)}"
+
+
+def issue_token_pair(user) -> dict:
+    return {
+        "access_token": issue_token(user, ACCESS, ACCESS_TOKEN_TTL_SECONDS),
+        "refresh_token": issue_token(user, REFRESH, REFRESH_TOKEN_TTL_SECONDS),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_TTL_SECONDS,
+    }
+
+
+def decode_token(token: str) -> Principal:
+    try:
+        header, payload, signature = token.split(".")
+    except ValueError:
+        raise InvalidTokenError("Malformed token")
+    if header != _HEADER or not hmac.compare_digest(_signature(f"{header}.{payload}"), signature):
+        raise InvalidTokenError("Invalid token signature")
+
+    try:
+        claims = json.loads(_b64decode(payload))
+        return Principal(
+            user_id=int(claims["sub"]),
+            organisation=claims.get("org"),
+            is_admin=bool(claims.get("adm")),
+            token_type=claims["typ"],
+            jti=claims["jti"],
+            issued_at=float(claims["iat"]),
+            expires_at=int(claims["exp"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        raise InvalidTokenError("Malformed token")
+
+
+def _as_timestamp(value: datetime.datetime) -> float:
+    # Naive timestamps (SQLite) are stored as UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+
+# revoked_token rows with this jti prefix revoke every token of a user issued before a cutoff (password
+# change); the row lives as long as the longest token, so the cutoff is its expiry minus that lifetime
+USER_REVOCATION_PREFIX = "user:"
+
+
+def _user_revocation_cutoff(expires_at: float) -> float:
+    return expires_at - REFRESH_TOKEN_TTL_SECONDS
+
+
+# Revoked token ids with their expiry, plus per-user cutoffs. Checks are dict lookups; revocations are
+# written to the revoked_token table and every worker reloads it every AUTH_REVOCATION_REFRESH_SECONDS.
+class RevocationList:
+
+    def __init__(self):
+        self._revoked: dict[str, float] = {}
+        self._users_before: dict[int, float] = {}
+
+    def is_revoked(self, principal: Principal) -> bool:
+        return (
+            principal.jti in self._revoked
+            or principal.issued_at < self._users_before.get(principal.user_id, 0)
+        )
+
+    # Runs in the caller's transaction; this worker stops accepting the token right away
+    async def revoke(self, db: AsyncSession, principal: Principal):
+        self._revoked[principal.jti] = principal.expires_at
+        await db.execute(
+            dialect_insert(db, RevokedToken.__table__)
+            .values(
+                jti=principal.jti,
+                expires_at=datetime.datetime.fromtimestamp(principal.expires_at, datetime.timezone.utc),
+            )
+            .on_conflict_do_nothing()
+        )
+
+    # Every access and refresh token issued to the user until now stops working; runs in the caller's
+    # transaction like revoke()
+    async def revoke_user(self, db: AsyncSession, user_id: int):
+        cutoff = time.time()
+        self._users_before[user_id] = cutoff
+        stmt = dialect_insert(db, RevokedToken.__table__).values(
+            jti=f"{USER_REVOCATION_PREFIX}{user_id}",
+            expires_at=datetime.datetime.fromtimestamp(cutoff + REFRESH_TOKEN_TTL_SECONDS, datetime.timezone.utc),
+        )
+        await db.execute(stmt.on_conflict_do_update(index_elements=["jti"], set_={"expires_at": stmt.excluded.expires_at}))
+
+    async def reload(self):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        async with AsyncSessionLocal() as db:
+            # Expired tokens are rejected on their own; their rows are no longer needed
+            await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+            rows = (await db.execute(select(RevokedToken.jti, RevokedToken.expires_at))).all()
+            await db.commit()
+
+        stored, users_before = {}, {}
+        for jti, expires_at in rows:
+            if jti.startswith(USER_REVOCATION_PREFIX):
+                user_id = int(jti[len(USER_REVOCATION_PREFIX):])
+                users_before[user_id] = _user_revocation_cutoff(_as_timestamp(expires_at))
+            else:
+                stored[jti] = _as_timestamp(expires_at)
+        local = {jti: expires_at for jti, expires_at in self._revoked.items() if expires_at > now.timestamp()}
+        self._revoked = {**local, **stored}
+        # Same merge for the cutoffs; the later one wins
+        users = {
+            user_id: cutoff for user_id, cutoff in self._users_before.items()
+            if cutoff + REFRESH_TOKEN_TTL_SECONDS > now.timestamp()
+        }
+        for user_id, cutoff in users_before.items():
+            users[user_id] = max(cutoff, users.get(user_id, 0))
+        self._users_before = users
+
+
+# Signature check and claim parsing happen once per token; later requests hit the LRU.
+# Expiry and revocation are still checked on every call.
+class TokenVerifier:
+
+    def __init__(self, revocations: RevocationList, cache_size: int = AUTH_CLAIMS_CACHE_SIZE):
+        self.revocations = revocations
+        self._claims = TTLCache(maxsize=cache_size, ttl=ACCESS_TOKEN_TTL_SECONDS)
+
+    def verify(self, token: str, token_type: str = ACCESS) -> Principal:
+        principal = self._claims.get(token)
+        if principal is None:
+            principal = decode_token(token)
+            self._claims.set(token, principal, ttl=max(principal.expires_at - time.time(), 0))
+
+        if principal.token_type != token_type:
+            raise InvalidTokenError("Wrong token type")
+        if principal.expires_at <= time.time():
+            raise InvalidTokenError("Token has expired")
+        if self.revocations.is_revoked(principal):
+            raise InvalidTokenError("Token has been revoked")
+        return principal
+
+
+revocations = RevocationList()
+token_verifier = TokenVerifier(revocations)
+token_revocations = PeriodicJob("token revocations", AUTH_REVOCATION_REFRESH_SECONDS, revocations.reload)
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+def request_token(request: Request, credentials: HTTPAuthorizationCredentials | None) -> str | None:
+    if credentials is not None:
+        return credentials.credentials
+    # EventSource cannot send headers, so event streams may pass ?access_token= instead
+    if "text/event-stream" in request.headers.get("accept", ""):
+        return request.query_params.get("access_token")
+    return None
+
+
+# Router-level dependency: no database query, the token carries the user's id, organisation and role
+async def require_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+) -> Principal:
+    token = request_token(request, credentials)
+    if not token:
+        raise unauthorized("Not authenticated")
+    try:
+        principal = token_verifier.verify(token)
+    except InvalidTokenError as e:
+        raise unauthorized(str(e))
+
+    request.state.principal = principal
+    return principal
+
+
+def require_self_or_admin(principal: Principal, user_id: int):
+    if principal.user_id != user_id and not principal.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to change another user")
@@ -0,0 +1,165 @@
+from collections import defaultdict
+from itertools import chain
+
+import orjson
+from sqlalchemy import String, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.association import user_projects
+from models.project import Project
+from models.sprint import Sprint
+from models.task import Task
+from models.user import User
+from services.serialization import PROJECT_COLUMNS, SPRINT_COLUMNS, TASK_COLUMNS
+
+
+# Board column for tasks without a workflow state
+NO_WORKFLOW = "Unset"
+# What the board shows of each member; enough to render avatars and assignee pickers
+MEMBER_COLUMNS = [User.id, User.full_name, User.email, User.role]
+BOARD_TASK_FIELDS = {column.key: column for column in TASK_COLUMNS}
+
+
+class UnknownFieldsError(ValueError):
+    pass
+
+
+# "code,title" -> the id column plus those, in table order; None selects every task column
+def board_task_columns(fields: str | None) -> list:
+    if not fields:
+        return TASK_COLUMNS
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - BOARD_TASK_FIELDS.keys()
+    if unknown:
+        raise UnknownFieldsError(", ".join(sorted(unknown)))
+    return [column for column in TASK_COLUMNS if column.key == "id" or column.key in requested]
+
+
+def _task_filters(project_id: int, sprint_ids: list[int] | None, backlog: bool) -> list:
+    filters = [Task.project_id == project_id]
+    if sprint_ids is not None:
+        in_sprints = Task.sprint_id.in_(sprint_ids)
+        filters.append(in_sprints | Task.sprint_id.is_(None) if backlog else in_sprints)
+    elif not backlog:
+        filters.append(Task.sprint_id.is_not(None))
+    return filters
+
+
+def _sprint_filters(project_id: int, sprint_ids: list[int] | None) -> list:
+    filters = [Sprint.project_id == project_id]
+    if sprint_ids is not None:
+        filters.append(Sprint.id.in_(sprint_ids))
+    return filters
+
+
+def _json_object(columns: list, *extra):
+    # Inline keys: bound parameters in json_build_object leave Postgres guessing their types
+    pairs = chain.from_iterable((literal_column(f"'{column.key}'"), column) for column in columns)
+    return func.json_build_object(*pairs, *extra)
+
+
+def _empty(kind: str):
+    return literal_column(f"'{kind}'::json")
+
+
+# Postgres: the whole board as one JSON document, built by the database in one statement.
+# Tasks are aggregated per (sprint, workflow) column, columns per sprint, sprints per project.
+def board_document_query(project_id: int, task_columns: list, sprint_ids: list[int] | None, backlog: bool):
+    work_flow = func.coalesce(cast(Task.work_flow, String), literal_column(f"'{NO_WORKFLOW}'"))
+    board_columns = (
+        select(
+            Task.sprint_id,
+            work_flow.label("work_flow"),
+            func.json_agg(aggregate_order_by(_json_object(task_columns), Task.code)).label("tasks"),
+        )
+        .where(*_task_filters(project_id, sprint_ids, backlog))
+        .group_by(Task.sprint_id, work_flow)
+        .cte("board_columns")
+    )
+    board_sprints = (
+        select(
+            board_columns.c.sprint_id,
+            func.json_object_agg(board_columns.c.work_flow, board_columns.c.tasks).label("columns"),
+        )
+        .group_by(board_columns.c.sprint_id)
+        .cte("board_sprints")
+    )
+
+    project = select(_json_object(PROJECT_COLUMNS)).where(Project.id == project_id).scalar_subquery()
+    members = (
+        select(func.json_agg(aggregate_order_by(_json_object(MEMBER_COLUMNS), User.id)))
+        .select_from(User)
+        .join(user_projects, user_projects.c.user_id == User.id)
+        .where(user_projects.c.project_id == project_id)
+        .scalar_subquery()
+    )
+    sprint_object = _json_object(
+        SPRINT_COLUMNS, literal_column("'columns'"), func.coalesce(board_sprints.c.columns, _empty("{}"))
+    )
+    sprints = (
+        select(func.json_agg(aggregate_order_by(sprint_object, Sprint.start_date)))
+        .select_from(Sprint)
+        .outerjoin(board_sprints, board_sprints.c.sprint_id == Sprint.id)
+        .where(*_sprint_filters(project_id, sprint_ids))
+        .scalar_subquery()
+    )
+    backlog_columns = select(board_sprints.c.columns).where(board_sprints.c.sprint_id.is_(None)).scalar_subquery()
+
+    return (
+        select(func.json_build_object(
+            literal_column("'project'"), project,
+            literal_column("'members'"), func.coalesce(members, _empty("[]")),
+            literal_column("'sprints'"), func.coalesce(sprints, _empty("[]")),
+            literal_column("'backlog'"), func.coalesce(backlog_columns, _empty("{}")),
+        ))
+        # No row at all for a missing project
+        .where(select(Project.id).where(Project.id == project_id).exists())
+    )
+
+
+# Other databases: four column-only selects, grouped here into the same document
+async def _board_document_by_parts(db: AsyncSession, project_id: int, task_columns: list, sprint_ids, backlog) -> dict | None:
+    project = (await db.execute(select(*PROJECT_COLUMNS).where(Project.id == project_id))).mappings().first()
+    if project is None:
+        return None
+
+    members = (await db.execute(
+        select(*MEMBER_COLUMNS)
+        .join(user_projects, user_projects.c.user_id == User.id)
+        .where(user_projects.c.project_id == project_id)
+        .order_by(User.id)
+    )).mappings().all()
+    sprints = (await db.execute(
+        select(*SPRINT_COLUMNS).where(*_sprint_filters(project_id, sprint_ids)).order_by(Sprint.start_date)
+    )).mappings().all()
+
+    # Grouping keys are selected even when not requested; only requested fields reach the payload
+    group_keys = [Task.sprint_id.label("board_sprint_id"), Task.work_flow.label("board_work_flow")]
+    rows = await db.execute(
+        select(*task_columns, *group_keys).where(*_task_filters(project_id, sprint_ids, backlog)).order_by(Task.code)
+    )
+    by_sprint = defaultdict(lambda: defaultdict(list))
+    for row in rows.mappings():
+        by_sprint[row["board_sprint_id"]][row["board_work_flow"] or NO_WORKFLOW].append(
+            {column.key: row[column.key] for column in task_columns}
+        )
+
+    return {
+        "project": dict(project),
+        "members": [dict(member) for member in members],
+        "sprints": [{**sprint, "columns": by_sprint.get(sprint["id"], {})} for sprint in sprints],
+        "backlog": by_sprint.get(None, {}),
+    }
+
+
+async def load_board(
+    db: AsyncSession, project_id: int, task_columns: list, sprint_ids: list[int] | None = None, backlog: bool = True
+) -> bytes | None:
+    if db.get_bind().dialect.name == "postgresql":
+        document = await db.scalar(board_document_query(project_id, task_columns, sprint_ids, backlog))
+        return document.encode() if document is not None else None
+
+    document = await _board_document_by_parts(db, project_id, task_columns, sprint_ids, backlog)
+    return orjson.dumps(document) if document is not None else None
@@ -0,0 +1,267 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from services.metrics import Counter
+
+
+_MISSING = object()
+
+# Read-through cache for project/sprint/user lookups
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+# Worker processes (uvicorn and gunicorn read their --workers default from it)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# An invalidation only reaches the memory cache of the worker that made the write
+if CACHE_BACKEND == "memory" and WEB_CONCURRENCY > 1:
+    raise RuntimeError("CACHE_BACKEND=memory is per process; set CACHE_BACKEND=redis to run several workers")
+
+
+# In-process LRU cache whose entries also expire after `ttl` seconds
+class TTLCache:
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float | None = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Keys are "<family><name>", the family being everything up to the last ":" ("project:", "task-tree:7:").
+def key_family(key: str) -> tuple[str, str]:
+    split = key.rindex(":") + 1
+    return key[:split], key[split:]
+
+
+# Cache backends share one async interface and store JSON-compatible values only.
+# Each family has a version and a generation, returned together as the stamp of a get:
+# - entries live under "<family><version>:<name>", so dropping a family is one version bump and a fill
+#   that started before it lands on a key nobody reads;
+# - deleting single keys bumps the family's generation, and set(..., stamp) is dropped once it has
+#   moved past the stamp's, so a value loaded before a write committed cannot land after its invalidation.
+# Either way only fills of that family are affected.
+
+class MemoryCacheBackend:
+
+    def __init__(self, maxsize: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # family -> [version, generation]
+        self._families = defaultdict(lambda: [0, 0])
+
+    async def get(self, family: str, name: str):
+        version, generation = self._families[family]
+        return (version, generation), self._cache.get(f"{family}{version}:{name}", _MISSING)
+
+    async def set(self, family: str, name: str, value, ttl: float | None, stamp):
+        # No await between the check and the write
+        version, generation = stamp
+        if self._families[family][1] == generation:
+            self._cache.set(f"{family}{version}:{name}", value, ttl)
+
+    async def delete(self, family: str, *names: str):
+        state = self._families[family]
+        state[1] += 1
+        for name in names:
+            self._cache.delete(f"{family}{state[0]}:{name}")
+
+    async def delete_family(self, family: str):
+        # Old entries are left to the LRU and the TTL
+        self._families[family][0] += 1
+
+
+# KEYS: version, generation; ARGV: namespaced family, name. Returns {version, generation, entry}
+_REDIS_GET = """
+local version = redis.call('GET', KEYS[1]) or '0'
+local generation = redis.call('GET', KEYS[2]) or '0'
+return {version, generation, redis.call('GET', ARGV[1] .. version .. ':' .. ARGV[2])}
+"""
+
+# KEYS: entry, generation; ARGV: value, ttl, generation read with the entry
+_REDIS_SET_IF_GENERATION = """
+if (redis.call('GET', KEYS[2]) or '0') == ARGV[3] then
+    return redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+end
+return nil
+"""
+
+# KEYS: version, generation; ARGV: namespaced family, names...
+_REDIS_DELETE = """
+local version = redis.call('GET', KEYS[1]) or '0'
+for i = 2, #ARGV do
+    redis.call('DEL', ARGV[1] .. version .. ':' .. ARGV[i])
+end
+return redis.call('INCR', KEYS[2])
+"""
+
+
+# Shared across workers; needs the optional `redis` package. Every call is one round trip (entry keys are
+# built inside the scripts, so a single Redis node rather than a cluster).
+class RedisCacheBackend:
+
+    def __init__(self, url: str = CACHE_URL, ttl: float = CACHE_TTL_SECONDS, namespace: str = "sprint-manager:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._get = self._redis.register_script(_REDIS_GET)
+        self._set_if_generation = self._redis.register_script(_REDIS_SET_IF_GENERATION)
+        self._delete = self._redis.register_script(_REDIS_DELETE)
+        self.ttl = ttl
+        self.namespace = namespace
+
+    # The family's version and generation counters, shared by every worker like the entries
+    def _counters(self, family: str) -> list[str]:
+        return [f"{self.namespace}version:{family}", f"{self.namespace}generation:{family}"]
+
+    async def get(self, family: str, name: str):
+        version, generation, raw = await self._get(keys=self._counters(family), args=[self.namespace + family, name])
+        return (version, generation), _MISSING if raw is None else json.loads(raw)
+
+    async def set(self, family: str, name: str, value, ttl: float | None, stamp):
+        version, generation = stamp
+        await self._set_if_generation(
+            keys=[f"{self.namespace}{family}{version}:{name}", self._counters(family)[1]],
+            args=[json.dumps(value), int(ttl or self.ttl), generation],
+        )
+
+    async def delete(self, family: str, *names: str):
+        await self._delete(keys=self._counters(family), args=[self.namespace + family, *names])
+
+    async def delete_family(self, family: str):
+        # No SCAN: entries under the old version are unreachable and expire with their TTL
+        await self._redis.incr(self._counters(family)[0])
+
+
+class ReadThroughCache:
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = Counter()
+        self.misses = Counter()
+
+    # `loader` returns a JSON-compatible value, or None for "not found" (never cached)
+    async def get_or_load(self, key: str, loader, ttl: float | None = None):
+        family, name = key_family(key)
+        stamp, value = await self.backend.get(family, name)
+        if value is not _MISSING:
+            self.hits.inc()
+            return value
+
+        self.misses.inc()
+        # The stamp was read before loading: an invalidation while the loader runs keeps its result out
+        value = await loader()
+        if value is not None:
+            await self.backend.set(family, name, value, ttl, stamp)
+        return value
+
+    async def invalidate(self, *keys: str):
+        names = defaultdict(list)
+        for key in keys:
+            family, name = key_family(key)
+            names[family].append(name)
+        for family, family_names in names.items():
+            await self.backend.delete(family, *family_names)
+
+    # `prefixes` are whole families (the *_PREFIX constants, task_tree_prefix)
+    async def invalidate_prefix(self, *prefixes: str):
+        for prefix in prefixes:
+            await self.backend.delete_family(prefix)
+
+    def stats(self) -> dict:
+        hits, misses = self.hits.value, self.misses.value
+        total = hits + misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0,
+        }
+
+
+CACHE_BACKENDS = {
+    "memory": MemoryCacheBackend,
+    "redis": RedisCacheBackend,
+}
+
+cache = ReadThroughCache(CACHE_BACKENDS[CACHE_BACKEND]())
+
+
+# Cache keys; the part up to the last ":" is the key's family (key_family), which a prefix invalidation drops
+
+def project_key(project_id: int) -> str:
+    return f"project:{project_id}"
+
+
+def user_projects_key(user_id: int) -> str:
+    return f"projects:user:{user_id}"
+
+
+def sprint_key(sprint_id: int) -> str:
+    return f"sprint:{sprint_id}"
+
+
+def project_sprints_key(project_id: int) -> str:
+    return f"sprints:project:{project_id}"
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def project_users_key(project_id: int) -> str:
+    return f"users:project:{project_id}"
+
+
+# Every subtree of a project shares the prefix; any task write in the project drops them all
+def task_tree_prefix(project_id: int) -> str:
+    return f"task-tree:{project_id}:"
+
+
+def task_tree_key(project_id: int, task_id: int, max_depth: int) -> str:
+    return f"{task_tree_prefix(project_id)}{task_id}-{max_depth}"
+
+
+USER_PROJECTS_PREFIX = "projects:user:"
+PROJECT_USERS_PREFIX = "users:project:"
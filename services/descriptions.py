@@ -0,0 +1,154 @@
+import asyncio
+import datetime
+import hashlib
+import logging
+import os
+from dataclasses import dataclass, field
+
+from sqlalchemy import update
+
+from apis.ai import get_model_client
+from database import AsyncSessionLocal
+from models.task import Task
+from services.cache import TTLCache
+from services.events import publish_event
+
+
+logger = logging.getLogger(__name__)
+
+NO_DESCRIPTION_GENERATED = "No description generated"
+
+AI_CONCURRENCY = int(os.getenv("AI_CONCURRENCY", "4"))
+AI_TIMEOUT_SECONDS = float(os.getenv("AI_TIMEOUT_SECONDS", "30"))
+AI_QUEUE_SIZE = int(os.getenv("AI_QUEUE_SIZE", "1000"))
+AI_CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", "1024"))
+AI_CACHE_TTL_SECONDS = float(os.getenv("AI_CACHE_TTL_SECONDS", "3600"))
+
+
+class QueueFullError(Exception):
+    pass
+
+
+@dataclass
+class DescriptionJob:
+    task_id: int
+    prompt: str
+    done: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode()).hexdigest()
+
+
+# Background generation of task descriptions.
+# Requests enqueue a job and return; AI_CONCURRENCY workers call the model with a timeout,
+# identical prompts share one call (in flight) or one cached answer (after), and the worker
+# writes the result to the task row in its own short transaction.
+class DescriptionPipeline:
+
+    def __init__(
+        self,
+        concurrency: int = AI_CONCURRENCY,
+        timeout: float = AI_TIMEOUT_SECONDS,
+        queue_size: int = AI_QUEUE_SIZE,
+        cache: TTLCache | None = None,
+    ):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.queue_size = queue_size
+        self.cache = cache or TTLCache(maxsize=AI_CACHE_SIZE, ttl=AI_CACHE_TTL_SECONDS)
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def start(self):
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def enqueue(self, task_id: int, prompt: str) -> DescriptionJob:
+        self.start()
+        job = DescriptionJob(task_id=task_id, prompt=prompt)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError("Description queue is full")
+        return job
+
+    async def generate(self, prompt: str) -> str:
+        key = prompt_key(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Identical prompt already being generated: wait for that call instead of making another
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        pending = asyncio.get_running_loop().create_future()
+        self._inflight[key] = pending
+        try:
+            text = await asyncio.wait_for(get_model_client().generate(prompt), self.timeout)
+            text = text or NO_DESCRIPTION_GENERATED
+            self.cache.set(key, text)
+            pending.set_result(text)
+            return text
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except Exception as e:
+            pending.set_exception(e)
+            # Mark retrieved so an unshared failure is not reported as "never retrieved"
+            pending.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _describe(self, prompt: str) -> str:
+        try:
+            return await self.generate(prompt)
+        except asyncio.TimeoutError:
+            return "Error generating description: model timed out"
+        except Exception as e:
+            return f"Error generating description: {str(e)}"
+
+    async def _save(self, task_id: int, description: str):
+        async with AsyncSessionLocal() as db:
+            task = await db.scalar(
+                update(Task)
+                .where(Task.id == task_id)
+                .values(description=description, updated_at=datetime.datetime.now(datetime.timezone.utc))
+                .returning(Task)
+            )
+            await db.commit()
+
+        if task is not None:
+            await publish_event("task.updated", task.project_id, task)
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                description = await self._describe(job.prompt)
+                await self._save(job.task_id, description)
+                if not job.done.done():
+                    job.done.set_result(description)
+            except Exception as e:
+                logger.exception("Description job for task %s failed", job.task_id)
+                if not job.done.done():
+                    job.done.set_exception(e)
+                    job.done.exception()
+            finally:
+                self._queue.task_done()
+
+
+description_pipeline = DescriptionPipeline()
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+
+
+logger = logging.getLogger(__name__)
+
+# "local" keeps events inside this worker, "postgres" fans them out to every worker via LISTEN/NOTIFY
+EVENT_BACKEND = os.getenv("EVENT_BACKEND", "local")
+EVENT_CHANNEL = os.getenv("EVENT_CHANNEL", "board_events")
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", "1000"))
+EVENT_SUBSCRIBER_QUEUE_SIZE = int(os.getenv("EVENT_SUBSCRIBER_QUEUE_SIZE", "256"))
+
+# NOTIFY payloads are capped at 8000 bytes
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+# Sent when a client cannot be resumed (unknown Last-Event-ID or it fell behind); it should reload the board
+RESET_EVENT = "reset"
+
+
+def _event_id() -> str:
+    return f"{time.time_ns()}-{uuid4().hex[:8]}"
+
+
+@dataclass
+class BoardEvent:
+    type: str
+    project_id: int
+    data: dict
+    id: str = field(default_factory=_event_id)
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+
+class Subscription:
+
+    def __init__(self, project_id: int):
+        self.project_id = project_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=EVENT_SUBSCRIBER_QUEUE_SIZE)
+
+    async def get(self) -> BoardEvent:
+        return await self.queue.get()
+
+    def offer(self, event: BoardEvent):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow client: drop what it has not read and tell it to reload
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(BoardEvent(RESET_EVENT, self.project_id, {"reason": "lagged"}))
+
+
+# In-process pub/sub, one fan-out list per project, with a bounded history for Last-Event-ID resume
+class EventBroker:
+
+    def __init__(self, history_size: int = EVENT_HISTORY_SIZE):
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self._history: deque[BoardEvent] = deque(maxlen=history_size)
+
+    def dispatch(self, event: BoardEvent):
+        self._history.append(event)
+        for subscription in list(self._subscribers.get(event.project_id, ())):
+            subscription.offer(event)
+
+    def _replay(self, subscription: Subscription, last_event_id: str):
+        ids = [event.id for event in self._history]
+        if last_event_id not in ids:
+            subscription.offer(BoardEvent(RESET_EVENT, subscription.project_id, {"reason": "unknown_last_event_id"}))
+            return
+
+        for event in list(self._history)[ids.index(last_event_id) + 1:]:
+            if event.project_id == subscription.project_id:
+                subscription.offer(event)
+
+    @asynccontextmanager
+    async def subscribe(self, project_id: int, last_event_id: str | None = None):
+        subscription = Subscription(project_id)
+        if last_event_id:
+            self._replay(subscription, last_event_id)
+        self._subscribers.setdefault(project_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._subscribers.get(project_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[project_id]
+
+
+class LocalEventBackend:
+
+    def __init__(self, broker: EventBroker):
+        self.broker = broker
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, event: BoardEvent):
+        self.broker.dispatch(event)
+
+
+# Cross-worker fan-out; every worker LISTENs and dispatches what any worker NOTIFYs (including itself)
+class PostgresEventBackend:
+
+    def __init__(self, broker: EventBroker, channel: str = EVENT_CHANNEL):
+        self.broker = broker
+        self.channel = channel
+        self._connection = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self):
+        import asyncpg
+
+        from database import ASYNC_CONNECT_ARGS, ASYNC_DATABASE_URL
+
+        dsn = ASYNC_DATABASE_URL.set(drivername="postgresql").render_as_string(hide_password=False)
+        connection = await asyncpg.connect(dsn, ssl=ASYNC_CONNECT_ARGS.get("ssl"))
+        await connection.add_listener(self.channel, self._on_notify)
+        connection.add_termination_listener(self._on_terminated)
+        self._connection = connection
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        try:
+            self.broker.dispatch(BoardEvent(**json.loads(payload)))
+        except (TypeError, ValueError):
+            logger.warning("Ignoring malformed board event payload")
+
+    def _on_terminated(self, connection):
+        logger.warning("Board event listener connection lost, reconnecting")
+        self._connection = None
+        asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 1.0
+        while self._connection is None:
+            try:
+                await self._connect()
+            except Exception:
+                logger.exception("Board event listener reconnect failed")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+    async def start(self):
+        await self._connect()
+
+    async def stop(self):
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            connection.remove_termination_listener(self._on_terminated)
+            await connection.close()
+
+    async def publish(self, event: BoardEvent):
+        payload = json.dumps(asdict(event))
+        if len(payload.encode()) > NOTIFY_PAYLOAD_LIMIT:
+            # Too big for NOTIFY: keep the event but ask clients to refetch
+            payload = json.dumps(asdict(BoardEvent(event.type, event.project_id, {"truncated": True}, event.id)))
+
+        if self._connection is None:
+            # Listener is down: deliver locally rather than lose the event
+            self.broker.dispatch(event)
+            return
+
+        async with self._lock:
+            await self._connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+
+EVENT_BACKENDS = {
+    "local": LocalEventBackend,
+    "postgres": PostgresEventBackend,
+}
+
+board_broker = EventBroker()
+board_events = EVENT_BACKENDS[EVENT_BACKEND](board_broker)
+
+
+# Publish after the write has committed; failures are logged and never fail the request
+async def publish_event(event_type: str, project_id: int, data):
+    try:
+        await board_events.publish(BoardEvent(event_type, project_id, jsonable_encoder(data)))
+    except Exception:
+        logger.exception("Could not publish %s event for project %s", event_type, project_id)
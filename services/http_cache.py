@@ -0,0 +1,93 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+
+def _as_datetime(value) -> datetime | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    # Naive timestamps (SQLite) are stored as UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()[:20]
+
+
+def _field(row, name):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+# Strong validator: one entity, identified by its id and last write
+def entity_etag(kind: str, row) -> tuple[str, datetime | None]:
+    updated_at = _as_datetime(_field(row, "updated_at"))
+    return f'"{_digest(kind, _field(row, "id"), updated_at and updated_at.isoformat())}"', updated_at
+
+
+# Lists get an ETag only, no Last-Modified: a row leaving the list (filtered out, deleted) does not move
+# the newest updated_at, so If-Modified-Since alone would answer 304 for a list that changed
+
+# Weak validator for a list: the query that produced it plus count and newest updated_at of its rows
+def list_etag(kind: str, query_key: str, count: int, max_updated_at) -> tuple[str, None]:
+    max_updated_at = _as_datetime(max_updated_at)
+    return f'W/"{_digest(kind, query_key, count, max_updated_at and max_updated_at.isoformat())}"', None
+
+
+# Strong validator for a document assembled elsewhere (e.g. by the database): its exact bytes
+def content_etag(kind: str, content: bytes) -> tuple[str, None]:
+    return f'"{_digest(kind, hashlib.sha1(content).hexdigest())}"', None
+
+
+# Weak validator for rows already loaded (a page): the query plus every row's id and last write, so it
+# costs nothing beyond the page itself
+def page_etag(kind: str, query_key: str, rows: list) -> tuple[str, None]:
+    stamps = {_field(row, "id"): _as_datetime(_field(row, "updated_at")) for row in rows}
+    versions = sorted((row_id, stamp and stamp.isoformat()) for row_id, stamp in stamps.items())
+    return f'W/"{_digest(kind, query_key, versions)}"', None
+
+
+def rows_etag(kind: str, query_key: str, rows: list) -> tuple[str, None]:
+    stamps = [_as_datetime(_field(row, "updated_at")) for row in rows]
+    return list_etag(kind, query_key, len(rows), max((stamp for stamp in stamps if stamp), default=None))
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # If-None-Match uses weak comparison and takes precedence over If-Modified-Since
+        return any(tag.strip() == "*" or _opaque(tag) == _opaque(etag) for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have whole-second precision
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+# Returns a 304 to send as-is, or None after putting ETag/Last-Modified on the normal response
+def conditional_response(request: Request, response: Response, etag: str, last_modified: datetime | None):
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
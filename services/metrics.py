@@ -0,0 +1,110 @@
+import threading
+
+
+# Upper bounds in seconds; the last bucket catches everything slower
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# Cumulative histogram in the Prometheus style (bucket counts include all smaller buckets)
+class Histogram:
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * len(self.buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[index] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            buckets = {str(bound): count for bound, count in zip(self.buckets, self._counts)}
+            buckets["+Inf"] = self._count
+            return {"buckets": buckets, "sum": self._sum, "count": self._count}
+
+
+class Counter:
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+# One metric per combination of label values, e.g. a latency histogram per (method, route, status)
+class MetricFamily:
+
+    def __init__(self, name: str, help: str, kind: str, label_names: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.label_names = label_names
+        self.buckets = buckets
+        self._children: dict[tuple, Histogram | Counter] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = Histogram(self.buckets) if self.kind == "histogram" else Counter()
+                    self._children[values] = child
+        return child
+
+    def items(self) -> list[tuple[dict, Histogram | Counter]]:
+        with self._lock:
+            return [(dict(zip(self.label_names, values)), child) for values, child in self._children.items()]
+
+    def prometheus(self) -> list[str]:
+        render = prometheus_histogram if self.kind == "histogram" else prometheus_counter
+        return render(self.name, self.help, self.items())
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+# Prometheus text exposition format (version 0.0.4)
+def prometheus_histogram(name: str, help: str, series: list[tuple[dict, Histogram]]) -> list[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} histogram"]
+    for labels, histogram in series:
+        snapshot = histogram.snapshot()
+        for bound, count in snapshot["buckets"].items():
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {count}")
+        lines.append(f"{name}_sum{_labels(labels)} {snapshot['sum']}")
+        lines.append(f"{name}_count{_labels(labels)} {snapshot['count']}")
+    return lines
+
+
+def prometheus_counter(name: str, help: str, series: list[tuple[dict, Counter]]) -> list[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} counter"]
+    lines.extend(f"{name}_total{_labels(labels)} {counter.value}" for labels, counter in series)
+    return lines
+
+
+def prometheus_gauge(name: str, help: str, series: list[tuple[dict, float]]) -> list[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    lines.extend(f"{name}{_labels(labels)} {value}" for labels, value in series)
+    return lines
@@ -0,0 +1,48 @@
+import logging
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+from database import engine
+
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run `alembic upgrade head` when the app starts; turn off to migrate as a separate deploy step
+DB_MIGRATE_ON_STARTUP = os.getenv("DB_MIGRATE_ON_STARTUP", "true").lower() in ("1", "true", "yes", "on")
+
+# pg_advisory_lock key; every worker starts at once, only one of them migrates at a time
+MIGRATION_LOCK_ID = 7_302_515
+
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    return config
+
+
+def upgrade_database(revision: str = "head"):
+    config = alembic_config()
+    # Keep the app's logging setup instead of alembic.ini's
+    config.attributes["configure_logger"] = False
+
+    with engine.connect() as connection:
+        postgres = engine.dialect.name == "postgresql"
+        if postgres:
+            connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            # The lock is held by the session; end the implicit transaction so migrations manage their own
+            connection.commit()
+
+        try:
+            config.attributes["connection"] = connection
+            command.upgrade(config, revision)
+        finally:
+            if postgres:
+                connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                connection.commit()
+
+    logger.info("Database schema is at %s", revision)
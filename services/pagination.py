@@ -0,0 +1,65 @@
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 500
+
+
+# Cursor is an opaque url-safe token wrapping the sort key and id of the last row sent
+def encode_cursor(key, row_id: int) -> str:
+    raw = json.dumps([key.isoformat() if isinstance(key, datetime) else key, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key_column) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(key_column.type, DateTime):
+            key = datetime.fromisoformat(key)
+        elif not isinstance(key, int):
+            raise ValueError(key)
+        return key, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+# Descending on (key, id), so the order is total and pages never overlap. A row whose key changes while
+# a client pages moves past the cursor and is skipped: updated_at (latest activity first) suits comment
+# threads, listings that must not lose rows key on an immutable column (tasks: code, newest first).
+def keyset_order(model, key_column):
+    return (key_column.desc(), model.id.desc())
+
+
+def apply_keyset(stmt, model, key_column, cursor: str | None):
+    stmt = stmt.order_by(*keyset_order(model, key_column))
+    if cursor:
+        key, row_id = decode_cursor(cursor, key_column)
+        stmt = stmt.where(tuple_(key_column, model.id) < tuple_(key, row_id))
+    return stmt
+
+
+# stmt selects plain columns (including id and the key column); items are dicts ready for encoding
+async def keyset_page(db: AsyncSession, stmt, model, key_column, cursor: str | None, limit: int):
+    # Fetch one extra row to know whether another page exists
+    rows = [
+        dict(row)
+        for row in (await db.execute(apply_keyset(stmt, model, key_column, cursor).limit(limit + 1))).mappings()
+    ]
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last[key_column.key], last["id"])
+
+    return {"items": items, "next_cursor": next_cursor}
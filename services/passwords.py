@@ -0,0 +1,85 @@
+import asyncio
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+# Any werkzeug method string: "scrypt:N:r:p" or "pbkdf2:sha256:iterations".
+# Changing it rehashes each user's password on their next successful login.
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+# scrypt and pbkdf2 release the GIL, so threads hash in parallel; each scrypt worker needs 128 * N * r bytes
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hashes running or waiting for a worker; past this, logins get 503 instead of queueing behind the storm
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "64"))
+PASSWORD_HASH_RETRY_AFTER = "1"
+
+HASH_METHODS = ("scrypt", "pbkdf2")
+
+
+class HasherBusyError(Exception):
+    pass
+
+
+def is_password_hash(stored: str) -> bool:
+    parts = stored.split("$")
+    return len(parts) == 3 and parts[0].split(":")[0] in HASH_METHODS
+
+
+# Password hashing off the event loop, on a small dedicated thread pool with a bounded backlog
+class PasswordHasher:
+
+    def __init__(
+        self,
+        method: str = PASSWORD_HASH_METHOD,
+        workers: int = PASSWORD_HASH_WORKERS,
+        queue_size: int = PASSWORD_HASH_QUEUE_SIZE,
+    ):
+        self.method = method
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0
+
+    # Full method prefix as werkzeug writes it ("scrypt" -> "scrypt:32768:8:1"); computed once
+    @cached_property
+    def method_prefix(self) -> str:
+        return generate_password_hash("", self.method).split("$", 1)[0]
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.queue_size:
+            raise HasherBusyError("Too many password checks in progress")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(generate_password_hash, password, self.method)
+
+    async def verify(self, stored: str, password: str) -> bool:
+        if not is_password_hash(stored):
+            # Rows written before hashing hold the plaintext; they are rehashed on login
+            return hmac.compare_digest(stored.encode(), password.encode())
+        return await self._run(check_password_hash, stored, password)
+
+    async def needs_rehash(self, stored: str) -> bool:
+        if not is_password_hash(stored):
+            return True
+        if "method_prefix" not in self.__dict__:
+            await self._run(lambda: self.method_prefix)
+        return stored.split("$", 1)[0] != self.method_prefix
+
+    def shutdown(self):
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,58 @@
+import asyncio
+import contextlib
+import logging
+
+from sqlalchemy import text
+
+from database import async_engine
+
+
+logger = logging.getLogger(__name__)
+
+
+# Runs `job` (an async callable) every `interval` seconds for the app's lifetime; failures are logged
+class PeriodicJob:
+
+    def __init__(self, name: str, interval: float, job):
+        self.name = name
+        self.interval = interval
+        self.job = job
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.job()
+            except Exception:
+                logger.exception("Periodic job %s failed", self.name)
+            await asyncio.sleep(self.interval)
+
+
+# Yields whether this worker holds pg_try_advisory_lock(lock_id), so a job scheduled on every worker runs
+# on one at a time; always True on databases without advisory locks (single process in practice)
+@contextlib.asynccontextmanager
+async def advisory_lock(lock_id: int):
+    async with async_engine.connect() as lock:
+        if lock.dialect.name != "postgresql":
+            yield True
+            return
+
+        locked = await lock.scalar(text("SELECT pg_try_advisory_lock(:id)"), {"id": lock_id})
+        # The lock belongs to the session; do not sit idle in a transaction while holding it
+        await lock.commit()
+        try:
+            yield locked
+        finally:
+            if locked:
+                await lock.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": lock_id})
+                await lock.commit()
@@ -0,0 +1,151 @@
+import logging
+import os
+
+from sqlalchemy import String, cast, func, literal_column, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models.project import Project
+from models.project_task_counter import ProjectTaskCounter
+from models.task import Task
+from services.periodic import PeriodicJob, advisory_lock
+from services.soft_delete import INCLUDE_DELETED
+from services.task_changes import COUNTER_COLUMNS
+from services.upsert import upsert_increments
+
+
+logger = logging.getLogger(__name__)
+
+# How often each worker checks the counters against the task table; 0 disables the job
+PROJECT_COUNTER_RECONCILE_SECONDS = float(os.getenv("PROJECT_COUNTER_RECONCILE_SECONDS", "3600"))
+# Projects checked (and repaired) per transaction
+RECONCILE_BATCH_SIZE = 200
+# pg_try_advisory_lock key; one worker reconciles at a time, the others skip that round
+RECONCILE_LOCK_ID = 7_302_516
+
+COUNTER_DIMENSIONS = ("work_flow", "priority", "assignee")
+# Key used in responses for tasks without a workflow state, priority or assignee
+UNSET = "Unset"
+
+
+def _dimension_value(dimension: str):
+    column = {"work_flow": Task.work_flow, "priority": Task.priority, "assignee": Task.user_id}[dimension]
+    return func.coalesce(cast(column, String), literal_column("''"))
+
+
+# Counts straight from the task table, in the counter table's shape; one GROUP BY per dimension.
+# Tasks of a deleted sprint are hidden from selects but still counted until the purge moves them.
+def _actual_count_selects(project_ids: list[int]) -> list:
+    selects = []
+    for dimension in COUNTER_DIMENSIONS:
+        value = _dimension_value(dimension)
+        selects.append(
+            select(
+                Task.project_id.label("project_id"),
+                literal_column(f"'{dimension}'", String).label("dimension"),
+                value.label("value"),
+                func.count().label("tasks"),
+                func.coalesce(func.sum(Task.story_points), 0).label("story_points"),
+            )
+            .where(Task.project_id.in_(project_ids))
+            .group_by(Task.project_id, value)
+        )
+    return selects
+
+
+def actual_counts_query(project_ids: list[int]):
+    return union_all(*_actual_count_selects(project_ids)).execution_options(**{INCLUDE_DELETED: True})
+
+
+# actual - counter for every key that has drifted, computed in one statement so both sides come from
+# the same snapshot
+def drift_query(project_ids: list[int]):
+    counters = select(
+        ProjectTaskCounter.project_id,
+        ProjectTaskCounter.dimension,
+        ProjectTaskCounter.value,
+        -ProjectTaskCounter.tasks,
+        -ProjectTaskCounter.story_points,
+    ).where(ProjectTaskCounter.project_id.in_(project_ids))
+    both = union_all(*_actual_count_selects(project_ids), counters).subquery()
+
+    tasks, story_points = func.sum(both.c.tasks), func.sum(both.c.story_points)
+    return (
+        select(both.c.project_id, both.c.dimension, both.c.value, tasks.label("tasks"), story_points.label("story_points"))
+        .group_by(both.c.project_id, both.c.dimension, both.c.value)
+        .having((tasks != 0) | (story_points != 0))
+        .order_by(both.c.project_id, both.c.dimension, both.c.value)
+        .execution_options(**{INCLUDE_DELETED: True})
+    )
+
+
+def _stats_document(project_id: int, rows) -> dict:
+    stats = {
+        "project_id": project_id,
+        "tasks": 0,
+        "story_points": 0,
+        **{dimension: {} for dimension in COUNTER_DIMENSIONS},
+    }
+    for row in rows:
+        if not row.tasks:
+            continue
+        stats[row.dimension][row.value or UNSET] = {"tasks": row.tasks, "story_points": row.story_points}
+        # Every task has exactly one workflow key, so that dimension sums to the totals
+        if row.dimension == "work_flow":
+            stats["tasks"] += row.tasks
+            stats["story_points"] += row.story_points
+    return stats
+
+
+# Reads the maintained counters: a handful of rows under one primary key prefix, whatever the project size
+async def project_stats(db: AsyncSession, project_id: int) -> dict:
+    rows = await db.execute(
+        select(ProjectTaskCounter.dimension, ProjectTaskCounter.value, ProjectTaskCounter.tasks, ProjectTaskCounter.story_points)
+        .where(ProjectTaskCounter.project_id == project_id)
+    )
+    return _stats_document(project_id, rows)
+
+
+# Same document computed with GROUP BY over the task table, plus every key where the counters disagree
+async def verified_project_stats(db: AsyncSession, project_id: int) -> dict:
+    stats = _stats_document(project_id, await db.execute(actual_counts_query([project_id])))
+    stats["drift"] = [
+        {"dimension": row.dimension, "value": row.value or UNSET, "tasks": row.tasks, "story_points": row.story_points}
+        for row in await db.execute(drift_query([project_id]))
+    ]
+    return stats
+
+
+# Adds the drift back onto the counters; writes that commit meanwhile keep their own increments
+async def reconcile_projects(db: AsyncSession, project_ids: list[int]) -> int:
+    drift = [dict(row) for row in (await db.execute(drift_query(project_ids))).mappings()]
+    await upsert_increments(
+        db, ProjectTaskCounter.__table__, ["project_id", "dimension", "value"], COUNTER_COLUMNS, drift
+    )
+    return len(drift)
+
+
+async def reconcile_project_counters():
+    async with advisory_lock(RECONCILE_LOCK_ID) as locked:
+        if not locked:
+            return
+
+        repaired, last_id = 0, 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                project_ids = list(await db.scalars(
+                    select(Project.id).where(Project.id > last_id).order_by(Project.id).limit(RECONCILE_BATCH_SIZE)
+                ))
+                if not project_ids:
+                    break
+                repaired += await reconcile_projects(db, project_ids)
+                await db.commit()
+            last_id = project_ids[-1]
+
+    if repaired:
+        logger.warning("Repaired %d drifted project task counters", repaired)
+
+
+project_counter_reconciliation = PeriodicJob(
+    "project counter reconciliation", PROJECT_COUNTER_RECONCILE_SECONDS, reconcile_project_counters
+)
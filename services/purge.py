@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import os
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models.association import user_projects
+from models.comment import Comment
+from models.project import Project
+from models.project_task_counter import ProjectTaskCounter
+from models.sprint import Sprint
+from models.sprint_summary import SprintDailySummary
+from models.task import Task
+from models.user import User
+from services.periodic import PeriodicJob, advisory_lock
+from services.soft_delete import INCLUDE_DELETED
+from services.task_changes import SNAPSHOT_COLUMNS, TaskSnapshot, apply_task_changes, invalidate_task_caches
+
+
+logger = logging.getLogger(__name__)
+
+# How often each worker looks for soft-deleted rows to purge; 0 disables the job
+PURGE_INTERVAL_SECONDS = float(os.getenv("PURGE_INTERVAL_SECONDS", "60"))
+# Tasks removed or updated per transaction, so no purge statement holds row locks for long
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "1000"))
+# Pause between batches; leaves the pool and the locks to request traffic
+PURGE_BATCH_PAUSE_SECONDS = 0.05
+# pg_try_advisory_lock key; one worker purges at a time, the others skip that round
+PURGE_LOCK_ID = 7_302_517
+
+# Every purge statement has to see the soft-deleted rows it is removing
+_ALL_ROWS = {INCLUDE_DELETED: True}
+
+
+async def _deleted_ids(db: AsyncSession, model) -> list[int]:
+    return list(await db.scalars(
+        select(model.id).where(model.deleted_at.is_not(None)).order_by(model.id).execution_options(**_ALL_ROWS)
+    ))
+
+
+# Runs `batch(db)` in its own transaction until it reports no more rows
+async def _in_batches(batch):
+    while True:
+        async with AsyncSessionLocal() as db:
+            done = await batch(db)
+            await db.commit()
+        if done:
+            return
+        await asyncio.sleep(PURGE_BATCH_PAUSE_SECONDS)
+
+
+# Tasks (with their comments) go without apply_task_changes: the project's counters, sprint summaries
+# and sprints are removed with it. The task_event history is kept.
+async def _delete_project_tasks(db: AsyncSession, project_id: int) -> bool:
+    task_ids = list(await db.scalars(
+        select(Task.id).where(Task.project_id == project_id).limit(PURGE_BATCH_SIZE).execution_options(**_ALL_ROWS)
+    ))
+    if not task_ids:
+        return True
+
+    await db.execute(delete(Comment).where(Comment.task_id.in_(task_ids)))
+    # Subtasks may sit in a later batch (or, in bad data, another project)
+    await db.execute(
+        update(Task).where(Task.parent_task.in_(task_ids)).values(parent_task=None)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(delete(Task).where(Task.id.in_(task_ids)).execution_options(synchronize_session=False))
+    return len(task_ids) < PURGE_BATCH_SIZE
+
+
+# Clears a reference to a sprint or user being purged (`column` is Task.sprint_id or Task.user_id) like
+# any other task write, so sprint summaries, project counters and the event log stay in step
+async def _clear_task_references(db: AsyncSession, column, value: int) -> bool:
+    before = {
+        row.id: TaskSnapshot.of(row)
+        for row in await db.execute(
+            select(*SNAPSHOT_COLUMNS).where(column == value).limit(PURGE_BATCH_SIZE)
+            .with_for_update().execution_options(**_ALL_ROWS)
+        )
+    }
+    if not before:
+        return True
+
+    rows = (await db.execute(
+        update(Task).where(Task.id.in_(before)).values({column.key: None})
+        .returning(*SNAPSHOT_COLUMNS).execution_options(synchronize_session=False)
+    )).all()
+    changes = [(before[row.id], TaskSnapshot.of(row)) for row in rows]
+    await apply_task_changes(db, changes)
+    await db.commit()
+    await invalidate_task_caches(changes)
+    return len(before) < PURGE_BATCH_SIZE
+
+
+# The user's comments stay in their threads (other users' replies hang off them), without an author
+async def _anonymise_user_comments(db: AsyncSession, user_id: int) -> bool:
+    comment_ids = list(await db.scalars(
+        select(Comment.id).where(Comment.user_id == user_id).limit(PURGE_BATCH_SIZE)
+    ))
+    if not comment_ids:
+        return True
+
+    await db.execute(
+        update(Comment).where(Comment.id.in_(comment_ids)).values(user_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    return len(comment_ids) < PURGE_BATCH_SIZE
+
+
+async def purge_sprint(sprint_id: int):
+    # Tasks still in the sprint (hidden since its DELETE) go back to the backlog
+    await _in_batches(lambda db: _clear_task_references(db, Task.sprint_id, sprint_id))
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(SprintDailySummary).where(SprintDailySummary.sprint_id == sprint_id))
+        await db.execute(delete(Sprint).where(Sprint.id == sprint_id))
+        await db.commit()
+
+
+async def purge_project(project_id: int):
+    await _in_batches(lambda db: _delete_project_tasks(db, project_id))
+    async with AsyncSessionLocal() as db:
+        sprint_ids = list(await db.scalars(
+            select(Sprint.id).where(Sprint.project_id == project_id).execution_options(**_ALL_ROWS)
+        ))
+    for sprint_id in sprint_ids:
+        await purge_sprint(sprint_id)
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(user_projects).where(user_projects.c.project_id == project_id))
+        await db.execute(delete(ProjectTaskCounter).where(ProjectTaskCounter.project_id == project_id))
+        await db.execute(delete(Project).where(Project.id == project_id))
+        await db.commit()
+
+
+# Returns False (and leaves the user for a later round) while a project, live or deleted, still
+# names the user as its manager
+async def purge_user(user_id: int) -> bool:
+    async with AsyncSessionLocal() as db:
+        manages = await db.scalar(
+            select(Project.id).where(Project.manager_id == user_id).limit(1).execution_options(**_ALL_ROWS)
+        )
+    if manages is not None:
+        return False
+
+    await _in_batches(lambda db: _clear_task_references(db, Task.user_id, user_id))
+    await _in_batches(lambda db: _anonymise_user_comments(db, user_id))
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(user_projects).where(user_projects.c.user_id == user_id))
+        await db.execute(delete(User).where(User.id == user_id))
+        await db.commit()
+    return True
+
+
+# Projects first, so their sprints and their managers' rows are free to go in the same round
+async def purge_soft_deleted():
+    async with advisory_lock(PURGE_LOCK_ID) as locked:
+        if not locked:
+            return
+
+        async with AsyncSessionLocal() as db:
+            project_ids = await _deleted_ids(db, Project)
+        for project_id in project_ids:
+            await purge_project(project_id)
+
+        async with AsyncSessionLocal() as db:
+            sprint_ids = await _deleted_ids(db, Sprint)
+        for sprint_id in sprint_ids:
+            await purge_sprint(sprint_id)
+
+        async with AsyncSessionLocal() as db:
+            user_ids = await _deleted_ids(db, User)
+        purged_users = [user_id for user_id in user_ids if await purge_user(user_id)]
+
+    if project_ids or sprint_ids or purged_users:
+        logger.info(
+            "Purged %d projects, %d sprints and %d users", len(project_ids), len(sprint_ids), len(purged_users)
+        )
+
+
+soft_delete_purge = PeriodicJob("soft delete purge", PURGE_INTERVAL_SECONDS, purge_soft_deleted)
@@ -0,0 +1,298 @@
+import asyncio
+import logging
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from starlette.responses import JSONResponse
+
+from services.auth import InvalidTokenError, token_verifier
+from services.metrics import Counter
+
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").strip().lower() in ("1", "true", "yes", "on")
+# "memory" keeps buckets per worker, "redis" shares them across workers (needs the `redis` package)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_URL = os.getenv("RATE_LIMIT_URL", os.getenv("CACHE_URL", "redis://localhost:6379/0"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# An organisation's bucket is this many times one user's, so one tenant cannot take the whole worker
+RATE_LIMIT_ORG_MULTIPLIER = float(os.getenv("RATE_LIMIT_ORG_MULTIPLIER", "5"))
+ADMISSION_RETRY_AFTER_SECONDS = 1
+
+
+def _limits(name: str, rate: float, burst: int) -> tuple[float, int]:
+    # RATE_LIMIT_<CLASS>="<tokens per second>/<burst>"
+    value = os.getenv(f"RATE_LIMIT_{name.upper()}")
+    if not value:
+        return rate, burst
+    rate, burst = value.split("/")
+    return float(rate), int(burst)
+
+
+def _admission(name: str, limit: int, queue_size: int, timeout: float) -> "AdmissionQueue":
+    # RATE_LIMIT_<CLASS>_CONCURRENCY="<in flight>/<waiting>/<max wait seconds>"
+    value = os.getenv(f"RATE_LIMIT_{name.upper()}_CONCURRENCY")
+    if value:
+        limit, queue_size, timeout = value.split("/")
+    return AdmissionQueue(int(limit), int(queue_size), float(timeout))
+
+
+# Bounds how many requests of one class run at once in this worker. Up to `queue_size` more wait
+# (at most `timeout` seconds) for a slot; past that they are turned away instead of piling up.
+class AdmissionQueue:
+
+    def __init__(self, limit: int, queue_size: int, timeout: float):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self._waiting = 0
+        self._in_flight = 0
+
+    async def acquire(self) -> bool:
+        if self._semaphore.locked() and self._waiting >= self.queue_size:
+            return False
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+            self._in_flight += 1
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiting -= 1
+
+    def release(self):
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+        }
+
+
+@dataclass
+class RouteClass:
+    name: str
+    rate: float
+    burst: int
+    admission: AdmissionQueue | None = None
+
+
+# Order matters: the first pattern matching "<METHOD> <path>" decides the class
+ROUTE_CLASSES = [
+    (re.compile(r"^POST /users/(valid|refresh)?$"), RouteClass("auth", *_limits("auth", 1, 10))),
+    (
+        re.compile(r"^(PATCH /tasks/\d+/description|\w+ /ai/.*)$"),
+        RouteClass("ai", *_limits("ai", 0.2, 5), admission=_admission("ai", 4, 16, 10)),
+    ),
+    (re.compile(r"^GET /tasks/events$"), RouteClass("stream", *_limits("stream", 0.5, 5))),
+    (
+        re.compile(
+            r"^(GET /tasks/(all|unassigned|search/ByTitle|\d+/tree)"
+            r"|GET /projects/\d+/(board|velocity|cycle-time|time-in-status)"
+            r"|GET /sprints/\d+/burndown"
+            r"|POST /search_bar/"
+            r"|\w+ /tasks/bulk(/move)?)$"
+        ),
+        RouteClass("heavy", *_limits("heavy", 5, 20), admission=_admission("heavy", 8, 32, 5)),
+    ),
+    (re.compile(r"^GET "), RouteClass("read", *_limits("read", 20, 100))),
+    (re.compile(r"^\w+ "), RouteClass("write", *_limits("write", 10, 50))),
+]
+
+EXEMPT_PATHS = re.compile(r"^/(health|metrics|docs|redoc|openapi\.json)(/|$)")
+
+
+def classify(method: str, path: str) -> RouteClass | None:
+    if method == "OPTIONS" or EXEMPT_PATHS.match(path):
+        return None
+    key = f"{method} {path}"
+    for pattern, route_class in ROUTE_CLASSES:
+        if pattern.match(key):
+            return route_class
+    return None
+
+
+# Token buckets: each key holds up to `burst` tokens and regains `rate` per second; a request costs one.
+# take() returns 0 when the request may go ahead, otherwise the seconds until a token is available.
+class MemoryRateLimitStore:
+
+    def __init__(self, maxsize: int = RATE_LIMIT_MAX_KEYS):
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+# Same bucket, updated atomically in Redis so every worker draws from it
+TOKEN_BUCKET_SCRIPT = """
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitStore:
+
+    def __init__(self, url: str = RATE_LIMIT_URL, namespace: str = "sprint-manager:rate:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._take = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self.namespace = namespace
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        return float(await self._take(keys=[self.namespace + key], args=[rate, burst, time.time()]))
+
+
+RATE_LIMIT_STORES = {
+    "memory": MemoryRateLimitStore,
+    "redis": RedisRateLimitStore,
+}
+
+
+def _header(scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+# Who the request counts against: the token's user and organisation, or the client address when
+# there is no valid token (signup, login, and requests that will be rejected with 401 anyway)
+def request_identity(scope) -> tuple[str, str | None]:
+    authorization = _header(scope, b"authorization")
+    if authorization:
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                principal = token_verifier.verify(token.strip())
+                return f"user:{principal.user_id}", principal.organisation and f"org:{principal.organisation}"
+            except InvalidTokenError:
+                pass
+
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}", None
+
+
+class RateLimiter:
+
+    def __init__(self, store):
+        self.store = store
+        self.limited = Counter()
+        self.shed = Counter()
+
+    async def retry_after(self, route_class: RouteClass, scope) -> float:
+        subject, organisation = request_identity(scope)
+        buckets = [(f"{route_class.name}:{subject}", route_class.rate, route_class.burst)]
+        if organisation:
+            buckets.append((
+                f"{route_class.name}:{organisation}",
+                route_class.rate * RATE_LIMIT_ORG_MULTIPLIER,
+                math.ceil(route_class.burst * RATE_LIMIT_ORG_MULTIPLIER),
+            ))
+
+        wait = 0.0
+        try:
+            for key, rate, burst in buckets:
+                wait = max(wait, await self.store.take(key, rate, burst))
+        except Exception:
+            # A broken shared store must not take the API down with it
+            logger.warning("Rate limit store unavailable, letting the request through", exc_info=True)
+            return 0.0
+        return wait
+
+    def stats(self) -> dict:
+        return {
+            "enabled": RATE_LIMIT_ENABLED,
+            "backend": type(self.store).__name__,
+            "limited": self.limited.value,
+            "shed": self.shed.value,
+            "admission": {
+                route_class.name: route_class.admission.stats()
+                for _, route_class in ROUTE_CLASSES
+                if route_class.admission is not None
+            },
+        }
+
+
+rate_limiter = RateLimiter(RATE_LIMIT_STORES[RATE_LIMIT_BACKEND]())
+
+
+async def _reject(scope, receive, send, status_code: int, detail: str, retry_after: float):
+    response = JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+    await response(scope, receive, send)
+
+
+# Pure ASGI so it adds no per-request task or body buffering, and holds the admission slot until
+# the response (streamed or not) is fully sent
+class RateLimitMiddleware:
+
+    def __init__(self, app, limiter: RateLimiter = rate_limiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        route_class = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if not RATE_LIMIT_ENABLED or route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = await self.limiter.retry_after(route_class, scope)
+        if retry_after > 0:
+            self.limiter.limited.inc()
+            await _reject(scope, receive, send, 429, "Rate limit exceeded", retry_after)
+            return
+
+        admission = route_class.admission
+        if admission is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await admission.acquire():
+            self.limiter.shed.inc()
+            await _reject(scope, receive, send, 503, "Server is busy, try again shortly", ADMISSION_RETRY_AFTER_SECONDS)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release()
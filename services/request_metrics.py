@@ -0,0 +1,143 @@
+import asyncio
+import cProfile
+import logging
+import os
+import tempfile
+import time
+from uuid import uuid4
+
+from starlette.datastructures import MutableHeaders
+
+from services.metrics import MetricFamily
+from services.sql_metrics import SQLStats, current_sql_stats
+
+
+logger = logging.getLogger(__name__)
+
+# Requests sent with "X-Profile: <PROFILE_TOKEN>" are profiled; profiling is off while it is unset
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "sprint-manager-profiles"))
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+
+request_seconds = MetricFamily(
+    "http_request_duration_seconds", "Request latency", "histogram", ("method", "route", "status")
+)
+request_queries = MetricFamily(
+    "http_request_db_queries", "SQL statements per request", "histogram", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+request_db_seconds = MetricFamily(
+    "http_request_db_seconds", "Time spent in SQL per request", "histogram", ("method", "route")
+)
+
+
+# Route template ("/tasks/{task_id}"), never the raw path, so label cardinality stays bounded
+def route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or "unmatched"
+
+
+def _header(scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+# pyinstrument when installed (HTML, follows just this request's task across awaits),
+# otherwise cProfile (.prof for pstats/snakeviz; it sees everything the event loop runs meanwhile)
+class RequestProfile:
+
+    def __init__(self, scope):
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method']}-{uuid4().hex[:8]}"
+        try:
+            from pyinstrument import Profiler
+
+            self._profiler = Profiler(async_mode="enabled")
+            self.path = os.path.join(PROFILE_DIR, f"{name}.html")
+        except ImportError:
+            self._profiler = cProfile.Profile()
+            self.path = os.path.join(PROFILE_DIR, f"{name}.prof")
+
+    def start(self):
+        if isinstance(self._profiler, cProfile.Profile):
+            self._profiler.enable()
+        else:
+            self._profiler.start()
+
+    def stop(self):
+        if isinstance(self._profiler, cProfile.Profile):
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+
+    def save(self):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        if isinstance(self._profiler, cProfile.Profile):
+            self._profiler.dump_stats(self.path)
+        else:
+            with open(self.path, "w") as output:
+                output.write(self._profiler.output_html())
+
+
+# Pure ASGI: per-route latency, SQL statements and SQL time per request, a Server-Timing header,
+# and the opt-in profiler. Streaming responses are measured until their last chunk is sent.
+class RequestMetricsMiddleware:
+
+    def __init__(self, app):
+        self.app = app
+        self._profiling = False
+
+    def _start_profile(self, scope) -> RequestProfile | None:
+        # One profile at a time; profilers hook the whole interpreter
+        if not PROFILE_TOKEN or self._profiling or _header(scope, b"x-profile") != PROFILE_TOKEN:
+            return None
+        self._profiling = True
+        profile = RequestProfile(scope)
+        profile.start()
+        return profile
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = SQLStats()
+        token = current_sql_stats.set(stats)
+        profile = self._start_profile(scope)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.queries} queries", '
+                    f"app;dur={(time.perf_counter() - started) * 1000:.1f}",
+                )
+                if profile is not None:
+                    headers.append("X-Profile-File", os.path.basename(profile.path))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_sql_stats.reset(token)
+
+            method, route = scope["method"], route_label(scope)
+            request_seconds.labels(method, route, str(status_code)).observe(elapsed)
+            request_queries.labels(method, route).observe(stats.queries)
+            request_db_seconds.labels(method, route).observe(stats.seconds)
+
+            if profile is not None:
+                profile.stop()
+                self._profiling = False
+                try:
+                    await asyncio.to_thread(profile.save)
+                    logger.info("Profile of %s %s saved to %s", method, route, profile.path)
+                except OSError:
+                    logger.exception("Could not save profile to %s", profile.path)
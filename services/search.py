@@ -0,0 +1,168 @@
+import asyncio
+import re
+from bisect import bisect_left
+
+from sqlalchemy import DDL, event, func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import Base
+from models.task import Task, TASK_SEARCH_VECTOR
+
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Title hits count more than description hits when ranking
+TITLE_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+# pg_trgm backs the trigram index on Task.title; migration 0002 creates it, this covers create_all in scripts
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+def tokenize(value: str | None) -> list[str]:
+    if not value:
+        return []
+    return TOKEN_PATTERN.findall(value.lower())
+
+
+async def search_tasks_index(db: AsyncSession, value: str, limit: int = DEFAULT_SEARCH_LIMIT) -> list[Task]:
+    if db.get_bind().dialect.name == "postgresql":
+        return await _search_postgres(db, value, limit)
+    return await _fallback_index.search(db, value, limit)
+
+
+# Postgres: prefix-matching tsquery over title + description, plus trigram matching on title.
+# ILIKE stays for substring matches and is served by the trigram GIN index.
+async def _search_postgres(db: AsyncSession, value: str, limit: int) -> list[Task]:
+    vector = literal_column(TASK_SEARCH_VECTOR)
+    title_match = Task.title.ilike(f"%{value}%")
+    rank = func.similarity(Task.title, value)
+
+    tokens = tokenize(value)
+    if tokens:
+        tsquery = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{token}:*" for token in tokens))
+        condition = or_(vector.op("@@")(tsquery), title_match)
+        rank = rank + func.ts_rank(vector, tsquery)
+    else:
+        condition = title_match
+
+    stmt = (
+        select(Task)
+        .where(condition)
+        .order_by(rank.desc(), Task.id.desc())
+        .limit(limit)
+    )
+    return list(await db.scalars(stmt))
+
+
+# In-process inverted index used when the database is not Postgres (SQLite scripts and tests).
+# Each search re-indexes only the tasks written since the last one (updated_at at or past the newest seen);
+# it is rebuilt from the whole table when rows went away (deletes) or appeared without a newer updated_at.
+class InvertedIndex:
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._count = None
+        self._updated_at = None
+        self._postings: dict[str, dict[int, float]] = {}
+        self._vocabulary: list[str] = []
+        self._vocabulary_changed = False
+        # Token scores per task, to take a task's old postings out when it is re-indexed
+        self._documents: dict[int, dict[str, float]] = {}
+
+    async def _table_signature(self, db: AsyncSession):
+        return (await db.execute(select(func.count(Task.id), func.max(Task.updated_at)))).one()
+
+    def _remove(self, task_id: int):
+        for token in self._documents.pop(task_id, {}):
+            scores = self._postings[token]
+            del scores[task_id]
+            if not scores:
+                del self._postings[token]
+                self._vocabulary_changed = True
+
+    def _add(self, task_id: int, title: str | None, description: str | None):
+        document: dict[str, float] = {}
+        for weight, field in ((TITLE_WEIGHT, title), (DESCRIPTION_WEIGHT, description)):
+            for token in tokenize(field):
+                document[token] = document.get(token, 0.0) + weight
+
+        self._documents[task_id] = document
+        for token, score in document.items():
+            if token not in self._postings:
+                self._postings[token] = {}
+                self._vocabulary_changed = True
+            self._postings[token][task_id] = score
+
+    async def _index(self, db: AsyncSession, stmt):
+        for task_id, title, description in await db.execute(stmt):
+            self._remove(task_id)
+            self._add(task_id, title, description)
+        if self._vocabulary_changed:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_changed = False
+
+    async def _rebuild(self, db: AsyncSession):
+        self._postings, self._documents = {}, {}
+        await self._index(db, select(Task.id, Task.title, Task.description))
+
+    async def _refresh(self, db: AsyncSession):
+        async with self._lock:
+            count, updated_at = await self._table_signature(db)
+            if self._count is None or count < self._count:
+                await self._rebuild(db)
+            elif updated_at != self._updated_at:
+                stmt = select(Task.id, Task.title, Task.description)
+                if self._updated_at is not None:
+                    stmt = stmt.where(Task.updated_at >= self._updated_at)
+                await self._index(db, stmt)
+
+            if len(self._documents) != count:
+                await self._rebuild(db)
+            self._count, self._updated_at = count, updated_at
+
+    # Every query token must match some indexed token by prefix
+    def _match(self, tokens: list[str]) -> dict[int, float]:
+        scores: dict[int, float] | None = None
+        for token in tokens:
+            token_scores: dict[int, float] = {}
+            position = bisect_left(self._vocabulary, token)
+            while position < len(self._vocabulary) and self._vocabulary[position].startswith(token):
+                for task_id, score in self._postings[self._vocabulary[position]].items():
+                    token_scores[task_id] = token_scores.get(task_id, 0.0) + score
+                position += 1
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {task_id: scores[task_id] + score for task_id, score in token_scores.items() if task_id in scores}
+            if not scores:
+                return {}
+
+        return scores or {}
+
+    async def search(self, db: AsyncSession, value: str, limit: int) -> list[Task]:
+        tokens = tokenize(value)
+        if not tokens:
+            return []
+
+        await self._refresh(db)
+        scores = self._match(tokens)
+
+        ranked = sorted(scores, key=lambda task_id: (scores[task_id], task_id), reverse=True)[:limit]
+        if not ranked:
+            return []
+
+        tasks = {task.id: task for task in await db.scalars(select(Task).where(Task.id.in_(ranked)))}
+        return [tasks[task_id] for task_id in ranked if task_id in tasks]
+
+
+_fallback_index = InvertedIndex()
@@ -0,0 +1,42 @@
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import inspect
+
+from models.project import Project
+from models.sprint import Sprint
+from models.task import Task
+from models.user import User
+
+
+# Column-only selects: rows come back as plain tuples, no ORM identity map or attribute instrumentation.
+# Mapped attributes rather than table columns, so the soft-delete criteria still see the entity.
+def table_columns(model, exclude: tuple[str, ...] = ()) -> list:
+    return [attr.class_attribute for attr in inspect(model).column_attrs if attr.key not in exclude]
+
+
+TASK_COLUMNS = table_columns(Task)
+# deleted_at is always null on rows that are still served
+PROJECT_COLUMNS = table_columns(Project, exclude=("deleted_at",))
+SPRINT_COLUMNS = table_columns(Sprint, exclude=("deleted_at",))
+# The password hash never leaves the server, not even into the cache
+USER_COLUMNS = table_columns(User, exclude=("password", "deleted_at"))
+
+
+def row_dicts(result) -> list[dict]:
+    return [dict(row) for row in result.mappings()]
+
+
+def entity_dict(obj, columns: list) -> dict:
+    return {column.key: getattr(obj, column.key) for column in columns}
+
+
+def ndjson_line(row: dict) -> bytes:
+    return orjson.dumps(row) + b"\n"
+
+
+# Encodes with orjson and skips FastAPI's response_model pass, so the content must already have the
+# response model's shape; headers set on the injected response (ETag, Last-Modified) are carried over
+def json_response(content, response: Response | None = None, status_code: int = 200) -> ORJSONResponse:
+    headers = dict(response.headers) if response is not None else None
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
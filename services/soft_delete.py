@@ -0,0 +1,55 @@
+import datetime
+
+from sqlalchemy import event, or_, select
+from sqlalchemy.orm import Session, with_loader_criteria
+
+from models.project import Project
+from models.sprint import Sprint
+from models.task import Task
+from models.user import User
+
+
+# Execution option that lets a statement see soft-deleted rows: the purge worker, and signup's email and
+# mobile checks (the unique constraints still cover rows waiting to be purged)
+INCLUDE_DELETED = "include_deleted"
+
+SOFT_DELETE_MODELS = (Project, Sprint, User)
+
+_projects = Project.__table__
+_sprints = Sprint.__table__
+# Core selects, so the filter below is not applied to them again
+_deleted_project_ids = select(_projects.c.id).where(_projects.c.deleted_at.is_not(None))
+_deleted_sprint_ids = select(_sprints.c.id).where(_sprints.c.deleted_at.is_not(None))
+
+
+# Every ORM select (joins, subqueries, session.get; relationship loads inherit the criteria) skips
+# soft-deleted projects, sprints and users, the tasks of deleted projects and the tasks of deleted sprints,
+# until the purge worker removes them (a deleted sprint's tasks come back in the backlog). Core statements on tables (user_projects, migrations) are not affected.
+@event.listens_for(Session, "do_orm_execute")
+def _skip_soft_deleted(execute_state):
+    if (
+        not execute_state.is_select
+        or execute_state.is_column_load
+        or execute_state.is_relationship_load
+        or execute_state.execution_options.get(INCLUDE_DELETED)
+    ):
+        return
+
+    execute_state.statement = execute_state.statement.options(
+        *(
+            with_loader_criteria(model, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+            for model in SOFT_DELETE_MODELS
+        ),
+        with_loader_criteria(
+            Task,
+            lambda cls: cls.project_id.not_in(_deleted_project_ids)
+            & or_(cls.sprint_id.is_(None), cls.sprint_id.not_in(_deleted_sprint_ids)),
+            include_aliases=True,
+        ),
+    )
+
+
+def mark_deleted(entity):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    entity.deleted_at = now
+    entity.updated_at = now
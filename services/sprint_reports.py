@@ -0,0 +1,105 @@
+import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.sprint import Sprint
+from models.sprint_summary import SprintDailySummary
+from services.task_changes import SUMMARY_COLUMNS
+
+
+DEFAULT_VELOCITY_SPRINTS = 10
+MAX_VELOCITY_SPRINTS = 100
+
+
+def _as_date(value) -> datetime.date:
+    return value.date() if isinstance(value, datetime.datetime) else value
+
+
+# Burndown from the per-day summary rows: O(days in the sprint), independent of the number of tasks.
+# Changes before the sprint starts (planning) fold into its first day.
+async def sprint_burndown(db: AsyncSession, sprint: Sprint) -> dict:
+    start, end = _as_date(sprint.start_date), _as_date(sprint.end_date)
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+
+    rows = (await db.scalars(
+        select(SprintDailySummary)
+        .where(SprintDailySummary.sprint_id == sprint.id)
+        .order_by(SprintDailySummary.day)
+    )).all()
+
+    scope = completed = 0
+    pending = iter(rows)
+    row = next(pending, None)
+    days = []
+    day = start
+    while day <= end:
+        while row is not None and row.day <= day:
+            scope += row.scope_points
+            completed += row.completed_points
+            row = next(pending, None)
+        reached = day <= today
+        days.append({
+            "date": day,
+            "scope_points": scope if reached else None,
+            "completed_points": completed if reached else None,
+            "remaining_points": scope - completed if reached else None,
+        })
+        day += datetime.timedelta(days=1)
+
+    # Ideal line from the first committed scope (day one, or when planning finished) down to zero
+    committed = next((point["scope_points"] for point in days if point["scope_points"]), 0)
+    for index, point in enumerate(days):
+        point["ideal_points"] = round(committed * (1 - index / (len(days) - 1)), 2) if len(days) > 1 else 0
+
+    totals = {column: sum(getattr(row, column) for row in rows) for column in SUMMARY_COLUMNS}
+    return {
+        "sprint_id": sprint.id,
+        "start_date": start,
+        "end_date": end,
+        **totals,
+        "remaining_points": totals["scope_points"] - totals["completed_points"],
+        "days": days,
+    }
+
+
+# Committed vs completed points for the project's most recent sprints, one GROUP BY over summary rows
+async def project_velocity(db: AsyncSession, project_id: int, limit: int = DEFAULT_VELOCITY_SPRINTS) -> dict:
+    stmt = (
+        select(
+            Sprint.id,
+            Sprint.start_date,
+            Sprint.end_date,
+            func.coalesce(func.sum(SprintDailySummary.scope_points), 0).label("committed_points"),
+            func.coalesce(func.sum(SprintDailySummary.completed_points), 0).label("completed_points"),
+            func.coalesce(func.sum(SprintDailySummary.completed_tasks), 0).label("completed_tasks"),
+        )
+        .outerjoin(SprintDailySummary, SprintDailySummary.sprint_id == Sprint.id)
+        .where(Sprint.project_id == project_id)
+        .group_by(Sprint.id, Sprint.start_date, Sprint.end_date)
+        .order_by(Sprint.start_date.desc())
+        .limit(limit)
+    )
+    rows = (await db.execute(stmt)).all()
+
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    sprints = [
+        {
+            "sprint_id": row.id,
+            "start_date": _as_date(row.start_date),
+            "end_date": _as_date(row.end_date),
+            "committed_points": row.committed_points,
+            "completed_points": row.completed_points,
+            "completed_tasks": row.completed_tasks,
+            "finished": _as_date(row.end_date) < today,
+        }
+        for row in reversed(rows)
+    ]
+
+    # Sprints still running would drag the average down
+    finished = [sprint["completed_points"] for sprint in sprints if sprint["finished"]]
+    return {
+        "project_id": project_id,
+        "sprints": sprints,
+        "average_velocity": round(sum(finished) / len(finished), 2) if finished else None,
+    }
@@ -0,0 +1,77 @@
+import logging
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+
+from services.metrics import Counter, Histogram
+
+
+logger = logging.getLogger("sql.slow")
+
+# Statements slower than this are logged (text only; parameter values are never logged). 0 disables.
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "0.5"))
+SLOW_QUERY_MAX_CHARS = 2000
+
+query_seconds = Histogram()
+slow_queries = Counter()
+
+
+# SQL work done on behalf of one request; RequestMetricsMiddleware sets a fresh one per request
+@dataclass
+class SQLStats:
+    queries: int = 0
+    seconds: float = 0.0
+
+
+current_sql_stats: ContextVar[SQLStats | None] = ContextVar("current_sql_stats", default=None)
+
+
+# Shape of the bound parameters without their values: {"email": "str"}, ["int", "int"], or a row count
+def redact_parameters(parameters, executemany: bool = False):
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    query_seconds.observe(elapsed)
+
+    # The async engine runs these hooks in a greenlet that shares the request's context
+    stats = current_sql_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+    if SLOW_QUERY_SECONDS and elapsed >= SLOW_QUERY_SECONDS:
+        slow_queries.inc()
+        logger.warning(
+            "Slow query (%.1f ms): %s params=%s",
+            elapsed * 1000,
+            " ".join(statement.split())[:SLOW_QUERY_MAX_CHARS],
+            redact_parameters(parameters, executemany),
+        )
+
+
+# Failed statements never reach after_cursor_execute; drop their start time
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
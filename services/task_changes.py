@@ -0,0 +1,129 @@
+import datetime
+from collections import defaultdict
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.project_task_counter import ProjectTaskCounter
+from models.sprint_summary import SprintDailySummary
+from models.task import Task
+from services.cache import cache, task_tree_prefix
+from services.task_events import record_task_events
+from services.upsert import upsert_increments
+
+
+# Workflow states that count as burned down
+COMPLETED_WORKFLOWS = ("Done",)
+
+SUMMARY_COLUMNS = ["scope_points", "scope_tasks", "completed_points", "completed_tasks"]
+COUNTER_COLUMNS = ["tasks", "story_points"]
+
+
+# The task fields derived data (sprint summaries, ...) depends on, captured before and after a write
+@dataclass(frozen=True)
+class TaskSnapshot:
+    id: int
+    project_id: int
+    sprint_id: int | None
+    user_id: int | None
+    parent_task: int | None
+    work_flow: str | None
+    priority: str | None
+    story_points: int | None
+
+    @classmethod
+    def of(cls, task) -> "TaskSnapshot":
+        return cls(**{name: getattr(task, name) for name in cls.__dataclass_fields__})
+
+
+# Columns to select (or return) to build snapshots from rows
+SNAPSHOT_COLUMNS = [getattr(Task, name) for name in TaskSnapshot.__dataclass_fields__]
+
+
+def _sprint_contribution(task: TaskSnapshot | None) -> dict[int, dict]:
+    if task is None or task.sprint_id is None:
+        return {}
+
+    points = task.story_points or 0
+    completed = task.work_flow in COMPLETED_WORKFLOWS
+    return {task.sprint_id: {
+        "scope_points": points,
+        "scope_tasks": 1,
+        "completed_points": points if completed else 0,
+        "completed_tasks": 1 if completed else 0,
+    }}
+
+
+def sprint_summary_deltas(changes, day: datetime.date) -> list[dict]:
+    deltas = defaultdict(lambda: dict.fromkeys(SUMMARY_COLUMNS, 0))
+    for before, after in changes:
+        for sign, task in ((-1, before), (1, after)):
+            for sprint_id, contribution in _sprint_contribution(task).items():
+                for column, value in contribution.items():
+                    deltas[sprint_id][column] += sign * value
+
+    return [
+        {"sprint_id": sprint_id, "day": day, **values}
+        # Sorted so concurrent writes take the summary rows' locks in the same order
+        for sprint_id, values in sorted(deltas.items())
+        if any(values.values())
+    ]
+
+
+# The project_task_counter keys a task counts under; "" stands for no workflow/priority/assignee
+def counter_keys(task: TaskSnapshot) -> list[tuple[str, str]]:
+    return [
+        ("work_flow", task.work_flow or ""),
+        ("priority", task.priority or ""),
+        ("assignee", "" if task.user_id is None else str(task.user_id)),
+    ]
+
+
+def project_counter_deltas(changes) -> list[dict]:
+    deltas = defaultdict(lambda: dict.fromkeys(COUNTER_COLUMNS, 0))
+    for before, after in changes:
+        for sign, task in ((-1, before), (1, after)):
+            if task is None:
+                continue
+            for dimension, value in counter_keys(task):
+                counter = deltas[(task.project_id, dimension, value)]
+                counter["tasks"] += sign
+                counter["story_points"] += sign * (task.story_points or 0)
+
+    return [
+        {"project_id": project_id, "dimension": dimension, "value": value, **values}
+        # Sorted so concurrent writes take the counter rows' locks in the same order
+        for (project_id, dimension, value), values in sorted(deltas.items())
+        if any(values.values())
+    ]
+
+
+# Every task write calls this with (before, after) snapshots (None for create/delete), inside the
+# write's transaction, so derived tables (daily summaries, project counters, the task_event log)
+# commit or roll back together with the task rows.
+async def apply_task_changes(db: AsyncSession, changes: list[tuple[TaskSnapshot | None, TaskSnapshot | None]]):
+    if not changes:
+        return
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    await upsert_increments(
+        db,
+        SprintDailySummary.__table__,
+        ["sprint_id", "day"],
+        SUMMARY_COLUMNS,
+        sprint_summary_deltas(changes, now.date()),
+    )
+    await upsert_increments(
+        db,
+        ProjectTaskCounter.__table__,
+        ["project_id", "dimension", "value"],
+        COUNTER_COLUMNS,
+        project_counter_deltas(changes),
+    )
+    await record_task_events(db, changes, now)
+
+
+# After commit: drop cached data derived from the tasks' projects (subtrees)
+async def invalidate_task_caches(changes):
+    project_ids = {task.project_id for change in changes for task in change if task is not None}
+    await cache.invalidate_prefix(*(task_tree_prefix(project_id) for project_id in project_ids))
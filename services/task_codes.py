@@ -0,0 +1,29 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.task import Task, TASK_CODE_SEQUENCE
+
+
+FIRST_TASK_CODE = 1001
+
+
+# Hand out `count` unique task codes in one round trip.
+# nextval() never blocks on other transactions and is never rolled back,
+# so concurrent workers (and uvicorn processes) cannot collide on Task.code.
+async def allocate_task_codes(db: AsyncSession, count: int = 1) -> list[int]:
+    if count < 1:
+        return []
+
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = select(TASK_CODE_SEQUENCE.next_value()).select_from(func.generate_series(1, count))
+        return list(await db.scalars(stmt))
+
+    # Databases without sequences (SQLite for local scripts) fall back to max + 1
+    last_code = await db.scalar(select(func.max(Task.code)))
+    start = last_code + 1 if last_code else FIRST_TASK_CODE
+    return list(range(start, start + count))
+
+
+async def allocate_task_code(db: AsyncSession) -> int:
+    return (await allocate_task_codes(db, 1))[0]
+
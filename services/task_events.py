@@ -0,0 +1,250 @@
+import datetime
+import math
+import os
+
+from fastapi import HTTPException
+from sqlalchemy import case, func, insert, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import async_engine
+from models.task_event import TaskEvent
+from services.periodic import PeriodicJob, advisory_lock
+
+
+# Monthly partitions are created this many months ahead; rows outside them land in task_event_default
+TASK_EVENT_PARTITION_MONTHS_AHEAD = int(os.getenv("TASK_EVENT_PARTITION_MONTHS_AHEAD", "3"))
+PARTITION_CHECK_SECONDS = 6 * 60 * 60
+# pg_try_advisory_lock key; one worker creates partitions at a time, the others skip that round
+PARTITION_LOCK_ID = 7_302_518
+
+DEFAULT_REPORT_DAYS = 90
+MAX_REPORT_DAYS = 730
+PERCENTILES = (0.5, 0.75, 0.9, 0.95)
+
+STARTED_WORKFLOW = "In Progress"
+COMPLETED_WORKFLOW = "Done"
+
+
+def task_event_rows(changes, now: datetime.datetime) -> list[dict]:
+    rows = []
+    for before, after in changes:
+        from_work_flow = before.work_flow if before else None
+        to_work_flow = after.work_flow if after else None
+        # Only status changes are history; creates and deletes always are
+        if before and after and from_work_flow == to_work_flow:
+            continue
+
+        task = after or before
+        rows.append({
+            "task_id": task.id,
+            "project_id": task.project_id,
+            "sprint_id": task.sprint_id,
+            "from_work_flow": from_work_flow,
+            "to_work_flow": to_work_flow,
+            "story_points": task.story_points,
+            "created_at": now,
+        })
+    return rows
+
+
+# One multi-row INSERT per write, inside the write's transaction
+async def record_task_events(db: AsyncSession, changes, now: datetime.datetime):
+    rows = task_event_rows(changes, now)
+    if rows:
+        await db.execute(insert(TaskEvent), rows)
+
+
+def _month_start(day: datetime.date, offset: int = 0) -> datetime.date:
+    month = day.month - 1 + offset
+    return datetime.date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def ensure_task_event_partitions(connection, months_ahead: int = TASK_EVENT_PARTITION_MONTHS_AHEAD):
+    if connection.dialect.name != "postgresql":
+        return
+
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    for offset in range(months_ahead + 1):
+        start, end = _month_start(today, offset), _month_start(today, offset + 1)
+        name = f"task_event_{start:%Y_%m}"
+        exists = connection.scalar(
+            text("SELECT EXISTS (SELECT 1 FROM pg_tables WHERE schemaname = current_schema() AND tablename = :name)"),
+            {"name": name},
+        )
+        if exists:
+            continue
+
+        lower, upper = f"'{start.isoformat()} 00:00:00+00'", f"'{end.isoformat()} 00:00:00+00'"
+        in_range = f"created_at >= {lower} AND created_at < {upper}"
+        # Rows of the month already in the default partition (the job missed the month, or the app was
+        # down across its start) would make CREATE ... PARTITION OF fail; they move to the new partition
+        moving = connection.scalar(text(f"SELECT EXISTS (SELECT 1 FROM task_event_default WHERE {in_range})"))
+        if moving:
+            connection.execute(text("LOCK TABLE task_event_default IN EXCLUSIVE MODE"))
+            connection.execute(text(
+                f"CREATE TEMPORARY TABLE task_event_moving ON COMMIT DROP AS "
+                f"SELECT * FROM task_event_default WHERE {in_range}"
+            ))
+            connection.execute(text(f"DELETE FROM task_event_default WHERE {in_range}"))
+
+        connection.execute(text(f"CREATE TABLE {name} PARTITION OF task_event FOR VALUES FROM ({lower}) TO ({upper})"))
+        if moving:
+            connection.execute(text("INSERT INTO task_event SELECT * FROM task_event_moving"))
+            connection.execute(text("DROP TABLE task_event_moving"))
+
+
+async def _create_partitions():
+    async with advisory_lock(PARTITION_LOCK_ID) as locked:
+        if not locked:
+            return
+        async with async_engine.begin() as connection:
+            await connection.run_sync(ensure_task_event_partitions)
+
+
+task_event_partitions = PeriodicJob("task_event partitions", PARTITION_CHECK_SECONDS, _create_partitions)
+
+
+def _seconds(db: AsyncSession, end, start):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", end - start)
+    return (func.julianday(end) - func.julianday(start)) * 86400.0
+
+
+# Same interpolation as percentile_cont, for databases without it
+def _percentile(values: list[float], fraction: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    position = (len(values) - 1) * fraction
+    lower, upper = math.floor(position), math.ceil(position)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+async def _percentiles(db: AsyncSession, durations, column: str, group_by=None) -> list[dict]:
+    keys = [group_by] if group_by is not None else []
+    value = durations.c[column]
+
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = select(
+            *keys,
+            func.count(value).label("count"),
+            func.avg(value).label("mean"),
+            *(
+                func.percentile_cont(fraction).within_group(value).label(f"p{round(fraction * 100)}")
+                for fraction in PERCENTILES
+            ),
+        ).where(value.is_not(None))
+        if keys:
+            stmt = stmt.group_by(*keys).order_by(*keys)
+        return [dict(row._mapping) for row in await db.execute(stmt)]
+
+    grouped: dict = {}
+    for row in await db.execute(select(*keys, value).where(value.is_not(None))):
+        grouped.setdefault(row[0] if keys else None, []).append(float(row[-1]))
+    return [
+        {
+            **({group_by.name: key} if keys else {}),
+            "count": len(values),
+            "mean": sum(values) / len(values),
+            **{f"p{round(fraction * 100)}": _percentile(values, fraction) for fraction in PERCENTILES},
+        }
+        for key, values in sorted(grouped.items(), key=lambda item: str(item[0]))
+    ]
+
+
+# Reports cover [since, until); defaults to the last DEFAULT_REPORT_DAYS days
+def report_window(since: datetime.datetime | None, until: datetime.datetime | None):
+    # Timestamps without an offset are taken as UTC
+    since, until = (
+        value.replace(tzinfo=datetime.timezone.utc) if value and value.tzinfo is None else value
+        for value in (since, until)
+    )
+    until = until or datetime.datetime.now(datetime.timezone.utc)
+    since = since or until - datetime.timedelta(days=DEFAULT_REPORT_DAYS)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    if until - since > datetime.timedelta(days=MAX_REPORT_DAYS):
+        raise HTTPException(status_code=400, detail=f"Report window is limited to {MAX_REPORT_DAYS} days")
+    return since, until
+
+
+def _window_filter(stmt, project_id: int, sprint_id: int | None, since, until):
+    # created_at bounds let Postgres prune to the partitions of the requested months
+    stmt = stmt.where(TaskEvent.project_id == project_id, TaskEvent.created_at >= since, TaskEvent.created_at < until)
+    if sprint_id is not None:
+        stmt = stmt.where(TaskEvent.sprint_id == sprint_id)
+    return stmt
+
+
+# Cycle time (first "In Progress" -> first "Done") and lead time (created -> first "Done")
+# for tasks completed in [since, until), in hours
+async def cycle_time_report(db: AsyncSession, project_id: int, sprint_id: int | None, since, until) -> dict:
+    completed = _window_filter(
+        select(TaskEvent.task_id, func.min(TaskEvent.created_at).label("done_at"))
+        .where(TaskEvent.to_work_flow == COMPLETED_WORKFLOW),
+        project_id, sprint_id, since, until,
+    ).group_by(TaskEvent.task_id).subquery()
+
+    milestones = (
+        select(
+            TaskEvent.task_id,
+            func.min(case((TaskEvent.to_work_flow == STARTED_WORKFLOW, TaskEvent.created_at))).label("started_at"),
+            func.min(case((TaskEvent.from_work_flow.is_(None), TaskEvent.created_at))).label("created_at"),
+        )
+        .where(TaskEvent.task_id.in_(select(completed.c.task_id)))
+        .group_by(TaskEvent.task_id)
+        .subquery()
+    )
+
+    hours = 3600.0
+    durations = (
+        select(
+            completed.c.task_id,
+            (_seconds(db, completed.c.done_at, milestones.c.started_at) / hours).label("cycle_hours"),
+            (_seconds(db, completed.c.done_at, milestones.c.created_at) / hours).label("lead_hours"),
+        )
+        .join(milestones, milestones.c.task_id == completed.c.task_id)
+        # A task reopened and started again after its first completion has no meaningful cycle
+        .where(milestones.c.started_at.is_(None) | (milestones.c.started_at <= completed.c.done_at))
+        .subquery()
+    )
+
+    cycle = await _percentiles(db, durations, "cycle_hours")
+    lead = await _percentiles(db, durations, "lead_hours")
+    return {
+        "project_id": project_id,
+        "sprint_id": sprint_id,
+        "since": since,
+        "until": until,
+        "cycle_time_hours": cycle[0] if cycle else None,
+        "lead_time_hours": lead[0] if lead else None,
+    }
+
+
+# Time spent in each workflow state: every event lasts until the task's next event (LEAD window),
+# or until `until` for the state a task is still in
+async def time_in_status_report(db: AsyncSession, project_id: int, sprint_id: int | None, since, until) -> dict:
+    next_event_at = func.lead(TaskEvent.created_at).over(
+        partition_by=TaskEvent.task_id, order_by=(TaskEvent.created_at, TaskEvent.id)
+    )
+    events = _window_filter(
+        select(TaskEvent.to_work_flow.label("work_flow"), TaskEvent.created_at, next_event_at.label("left_at")),
+        project_id, sprint_id, since, until,
+    ).subquery()
+
+    durations = (
+        select(
+            events.c.work_flow,
+            (_seconds(db, func.coalesce(events.c.left_at, literal(until)), events.c.created_at) / 3600.0).label("hours"),
+        )
+        .where(events.c.work_flow.is_not(None))
+        .subquery()
+    )
+
+    return {
+        "project_id": project_id,
+        "sprint_id": sprint_id,
+        "since": since,
+        "until": until,
+        "statuses": await _percentiles(db, durations, "hours", group_by=durations.c.work_flow),
+    }
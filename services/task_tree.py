@@ -0,0 +1,93 @@
+from collections import Counter, defaultdict
+
+from sqlalchemy import Integer, String, cast, false, literal_column, not_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from models.task import Task
+
+
+DEFAULT_TREE_DEPTH = 10
+MAX_TREE_DEPTH = 50
+
+# Fields returned per node; descriptions stay out so trees are compact and cache well
+TREE_FIELDS = (
+    "id", "code", "title", "work_type", "work_flow", "priority", "story_points",
+    "user_id", "sprint_id", "parent_task", "project_id",
+)
+
+
+# The whole subtree under `task_id` in one recursive CTE. Each row carries the '/'-separated id path
+# from the root; a child already on its parent's path closes a cycle and is not expanded. Rows are
+# fetched one level past max_depth only to tell which nodes have more children.
+def subtree_query(task_id: int, max_depth: int):
+    # Inline constants: bound parameters in a recursive CTE leave Postgres guessing their types
+    slash = literal_column("'/'", String)
+    tree = (
+        select(
+            Task.id.label("id"),
+            literal_column("0", Integer).label("depth"),
+            (slash + cast(Task.id, String) + slash).label("path"),
+            false().label("cycle"),
+        )
+        .where(Task.id == task_id)
+        .cte("task_tree", recursive=True)
+    )
+
+    child = aliased(Task)
+    child_id = cast(child.id, String)
+    tree = tree.union_all(
+        select(
+            child.id,
+            tree.c.depth + literal_column("1", Integer),
+            tree.c.path + child_id + slash,
+            tree.c.path.contains(slash + child_id + slash),
+        )
+        .join(tree, child.parent_task == tree.c.id)
+        .where(tree.c.depth <= max_depth, not_(tree.c.cycle))
+    )
+
+    return (
+        select(*(getattr(Task, field) for field in TREE_FIELDS), tree.c.depth, tree.c.cycle)
+        .join(tree, Task.id == tree.c.id)
+        .order_by(tree.c.depth, Task.id)
+    )
+
+
+def _rollup(node: dict) -> dict:
+    points = node["task"]["story_points"] or 0
+    statuses = Counter({node["task"]["work_flow"]: 1}) if node["task"]["work_flow"] else Counter()
+    tasks = 1
+    for child in node["children"]:
+        rollup = _rollup(child)
+        points += rollup["story_points"]
+        tasks += rollup["tasks"]
+        statuses.update(rollup["status_counts"])
+
+    node["rollup"] = {"story_points": points, "tasks": tasks, "status_counts": dict(statuses)}
+    return node["rollup"]
+
+
+async def task_tree(db: AsyncSession, task_id: int, max_depth: int = DEFAULT_TREE_DEPTH) -> dict | None:
+    rows = (await db.execute(subtree_query(task_id, max_depth))).all()
+    if not rows:
+        return None
+
+    nodes, children, cycles, truncated = {}, defaultdict(list), [], set()
+    for row in rows:
+        task = {field: getattr(row, field) for field in TREE_FIELDS}
+        if row.cycle:
+            cycles.append({"parent_task": task["parent_task"], "task_id": task["id"]})
+        elif row.depth > max_depth:
+            truncated.add(task["parent_task"])
+        else:
+            nodes[task["id"]] = {"task": task, "depth": row.depth, "children": children[task["id"]]}
+            if row.depth:
+                children[task["parent_task"]].append(nodes[task["id"]])
+
+    for node_id in truncated:
+        nodes[node_id]["has_more_children"] = True
+
+    root = nodes[task_id]
+    _rollup(root)
+    return {"root": root, "max_depth": max_depth, "cycles": cycles}
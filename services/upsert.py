@@ -0,0 +1,26 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# Both dialects support INSERT ... ON CONFLICT with the same construct
+DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def dialect_insert(db: AsyncSession, table):
+    return DIALECT_INSERTS[db.get_bind().dialect.name](table)
+
+
+# Add each row's `columns` onto the existing row with the same `keys`, inserting it if missing
+async def upsert_increments(db: AsyncSession, table, keys: list[str], columns: list[str], rows: list[dict]):
+    if not rows:
+        return
+
+    stmt = dialect_insert(db, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={column: table.c[column] + stmt.excluded[column] for column in columns},
+    )
+    await db.execute(stmt, rows)
@@ -0,0 +1,93 @@
+import os
+import tempfile
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from benchmarks.bench_db import use_database
+
+# database.py reads its settings on import: a throwaway SQLite file (CITEXT handled by bench_db), no
+# background jobs or rate limits, so every test drives the purge and reconciliation itself
+use_database(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.sqlite')}")
+os.environ["DB_MIGRATE_ON_STARTUP"] = "false"
+os.environ["PURGE_INTERVAL_SECONDS"] = "0"
+os.environ["PROJECT_COUNTER_RECONCILE_SECONDS"] = "0"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ.setdefault("AUTH_SECRET", "test-secret")
+
+import httpx  # noqa: E402
+
+from main import app  # noqa: E402
+from services.auth import issue_token_pair  # noqa: E402
+from services.migrations import upgrade_database  # noqa: E402
+
+upgrade_database()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+# The app with its lifespan, which also disposes the engines (their connections belong to this test's loop)
+@pytest.fixture
+async def client():
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+# Signs up a user (organisations are unique per email domain, so each gets its own) and logs them in
+@pytest.fixture
+def signup(client):
+    async def signup(full_name: str = "User", password: str = "secret") -> SimpleNamespace:
+        email = f"{full_name.lower()}@{uuid4().hex[:12]}.test"
+        response = await client.post("/users/", json={"email": email, "password": password, "full_name": full_name})
+        assert response.status_code == 200, response.text
+        (user,) = response.json().values()
+        tokens = (await client.post("/users/valid", json={"email": email, "password": password})).json()
+        return SimpleNamespace(
+            id=user["id"], email=email, tokens=tokens, headers=bearer(tokens["access_token"])
+        )
+
+    return signup
+
+
+# Headers of an admin; signup never grants admin, so its token is signed here
+@pytest.fixture
+async def admin(signup):
+    user = await signup("Admin")
+    tokens = issue_token_pair(SimpleNamespace(id=user.id, organisation=None, is_admin=True))
+    user.headers = bearer(tokens["access_token"])
+    return user
+
+
+# A project managed by the admin, with the given users as members
+@pytest.fixture
+def make_project(client, admin):
+    async def make_project(*members) -> int:
+        response = await client.post(
+            "/projects/",
+            json={"title": f"Project {uuid4().hex[:8]}", "users": [admin.id, *(m.id for m in members)], "manager_id": admin.id},
+            headers=admin.headers,
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+
+    return make_project
+
+
+@pytest.fixture
+def make_task(client, admin):
+    async def make_task(project_id: int, **fields) -> dict:
+        body = {"title": "Task", "work_type": "Task", "work_flow": "To Do", "priority": "Major", "project_id": project_id}
+        response = await client.post("/tasks/", json={**body, **fields}, headers=admin.headers)
+        assert response.status_code == 200, response.text
+        return response.json()["task"]
+
+    return make_task
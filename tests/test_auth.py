@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from services.auth import RevocationList, decode_token, issue_token_pair
+
+pytestmark = pytest.mark.anyio
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def test_signup_cannot_grant_admin(client, signup):
+    email = f"mallory@{uuid4().hex[:12]}.test"
+    response = await client.post(
+        "/users/", json={"email": email, "password": "secret", "full_name": "Mallory", "is_admin": True}
+    )
+    (user,) = response.json().values()
+    assert user["is_admin"] is False
+
+    victim = await signup("Victim")
+    tokens = (await client.post("/users/valid", json={"email": email, "password": "secret"})).json()
+    response = await client.patch(f"/users/{victim.id}", json={"password": "taken"}, headers=bearer(tokens["access_token"]))
+    assert response.status_code == 403
+
+
+async def test_password_change_revokes_every_earlier_token(client, signup):
+    user = await signup("Rotating", password="old-password")
+    other_session = (await client.post("/users/valid", json={"email": user.email, "password": "old-password"})).json()
+
+    response = await client.patch(f"/users/{user.id}", json={"password": "new-password"}, headers=user.headers)
+    assert response.status_code == 200
+
+    # Tokens issued in the same second as the change are revoked as well
+    for tokens in (user.tokens, other_session):
+        assert (await client.get(f"/users/{user.id}", headers=bearer(tokens["access_token"]))).status_code == 401
+        response = await client.post("/users/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 401
+
+    fresh = (await client.post("/users/valid", json={"email": user.email, "password": "new-password"})).json()
+    assert (await client.get(f"/users/{user.id}", headers=bearer(fresh["access_token"]))).status_code == 200
+
+    # Another worker learns the cutoff from the revoked_token table
+    other_worker = RevocationList()
+    await other_worker.reload()
+    assert other_worker.is_revoked(decode_token(user.tokens["access_token"]))
+    assert other_worker.is_revoked(decode_token(other_session["refresh_token"]))
+    assert not other_worker.is_revoked(decode_token(fresh["access_token"]))
+
+
+async def test_refresh_tokens_are_single_use_and_logout_revokes(client, signup):
+    user = await signup("Refresher")
+
+    response = await client.post("/users/refresh", json={"refresh_token": user.tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()
+    assert (await client.post("/users/refresh", json={"refresh_token": user.tokens["refresh_token"]})).status_code == 401
+
+    response = await client.post(
+        "/users/logout", json={"refresh_token": rotated["refresh_token"]}, headers=bearer(rotated["access_token"])
+    )
+    assert response.status_code == 200
+    assert (await client.get(f"/users/{user.id}", headers=bearer(rotated["access_token"]))).status_code == 401
+    assert (await client.post("/users/refresh", json={"refresh_token": rotated["refresh_token"]})).status_code == 401
+
+
+async def test_routes_need_a_valid_access_token(client, signup):
+    user = await signup("Caller")
+    assert (await client.get(f"/users/{user.id}")).status_code == 401
+    assert (await client.get(f"/users/{user.id}", headers=bearer("not-a-token"))).status_code == 401
+    # A refresh token is not an access token
+    assert (await client.get(f"/users/{user.id}", headers=bearer(user.tokens["refresh_token"]))).status_code == 401
+
+    forged = issue_token_pair(SimpleNamespace(id=user.id, organisation=None, is_admin=True))
+    header, payload, _ = forged["access_token"].split(".")
+    assert (await client.get(f"/users/{user.id}", headers=bearer(f"{header}.{payload}.bad"))).status_code == 401
@@ -0,0 +1,69 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _comment(client, user, task_id: int, content: str, parent_id: int | None = None) -> dict:
+    response = await client.post(
+        "/comments/", json={"task_id": task_id, "content": content, "parent_id": parent_id}, headers=user.headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def _all_threads(client, headers, task_id: int, limit: int) -> list[dict]:
+    threads, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get(f"/comments/task/{task_id}", params=params, headers=headers)).json()
+        assert len(page["items"]) <= limit
+        threads += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return threads
+
+
+async def test_threads_nest_replies_and_list_latest_activity_first(client, signup, make_project, make_task):
+    user = await signup("Commenter")
+    task_id = (await make_task(await make_project(user)))["id"]
+    first = await _comment(client, user, task_id, "first")
+    second = await _comment(client, user, task_id, "second")
+    reply = await _comment(client, user, task_id, "reply", first["id"])
+    await _comment(client, user, task_id, "nested", reply["id"])
+
+    threads = (await client.get(f"/comments/task/{task_id}", headers=user.headers)).json()["items"]
+
+    # The reply moved the first thread back to the top
+    assert [thread["id"] for thread in threads] == [first["id"], second["id"]]
+    (reply_node,) = threads[0]["replies"]
+    assert reply_node["content"] == "reply"
+    assert [node["content"] for node in reply_node["replies"]] == ["nested"]
+    assert threads[0]["author"] == {"id": user.id, "full_name": "Commenter"}
+
+
+async def test_pages_reach_every_thread_when_a_root_author_is_deleted(
+    client, admin, signup, make_project, make_task
+):
+    author, other = await signup("Gone"), await signup("Stays")
+    task_id = (await make_task(await make_project(author, other)))["id"]
+    roots = [await _comment(client, author, task_id, "thread 0")]
+    roots += [await _comment(client, other, task_id, f"thread {index}") for index in range(1, 4)]
+
+    assert (await client.delete(f"/users/{author.id}", headers=admin.headers)).status_code == 200
+
+    threads = await _all_threads(client, admin.headers, task_id, limit=2)
+    assert [thread["id"] for thread in threads] == [root["id"] for root in reversed(roots)]
+
+
+async def test_only_the_author_or_an_admin_changes_a_comment(client, admin, signup, make_project, make_task):
+    author, other = await signup("Owner"), await signup("Other")
+    task_id = (await make_task(await make_project(author, other)))["id"]
+    comment = await _comment(client, author, task_id, "mine")
+    # The author comes from the token, not the body
+    assert comment["user_id"] == author.id
+
+    assert (await client.patch(f"/comments/{comment['id']}", json={"content": "x"}, headers=other.headers)).status_code == 403
+    assert (await client.delete(f"/comments/{comment['id']}", headers=other.headers)).status_code == 403
+    assert (await client.patch(f"/comments/{comment['id']}", json={"content": "edited"}, headers=author.headers)).status_code == 200
+    assert (await client.delete(f"/comments/{comment['id']}", headers=admin.headers)).status_code == 200
+    assert (await client.get(f"/comments/task/{task_id}", headers=author.headers)).json()["items"] == []
@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import text
+
+from database import engine
+from services.project_stats import reconcile_project_counters
+
+pytestmark = pytest.mark.anyio
+
+
+async def _stats(client, admin, project_id: int, verify: bool = False) -> dict:
+    response = await client.get(f"/projects/{project_id}/stats", params={"verify": verify}, headers=admin.headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_counters_follow_every_kind_of_task_write(client, admin, signup, make_project, make_task):
+    member = await signup("Assignee")
+    project_id = await make_project(member)
+    tasks = [
+        await make_task(project_id, story_points=points, user_id=member.id if points < 2 else None)
+        for points in range(4)
+    ]
+    response = await client.post(
+        "/tasks/bulk",
+        json=[{"title": "Bulk", "work_type": "Bug", "work_flow": "QA", "priority": "Minor", "project_id": project_id, "story_points": 3}],
+        headers=admin.headers,
+    )
+    assert response.status_code == 200
+    response = await client.patch(
+        f"/tasks/{tasks[0]['id']}", json={"work_flow": "Done", "priority": "Blocker"}, headers=admin.headers
+    )
+    assert response.status_code == 200
+    response = await client.post(
+        "/tasks/bulk/move",
+        json={"task_ids": [tasks[1]["id"], tasks[2]["id"]], "sprint_id": None, "work_flow": "In Progress"},
+        headers=admin.headers,
+    )
+    assert response.status_code == 200
+    response = await client.patch("/tasks/bulk", json=[{"id": tasks[3]["id"], "user_id": member.id}], headers=admin.headers)
+    assert response.status_code == 200
+    assert (await client.delete(f"/tasks/{tasks[2]['id']}", headers=admin.headers)).status_code == 200
+
+    stats = await _stats(client, admin, project_id)
+    assert (stats["tasks"], stats["story_points"]) == (4, 0 + 1 + 3 + 3)
+    assert stats["work_flow"] == {
+        "Done": {"tasks": 1, "story_points": 0},
+        "In Progress": {"tasks": 1, "story_points": 1},
+        "To Do": {"tasks": 1, "story_points": 3},
+        "QA": {"tasks": 1, "story_points": 3},
+    }
+    assert stats["assignee"][str(member.id)] == {"tasks": 3, "story_points": 4}
+
+    verified = await _stats(client, admin, project_id, verify=True)
+    assert verified.pop("drift") == []
+    assert verified == stats
+
+
+async def test_reconciliation_repairs_drifted_counters(client, admin, make_project, make_task):
+    project_id = await make_project()
+    for points in (1, 2):
+        await make_task(project_id, story_points=points)
+    expected = await _stats(client, admin, project_id)
+
+    # Writes that bypassed apply_task_changes
+    with engine.begin() as connection:
+        connection.execute(
+            text("UPDATE project_task_counter SET tasks = tasks + 7 WHERE project_id = :id AND dimension = 'priority'"),
+            {"id": project_id},
+        )
+        connection.execute(
+            text("DELETE FROM project_task_counter WHERE project_id = :id AND dimension = 'assignee'"), {"id": project_id}
+        )
+
+    drift = (await _stats(client, admin, project_id, verify=True))["drift"]
+    assert {(row["dimension"], row["tasks"]) for row in drift} == {("priority", -7), ("assignee", 2)}
+
+    await reconcile_project_counters()
+
+    assert (await _stats(client, admin, project_id, verify=True))["drift"] == []
+    assert await _stats(client, admin, project_id) == expected
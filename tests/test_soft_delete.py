@@ -0,0 +1,105 @@
+import datetime
+
+import pytest
+
+from services.purge import purge_soft_deleted
+
+pytestmark = pytest.mark.anyio
+
+
+def _backlog_ids(board: dict) -> set[int]:
+    return {task["id"] for tasks in board["backlog"].values() for task in tasks}
+
+
+async def _make_sprint(client, admin, project_id: int) -> int:
+    start = datetime.datetime.now(datetime.timezone.utc)
+    response = await client.post(
+        "/sprints/",
+        json={
+            "project_id": project_id,
+            "status": True,
+            "start_date": start.isoformat(),
+            "end_date": (start + datetime.timedelta(days=14)).isoformat(),
+        },
+        headers=admin.headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+async def _drift(client, admin, project_id: int) -> list:
+    response = await client.get(f"/projects/{project_id}/stats", params={"verify": True}, headers=admin.headers)
+    assert response.status_code == 200, response.text
+    return response.json()["drift"]
+
+
+async def test_deleted_sprint_tasks_are_hidden_until_the_purge_moves_them_to_the_backlog(
+    client, admin, make_project, make_task
+):
+    project_id = await make_project()
+    sprint_id = await _make_sprint(client, admin, project_id)
+    in_sprint = [(await make_task(project_id, sprint_id=sprint_id, story_points=2))["id"] for _ in range(3)]
+    backlog = (await make_task(project_id))["id"]
+
+    response = await client.delete(f"/sprints/{sprint_id}", headers=admin.headers)
+    assert response.status_code == 200
+
+    assert (await client.get(f"/sprints/{sprint_id}/fetch", headers=admin.headers)).status_code == 404
+    for task_id in in_sprint:
+        assert (await client.get(f"/tasks/{task_id}", headers=admin.headers)).status_code == 404
+    board = (await client.get(f"/projects/{project_id}/board", headers=admin.headers)).json()
+    assert board["sprints"] == []
+    assert _backlog_ids(board) == {backlog}
+    # The counters still include the hidden tasks; the drift check sees them too
+    assert await _drift(client, admin, project_id) == []
+
+    await purge_soft_deleted()
+
+    board = (await client.get(f"/projects/{project_id}/board", headers=admin.headers)).json()
+    assert _backlog_ids(board) == {backlog, *in_sprint}
+    for task_id in in_sprint:
+        task = (await client.get(f"/tasks/{task_id}", headers=admin.headers)).json()
+        assert task["sprint_id"] is None
+    assert await _drift(client, admin, project_id) == []
+
+
+async def test_deleted_project_is_hidden_then_purged_with_its_tasks(client, admin, make_project, make_task):
+    project_id = await make_project()
+    task_id = (await make_task(project_id))["id"]
+
+    assert (await client.delete(f"/projects/{project_id}", headers=admin.headers)).status_code == 200
+    assert (await client.get(f"/projects/{project_id}", headers=admin.headers)).status_code == 404
+    assert (await client.get(f"/tasks/{task_id}", headers=admin.headers)).status_code == 404
+    response = await client.get("/tasks/all", params={"project_ids": project_id}, headers=admin.headers)
+    assert response.json() == []
+
+    await purge_soft_deleted()
+
+    assert (await client.get(f"/projects/{project_id}/stats", headers=admin.headers)).status_code == 404
+    assert (await client.get(f"/tasks/{task_id}", headers=admin.headers)).status_code == 404
+
+
+async def test_deleted_author_keeps_their_threads_and_the_replies_in_them(
+    client, admin, signup, make_project, make_task
+):
+    author, replier = await signup("Author"), await signup("Replier")
+    task_id = (await make_task(await make_project(author, replier)))["id"]
+    root = (await client.post("/comments/", json={"task_id": task_id, "content": "root"}, headers=author.headers)).json()
+    await client.post(
+        "/comments/", json={"task_id": task_id, "content": "reply", "parent_id": root["id"]}, headers=replier.headers
+    )
+
+    assert (await client.delete(f"/users/{author.id}", headers=admin.headers)).status_code == 200
+
+    (thread,) = (await client.get(f"/comments/task/{task_id}", headers=admin.headers)).json()["items"]
+    assert thread["author"] == {"id": author.id, "full_name": None}
+    assert [(reply["content"], reply["author"]["full_name"]) for reply in thread["replies"]] == [("reply", "Replier")]
+
+    await purge_soft_deleted()
+
+    # The user is gone; the comments stay, without an author
+    assert (await client.get(f"/users/{author.id}", headers=admin.headers)).status_code == 404
+    (thread,) = (await client.get(f"/comments/task/{task_id}", headers=admin.headers)).json()["items"]
+    assert thread["content"] == "root"
+    assert thread["author"] == {"id": None, "full_name": None}
+    assert [reply["content"] for reply in thread["replies"]] == ["reply"]